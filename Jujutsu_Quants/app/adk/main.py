@@ -7,7 +7,7 @@ import os
 
 from app.adk.orchestrator import Orchestrator
 from app.services.market_data_service import MarketDataService
-from app.services.news_fetch_service import fetch_urls_to_articles
+from app.services.news_fetch_service import fetch_urls_to_articles_async
 
 app = FastAPI(title="OpenAI News Lab", version="2.0.0")
 orchestrator = Orchestrator()
@@ -75,7 +75,7 @@ async def get_simple_report(
     # Resolve articles
     resolved_articles: List[Dict[str, Any]] = []
     if url_list:
-        resolved_articles = fetch_urls_to_articles(url_list)
+        resolved_articles = await fetch_urls_to_articles_async(url_list)
 
     return await orchestrator.process_news_workflow(
         resolved_market_data,
@@ -126,7 +126,7 @@ async def get_advanced_report(payload: ReportRequest):
     # Resolve news articles
     resolved_articles: List[Dict[str, Any]] = payload.news_articles or []
     if payload.news_urls and len(payload.news_urls) > 0:
-        fetched = fetch_urls_to_articles(payload.news_urls)
+        fetched = await fetch_urls_to_articles_async(payload.news_urls)
         resolved_articles = fetched + resolved_articles
 
     return await orchestrator.process_news_workflow(
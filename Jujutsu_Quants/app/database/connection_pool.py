@@ -0,0 +1,252 @@
+# app/database/connection_pool.py - Thread-safe DB-API connection pool (sync + asyncio) for the vector database
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Pool defaults - override via environment
+POOL_MAX_SIZE = int(os.getenv("VECTOR_DB_POOL_SIZE", "5"))
+POOL_ACQUIRE_TIMEOUT = float(os.getenv("VECTOR_DB_POOL_TIMEOUT", "10"))
+POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("VECTOR_DB_HEALTH_CHECK_INTERVAL", "30"))
+POOL_MAX_IDLE = float(os.getenv("VECTOR_DB_MAX_IDLE", "300"))
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the acquisition timeout"""
+
+
+class ConnectionPool:
+    """
+    Pool of DB-API connections (pg8000 via the Cloud SQL Connector, or a
+    plain local PostgreSQL) that can be shared by concurrent requests.
+
+    At most `max_size` connections are open; callers wait up to
+    `acquire_timeout` seconds for one to be returned. Connections idle for
+    longer than `health_check_interval` are pinged before reuse and replaced
+    if the ping fails, so a dropped connection heals itself. Every
+    connection is rolled back when returned, so no transaction (and no
+    broken one after an error) leaks into the next request.
+    """
+
+    def __init__(self, connect: Callable[[], Any], max_size: int = POOL_MAX_SIZE,
+                 acquire_timeout: float = POOL_ACQUIRE_TIMEOUT,
+                 health_check_interval: float = POOL_HEALTH_CHECK_INTERVAL,
+                 max_idle: float = POOL_MAX_IDLE, name: str = "vector-db"):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._connect = connect
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self.max_idle = max_idle
+        self.name = name
+
+        self._idle: List[Tuple[Any, float]] = []  # (connection, returned_at), most recent last
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.stats = {"created": 0, "reused": 0, "discarded": 0, "timeouts": 0}
+
+    def _discard(self, conn: Any):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self.stats["discarded"] += 1
+            self._cond.notify()
+
+    @staticmethod
+    def _is_healthy(conn: Any) -> bool:
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """Take a connection from the pool, opening one if below max_size"""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            conn = None
+            returned_at = 0.0
+            create = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError(f"Connection pool '{self.name}' is closed")
+                    if self._idle:
+                        conn, returned_at = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats["timeouts"] += 1
+                        raise PoolTimeout(f"No '{self.name}' connection available within {timeout}s "
+                                          f"(max_size={self.max_size})")
+                    self._cond.wait(remaining)
+
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                self.stats["created"] += 1
+                return conn
+
+            # Reused connection: drop it if idle too long, ping it if unused for a while
+            idle_for = time.monotonic() - returned_at
+            if idle_for > self.max_idle or (idle_for > self.health_check_interval and not self._is_healthy(conn)):
+                self._discard(conn)
+                continue
+            self.stats["reused"] += 1
+            return conn
+
+    def release(self, conn: Any, discard: bool = False):
+        """Return a connection; it is rolled back, or closed if broken or `discard` is set"""
+        if not discard:
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+
+        if discard or self._closed:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """`with pool.connection() as conn:` - always returns the connection to the pool"""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Close idle connections; connections in use are closed when released"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._discard(conn)
+        close_factory = getattr(self._connect, "close", None)
+        if close_factory:
+            close_factory()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool usage counters - useful for sizing max_size"""
+        with self._cond:
+            return {**self.stats, "open": self._size, "idle": len(self._idle), "max_size": self.max_size}
+
+
+class AsyncConnectionPool:
+    """
+    asyncio front end for a ConnectionPool.
+
+    pg8000 is a blocking driver, so waiting for a connection and running the
+    queries happen in worker threads; the event loop is never blocked.
+    """
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+
+    def _run(self, func: Callable[..., Any], args: tuple, timeout: Optional[float]) -> Any:
+        with self.pool.connection(timeout) as conn:
+            return func(conn, *args)
+
+    async def run(self, func: Callable[..., Any], *args, timeout: Optional[float] = None) -> Any:
+        """Run `func(conn, *args)` on a pooled connection in a worker thread"""
+        return await asyncio.to_thread(self._run, func, args, timeout)
+
+    @asynccontextmanager
+    async def connection(self, timeout: Optional[float] = None):
+        """`async with pool.connection() as conn:` - blocking calls on conn still belong in a thread"""
+        conn = await asyncio.to_thread(self.pool.acquire, timeout)
+        try:
+            yield conn
+        finally:
+            await asyncio.to_thread(self.pool.release, conn)
+
+
+class CloudSQLConnect:
+    """Connection factory for Cloud SQL (pg8000) sharing one Connector"""
+
+    def __init__(self, instance_connection_name: str, user: str, password: str, db: str):
+        from google.cloud.sql.connector import Connector
+        self.connector = Connector()
+        self.instance_connection_name = instance_connection_name
+        self.user = user
+        self.password = password
+        self.db = db
+
+    def __call__(self):
+        return self.connector.connect(
+            self.instance_connection_name,
+            "pg8000",
+            user=self.user,
+            password=self.password,
+            db=self.db
+        )
+
+    def close(self):
+        self.connector.close()
+
+
+class LocalPostgresConnect:
+    """Connection factory for a plain PostgreSQL + pgvector (local testing, docker)"""
+
+    def __init__(self, host: str, port: int, user: str, password: str, db: str):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.db = db
+
+    def __call__(self):
+        import pg8000.dbapi
+        return pg8000.dbapi.connect(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            database=self.db
+        )
+
+
+def create_vector_db_pool(project_id: str, region: str, instance_name: str, database: str,
+                          user: str, password: str) -> ConnectionPool:
+    """
+    Pool for the documents/pgvector database.
+
+    Connects through the Cloud SQL Connector, or directly to
+    VECTOR_DB_HOST:VECTOR_DB_PORT when VECTOR_DB_HOST is set.
+    """
+    host = os.getenv("VECTOR_DB_HOST")
+    if host:
+        connect = LocalPostgresConnect(host, int(os.getenv("VECTOR_DB_PORT", "5432")), user, password,
+                                       os.getenv("VECTOR_DB_NAME", database))
+    else:
+        connect = CloudSQLConnect(f"{project_id}:{region}:{instance_name}", user, password, database)
+    return ConnectionPool(connect)
@@ -0,0 +1,143 @@
+# app/services/article_cache.py - On-disk cache of parsed news articles keyed by URL
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+# Anchored to the project directory, so the cache does not move with the working directory
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_CACHE_DIR = os.getenv("NEWS_CACHE_DIR") or os.path.join(PROJECT_DIR, ".cache")
+DEFAULT_CACHE_PATH = os.path.join(DEFAULT_CACHE_DIR, "news_articles.sqlite3")
+DEFAULT_TTL = float(os.getenv("NEWS_CACHE_TTL", "3600"))         # Serve without revalidation for 1 hour
+DEFAULT_MAX_AGE = float(os.getenv("NEWS_CACHE_MAX_AGE", "604800"))  # Drop entries unused for 7 days
+PRUNE_EVERY = 500  # Writes between pruning passes
+SQLITE_MAX_VARIABLES = 900  # URLs per lookup query, below SQLite's bound-parameter limit
+
+
+class ArticleCache:
+    """
+    Parsed `{title, content, source, url}` articles plus the validators
+    (ETag / Last-Modified) needed to revalidate them with a conditional GET.
+
+    Entries younger than `ttl` are served without touching the network; older
+    entries are revalidated and reused as-is when the server answers 304.
+    Pages without extractable content are cached too (article is None) so we
+    don't re-download and re-parse them on every request.
+
+    All methods are blocking; async callers run them in a worker thread.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL,
+                 max_age: float = DEFAULT_MAX_AGE):
+        self.path = path
+        self.ttl = ttl
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                article TEXT
+            )
+        """)
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return the cache entry for `url` (with a `fresh` flag) or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, fetched_at, article FROM articles WHERE url = ?", (url,)
+            ).fetchone()
+        return self._entry(*row) if row else None
+
+    def get_many(self, urls: Iterable[str]) -> Dict[str, Dict]:
+        """Cache entries by URL for every cached URL in `urls` (one query per batch of URLs)"""
+        urls = list(dict.fromkeys(urls))
+        entries = {}
+        for start in range(0, len(urls), SQLITE_MAX_VARIABLES):
+            batch = urls[start:start + SQLITE_MAX_VARIABLES]
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT url, etag, last_modified, fetched_at, article FROM articles "
+                    f"WHERE url IN ({', '.join('?' * len(batch))})", batch
+                ).fetchall()
+            for url, *row in rows:
+                entries[url] = self._entry(*row)
+        return entries
+
+    def _entry(self, etag: Optional[str], last_modified: Optional[str], fetched_at: float,
+               article: Optional[str]) -> Dict:
+        return {
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": fetched_at,
+            "fresh": time.time() - fetched_at < self.ttl,
+            "article": json.loads(article) if article else None
+        }
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        """Request headers for revalidating a stale entry"""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url: str, article: Optional[Dict], etag: Optional[str] = None,
+            last_modified: Optional[str] = None):
+        """Store a freshly parsed article and its validators"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO articles (url, etag, last_modified, fetched_at, article) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, time.time(), json.dumps(article) if article else None)
+            )
+            self._writes += 1
+            if self._writes % PRUNE_EVERY == 0:
+                self._prune()
+
+    def touch(self, url: str):
+        """Restart the freshness window after a 304 Not Modified"""
+        with self._lock:
+            self._conn.execute("UPDATE articles SET fetched_at = ? WHERE url = ?", (time.time(), url))
+
+    def _prune(self):
+        self._conn.execute("DELETE FROM articles WHERE fetched_at < ?", (time.time() - self.max_age,))
+
+    def clear(self):
+        """Clear the cache - useful for testing"""
+        with self._lock:
+            self._conn.execute("DELETE FROM articles")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Singleton instance
+_article_cache = None
+_article_cache_lock = threading.Lock()
+
+
+def get_article_cache() -> Optional[ArticleCache]:
+    """Get or create the article cache (None when disabled with NEWS_CACHE_DISABLED=1)"""
+    global _article_cache
+    if os.getenv("NEWS_CACHE_DISABLED", "0") == "1":
+        return None
+    if _article_cache is None:
+        with _article_cache_lock:
+            if _article_cache is None:
+                _article_cache = ArticleCache()
+    return _article_cache
@@ -0,0 +1,153 @@
+# app/services/document_store.py - Memory-mapped corpus metadata store for hydrating search results by id
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Sequence
+
+DOCUMENT_STORE_PATH = os.getenv("DOCUMENT_STORE_PATH", "")  # Overrides the store recorded in corpus metadata
+DOCUMENT_STORE_MMAP_MB = int(os.getenv("DOCUMENT_STORE_MMAP_MB", "256"))   # Mapped window of the store file
+DOCUMENT_STORE_CACHE_MB = int(os.getenv("DOCUMENT_STORE_CACHE_MB", "8"))   # SQLite page cache per connection
+DOCUMENT_STORE_BUILD_BATCH = 1000
+SQLITE_MAX_VARIABLES = 900  # Below SQLite's bound-parameter limit
+
+# Promoted to columns; every other field of a document is kept in `extra` (JSON)
+DOCUMENT_COLUMNS = ["id", "title", "content", "instrument", "source_type", "date", "file_path"]
+
+
+class DocumentStore:
+    """
+    Corpus chunk metadata keyed by id, in one SQLite file.
+
+    Search backends return neighbour ids; this hydrates just those rows
+    with primary-key lookups instead of holding every title and content
+    preview in a dict. Opening is a file open - nothing is read up front -
+    and the file is memory-mapped read-only (immutable, so no locking), so
+    resident memory is bounded by the pages queries touch, not by corpus
+    size. `get(id, default)` mirrors `dict.get`, so the store can replace
+    an in-memory `doc_lookup`.
+
+    Connections are per thread; a store can be shared by concurrent queries.
+    """
+
+    def __init__(self, path: str, mmap_mb: int = DOCUMENT_STORE_MMAP_MB, cache_mb: int = DOCUMENT_STORE_CACHE_MB):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No document store at {path}")
+        self.path = path
+        self.mmap_bytes = mmap_mb * 1024 * 1024
+        self.cache_kib = cache_mb * 1024
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(f"file:{self.path}?mode=ro&immutable=1", uri=True,
+                                         check_same_thread=False)
+            connection.execute(f"PRAGMA mmap_size = {self.mmap_bytes}")
+            connection.execute(f"PRAGMA cache_size = -{self.cache_kib}")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @staticmethod
+    def _row_to_document(row: Sequence[Any]) -> Dict[str, Any]:
+        doc = json.loads(row[-1]) if row[-1] else {}
+        doc.update({column: value for column, value in zip(DOCUMENT_COLUMNS, row[:-1]) if value is not None})
+        return doc
+
+    def get(self, doc_id: str, default: Any = None) -> Any:
+        """One document by id, or `default`"""
+        row = self._connection().execute(
+            f"SELECT {', '.join(DOCUMENT_COLUMNS)}, extra FROM documents WHERE id = ?", (str(doc_id),)
+        ).fetchone()
+        return self._row_to_document(row) if row else default
+
+    def get_many(self, ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Documents by id for every id found (missing ids are left out)"""
+        ids = [str(doc_id) for doc_id in ids]
+        found = {}
+        for start in range(0, len(ids), SQLITE_MAX_VARIABLES):
+            chunk = ids[start:start + SQLITE_MAX_VARIABLES]
+            rows = self._connection().execute(
+                f"SELECT {', '.join(DOCUMENT_COLUMNS)}, extra FROM documents "
+                f"WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            for row in rows:
+                found[row[0]] = self._row_to_document(row)
+        return found
+
+    def __contains__(self, doc_id: str) -> bool:
+        return self._connection().execute(
+            "SELECT 1 FROM documents WHERE id = ?", (str(doc_id),)
+        ).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+        self._local = threading.local()
+
+    @classmethod
+    def build(cls, documents: Iterable[Dict[str, Any]], path: str,
+              batch_size: int = DOCUMENT_STORE_BUILD_BATCH) -> "DocumentStore":
+        """
+        Write `documents` (streamed, any size) to a new store at `path`.
+
+        Built in `<path>.tmp` and renamed into place, so readers never open
+        a half-written store. Later duplicates of an id replace earlier ones.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        staging = f"{path}.tmp"
+        if os.path.exists(staging):
+            os.remove(staging)
+
+        count = 0
+        connection = sqlite3.connect(staging)
+        try:
+            # A failed build is simply discarded, so skip the journal and fsyncs
+            connection.execute("PRAGMA journal_mode = OFF")
+            connection.execute("PRAGMA synchronous = OFF")
+            # Rows carry chunk text, so a rowid table plus the primary-key index on id
+            connection.execute(f"CREATE TABLE documents (id TEXT PRIMARY KEY, "
+                               f"{' TEXT, '.join(DOCUMENT_COLUMNS[1:])} TEXT, extra TEXT)")
+            insert = (f"INSERT OR REPLACE INTO documents ({', '.join(DOCUMENT_COLUMNS)}, extra) "
+                      f"VALUES ({', '.join('?' * (len(DOCUMENT_COLUMNS) + 1))})")
+            batch = []
+            for doc in documents:
+                extra = {key: value for key, value in doc.items() if key not in DOCUMENT_COLUMNS and key != "embedding"}
+                batch.append([None if doc.get(column) is None else str(doc[column]) for column in DOCUMENT_COLUMNS]
+                             + [json.dumps(extra, default=str) if extra else None])
+                if len(batch) >= batch_size:
+                    connection.executemany(insert, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                connection.executemany(insert, batch)
+                count += len(batch)
+            connection.commit()
+        finally:
+            connection.close()
+
+        os.replace(staging, path)
+        print(f"✅ Built document store: {count} documents -> {path}")
+        return cls(path)
+
+    @classmethod
+    def from_jsonl(cls, jsonl_path: str, path: str) -> "DocumentStore":
+        """Build from a corpus processor's documents_<uid>.jsonl, one line at a time"""
+        def documents():
+            with open(jsonl_path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        return cls.build(documents(), path)
+
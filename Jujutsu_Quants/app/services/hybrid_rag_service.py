@@ -2,10 +2,17 @@
 import asyncio
 import json
 import os
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
-import vertexai
-from vertexai.language_models import TextEmbeddingModel
+
+from app.database.connection_pool import AsyncConnectionPool, create_vector_db_pool
+from app.services.lexical_search import BM25Index, query_lexical_documents
+from app.services.local_vector_index import get_local_vector_index
+from app.utils.embedding_cache import embed_query
+from app.utils.embedding_provider import get_embedder
+from app.utils.rank_fusion import reciprocal_rank_fusion
+from app.utils.secret_provider import get_secret_store
 
 # Configuration
 PROJECT_ID = "letsstock-with-ai"
@@ -14,6 +21,26 @@ INSTANCE_NAME = "agentic-db"
 DATABASE_NAME = "tradesage_db"
 DB_USER = "postgres"
 DB_PASSWORD = os.getenv("DB_PASSWORD", "your-secure-password")
+EMBEDDING_MODEL = "text-embedding-004"
+
+# Overall time budget for one hybrid research request (seconds)
+RESEARCH_DEADLINE = float(os.getenv("HYBRID_RESEARCH_DEADLINE", "20"))
+
+# Vector retrieval: "single_pass" (one index-ordered query) or "cascade" (one query per threshold)
+RAG_SEARCH_MODE = os.getenv("RAG_SEARCH_MODE", "single_pass")
+RAG_SIMILARITY_THRESHOLDS = [0.4, 0.3, 0.2]  # Start with higher quality, fall back if needed
+RAG_CANDIDATE_MULTIPLIER = int(os.getenv("RAG_CANDIDATE_MULTIPLIER", "3"))  # Nearest rows fetched per result
+
+# Retrieval legs: "hybrid" (vector + keyword, fused with RRF) or "vector" (vector search only)
+RAG_RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "hybrid")
+RAG_VECTOR_TOP_K = int(os.getenv("RAG_VECTOR_TOP_K", "30"))     # Candidates per leg before fusion
+RAG_LEXICAL_TOP_K = int(os.getenv("RAG_LEXICAL_TOP_K", "30"))
+RAG_VECTOR_WEIGHT = float(os.getenv("RAG_VECTOR_WEIGHT", "1.0"))
+RAG_LEXICAL_WEIGHT = float(os.getenv("RAG_LEXICAL_WEIGHT", "1.0"))
+RAG_RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+
+# Secrets the real-time tools read, resolved at startup instead of on the first request
+REAL_TIME_SECRETS = ["alpha-vantage-key"]
 
 class HybridRAGService:
     """
@@ -26,44 +53,60 @@ class HybridRAGService:
     def __init__(self):
         self.project_id = PROJECT_ID
         self.region = REGION
+        self.search_mode = RAG_SEARCH_MODE
+        self.candidate_multiplier = max(1, RAG_CANDIDATE_MULTIPLIER)
+        self.retrieval_mode = RAG_RETRIEVAL_MODE
+        self.leg_top_k = {"vector": RAG_VECTOR_TOP_K, "lexical": RAG_LEXICAL_TOP_K}
+        self.leg_weights = {"vector": RAG_VECTOR_WEIGHT, "lexical": RAG_LEXICAL_WEIGHT}
         
-        # Initialize Vertex AI
+        # Shared embedder (Vertex AI, or the local backend with EMBEDDING_BACKEND=local)
         try:
-            vertexai.init(project=PROJECT_ID, location=REGION)
-            self.embedding_model = TextEmbeddingModel.from_pretrained("text-embedding-004")
+            self.embedder = get_embedder(EMBEDDING_MODEL, project_id=PROJECT_ID, location=REGION)
         except Exception as e:
-            print(f"⚠️  Vertex AI initialization failed: {str(e)}")
-            self.embedding_model = None
+            print(f"⚠️  Embedding provider initialization failed: {str(e)}")
+            self.embedder = None
         
-        # Database connection
-        self.connector = None
-        self.connection = None
+        # Database connection pool (shared safely by concurrent requests)
+        self.db_pool = None
+        self.async_db_pool = None
         self._connect_to_database()
         
+        # In-process ANN index (LOCAL_VECTOR_INDEX_PATH) - serves retrieval without the database
+        try:
+            self.local_index = get_local_vector_index()
+        except Exception as e:
+            print(f"⚠️  Local vector index unavailable: {str(e)}")
+            self.local_index = None
+        self._local_bm25 = None
+        self._local_bm25_lock = threading.Lock()
+        
         # Real-time service imports
         self._initialize_real_time_services()
         
         print("✅ Hybrid RAG Service initialized")
-        print(f"   - Vector database: {'Connected' if self.connection else 'Failed'}")
+        print(f"   - Vector database: {'Connected' if self.db_pool else 'Failed'}")
+        if self.local_index:
+            print(f"   - Local vector index: {self.local_index.get_stats()['total_documents']} documents")
         print(f"   - Real-time APIs: Ready")
-        print(f"   - Embedding model: {'Available' if self.embedding_model else 'Failed'}")
+        print(f"   - Embedding model: {self.embedder.model_name if self.embedder else 'Failed'}")
     
     def _connect_to_database(self):
-        """Connect to the Cloud SQL vector database"""
+        """Create the vector database pool and check it with a first connection"""
         try:
-            from google.cloud.sql.connector import Connector
-            self.connector = Connector()
-            self.connection = self.connector.connect(
-                f"{self.project_id}:{self.region}:{INSTANCE_NAME}",
-                "pg8000",
-                user=DB_USER,
-                password=DB_PASSWORD,
-                db=DATABASE_NAME
-            )
+            pool = create_vector_db_pool(self.project_id, self.region, INSTANCE_NAME, DATABASE_NAME,
+                                         DB_USER, DB_PASSWORD)
+            try:
+                pool.release(pool.acquire())
+            except Exception:
+                pool.close()
+                raise
+            self.db_pool = pool
+            self.async_db_pool = AsyncConnectionPool(pool)
             print("✅ Connected to vector database")
         except Exception as e:
             print(f"❌ Database connection failed: {str(e)}")
-            self.connection = None
+            self.db_pool = None
+            self.async_db_pool = None
     
     def _initialize_real_time_services(self):
         """Initialize real-time data services"""
@@ -74,19 +117,29 @@ class HybridRAGService:
             
             self.market_data_tool = market_data_tool
             self.news_data_tool = news_data_tool
+            # Secret Manager client creation and lookups run in the background, off the request path
+            threading.Thread(target=get_secret_store().warm, args=(REAL_TIME_SECRETS, self.project_id),
+                             name="secret-warm", daemon=True).start()
             print("✅ Real-time services initialized")
         except Exception as e:
             print(f"⚠️  Real-time services initialization warning: {str(e)}")
             self.market_data_tool = None
             self.news_data_tool = None
     
-    async def hybrid_research(self, hypothesis: str, instruments: List[str] = None) -> Dict[str, Any]:
+    async def hybrid_research(self, hypothesis: str, instruments: List[str] = None,
+                              deadline: float = RESEARCH_DEADLINE) -> Dict[str, Any]:
         """
         Main hybrid research method that combines RAG and real-time data
         
+        The RAG search, each instrument's market data and the news fetch run
+        concurrently in worker threads. Whatever has finished when `deadline`
+        seconds are up is merged; legs still running are reported in
+        `timed_out_sources`.
+        
         Args:
             hypothesis: The trading hypothesis to research
             instruments: List of financial instruments to focus on
+            deadline: Overall time budget in seconds
             
         Returns:
             Combined research data from both sources
@@ -94,14 +147,46 @@ class HybridRAGService:
         print(f"🔍 Starting hybrid research for: {hypothesis}")
         
         try:
-            # Step 1: Search for data in RAG database
-            rag_results = await self._rag_search(hypothesis)
+            # Extract instruments from hypothesis if not provided
+            instruments = instruments or self._extract_instruments(hypothesis)
             
-            # Step 2: Fetch real-time data
-            real_time_results = await self._real_time_search(hypothesis, instruments or [])
+            # Step 1: Start every retrieval leg at once
+            legs = {"rag": asyncio.create_task(self._rag_search(hypothesis))}
+            if self.market_data_tool:
+                for instrument in instruments[:3]:  # Limit to avoid rate limits
+                    legs[f"market:{instrument}"] = asyncio.create_task(self._fetch_market_data(instrument))
+            if self.news_data_tool:
+                legs["news"] = asyncio.create_task(self._fetch_news(hypothesis))
+            
+            # Step 2: Wait until all legs finish or the deadline passes
+            done, pending = await asyncio.wait(legs.values(), timeout=deadline)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            
+            timed_out = [name for name, task in legs.items() if task not in done]
+            if timed_out:
+                print(f"⏱️  Deadline of {deadline}s reached, continuing without: {', '.join(timed_out)}")
+            
+            timeout_error = {"error": f"Timed out after {deadline}s"}
+            rag_results = legs["rag"].result() if legs["rag"] in done else {"historical_insights": [], **timeout_error}
+            news_data = {}
+            if "news" in legs:
+                news_data = legs["news"].result() if legs["news"] in done else timeout_error
+            real_time_results = {
+                "market_data": {
+                    name.split(":", 1)[1]: task.result() if task in done else timeout_error
+                    for name, task in legs.items() if name.startswith("market:")
+                },
+                "news_data": news_data,
+                "instruments": instruments,
+                "timestamp": datetime.now().isoformat()
+            }
             
             # Step 3: Merge and prioritize results
             merged_results = self._merge_results(rag_results, real_time_results, hypothesis)
+            merged_results["research_data"]["timed_out_sources"] = timed_out
             
             print(f"✅ Hybrid research completed")
             print(f"   - RAG insights: {len(rag_results.get('historical_insights', []))}")
@@ -122,55 +207,32 @@ class HybridRAGService:
     
     async def _rag_search(self, hypothesis: str, limit: int = 10) -> Dict[str, Any]:
         """Search the historical RAG database"""
-        if not self.connection or not self.embedding_model:
+        if not (self.local_index or self.db_pool) or not self.embedder:
             return {"historical_insights": [], "error": "Database or embedding service not available"}
         
         try:
             print("📚 Searching RAG database...")
             
-            # Generate embedding for hypothesis
-            query_embedding = self.embedding_model.get_embeddings([hypothesis])[0].values
-            embedding_list = query_embedding.tolist() if hasattr(query_embedding, 'tolist') else list(query_embedding)
-            embedding_str = '[' + ','.join(map(str, embedding_list)) + ']'
-            
-            # Search with different similarity thresholds
-            thresholds = [0.4, 0.3, 0.2]  # Start with higher quality, fall back if needed
-            
-            for threshold in thresholds:
-                cursor = self.connection.cursor()
-                try:
-                    query = """
-                        SELECT 
-                            title,
-                            content,
-                            instrument,
-                            source_type,
-                            date_published,
-                            1 - (embedding <=> %s) AS similarity
-                        FROM documents
-                        WHERE 1 - (embedding <=> %s) >= %s
-                        ORDER BY embedding <=> %s
-                        LIMIT %s;
-                    """
-                    
-                    cursor.execute(query, [embedding_str, embedding_str, threshold, embedding_str, limit])
-                    results = cursor.fetchall()
-                    
-                    if results:
-                        print(f"   Found {len(results)} results with threshold {threshold}")
-                        break
-                        
-                finally:
-                    cursor.close()
+            # Embedding and the vector query are blocking calls - keep them off the event loop
+            embedding = await asyncio.to_thread(self._embed_query, hypothesis)
+            if self.retrieval_mode == "hybrid":
+                results = await self._hybrid_search(hypothesis, embedding, limit)
+            elif self.local_index:
+                results = await asyncio.to_thread(self._query_local_index, embedding, limit)
             else:
-                results = []
+                results = await self.async_db_pool.run(self._query_similar_documents,
+                                                       self._to_vector_literal(embedding), limit)
             
             # Format results
             historical_insights = []
-            for row in results:
+            for result in results:
+                if self.retrieval_mode == "hybrid":
+                    row, fusion_score, legs = result
+                else:
+                    row, fusion_score, legs = result, None, ["vector"]
                 title, content, instrument, source_type, date_published, similarity = row
                 
-                historical_insights.append({
+                insight = {
                     "title": title,
                     "content_preview": content[:300] + "..." if len(content) > 300 else content,
                     "full_content": content,
@@ -178,8 +240,12 @@ class HybridRAGService:
                     "source": source_type,
                     "date": str(date_published) if date_published else "Unknown",
                     "similarity": float(similarity),
+                    "retrieved_by": legs,
                     "data_source": "rag_database"
-                })
+                }
+                if fusion_score is not None:
+                    insight["fusion_score"] = fusion_score
+                historical_insights.append(insight)
             
             return {
                 "historical_insights": historical_insights,
@@ -191,49 +257,206 @@ class HybridRAGService:
             print(f"❌ RAG search error: {str(e)}")
             return {"historical_insights": [], "error": str(e)}
     
-    async def _real_time_search(self, hypothesis: str, instruments: List[str]) -> Dict[str, Any]:
-        """Fetch real-time market data and news"""
-        print("⚡ Fetching real-time data...")
+    async def _hybrid_search(self, hypothesis: str, embedding: List[float], limit: int) -> List[tuple]:
+        """
+        Run the vector and keyword legs concurrently and fuse them with reciprocal rank fusion.
         
-        # Extract instruments from hypothesis if not provided
-        if not instruments:
-            instruments = self._extract_instruments(hypothesis)
+        Exact tickers and filing terms ("AAPL", "10-Q") that embeddings blur
+        are caught by the keyword leg. Each leg returns its own top-k, so the
+        vector leg needs a single pass at the lowest threshold instead of
+        the fallback cascade. A failing keyword leg degrades to vector-only.
         
-        market_data = {}
-        news_data = {}
+        Returns:
+            (row, fusion score, legs that returned the row), best first
+        """
+        if self.local_index:
+            vector_leg = asyncio.to_thread(self._local_vector_leg, embedding)
+            lexical_leg = asyncio.to_thread(self._local_lexical_leg, hypothesis, embedding)
+        else:
+            embedding_str = self._to_vector_literal(embedding)
+            vector_leg = self.async_db_pool.run(self._query_vector_leg, embedding_str)
+            lexical_leg = self.async_db_pool.run(query_lexical_documents, hypothesis, embedding_str,
+                                                 self.leg_top_k["lexical"])
+        
+        vector_rows, lexical_rows = await asyncio.gather(vector_leg, lexical_leg, return_exceptions=True)
+        if isinstance(vector_rows, Exception):
+            raise vector_rows
+        if isinstance(lexical_rows, Exception):
+            print(f"⚠️  Keyword search failed, using vector results only: {str(lexical_rows)}")
+            lexical_rows = []
+        
+        fused = reciprocal_rank_fusion(
+            {"vector": vector_rows, "lexical": lexical_rows},
+            key=lambda row: (row[0], row[1]),
+            weights=self.leg_weights,
+            k=RAG_RRF_K
+        )
+        print(f"   Fused {len(vector_rows)} vector + {len(lexical_rows)} keyword candidates")
+        return fused[:limit]
+    
+    def _query_vector_leg(self, conn, embedding_str: str) -> List[tuple]:
+        """Vector leg of hybrid search: nearest rows above the lowest threshold (blocking)"""
+        candidates = self._nearest_candidates(conn, embedding_str, self.leg_top_k["vector"])
+        return [row for row in candidates if row[5] >= RAG_SIMILARITY_THRESHOLDS[-1]]
+    
+    def _local_vector_leg(self, embedding: List[float]) -> List[tuple]:
+        """Vector leg of hybrid search on the local index (blocking)"""
+        hits = self.local_index.semantic_search(embedding, self.leg_top_k["vector"],
+                                                similarity_threshold=RAG_SIMILARITY_THRESHOLDS[-1])
+        return [self._local_hit_row(hit) for hit in hits]
+    
+    def _local_lexical_leg(self, hypothesis: str, embedding: List[float]) -> List[tuple]:
+        """Keyword leg on the local index: BM25 over its rows, built on first use (blocking)"""
+        if self._local_bm25 is None:
+            with self._local_bm25_lock:
+                if self._local_bm25 is None:
+                    self._local_bm25 = BM25Index.from_local_index(self.local_index)
         
+        matches = self._local_bm25.search(hypothesis, self.leg_top_k["lexical"])
+        similarities = self.local_index.score_rows(embedding, [row for row, _ in matches])
+        rows = []
+        for (row, _), similarity in zip(matches, similarities):
+            hit = self.local_index.get_document(row)
+            hit["similarity"] = float(similarity)
+            rows.append(self._local_hit_row(hit))
+        return rows
+    
+    @staticmethod
+    def _local_hit_row(hit: Dict[str, Any]) -> tuple:
+        """Local index hit as a row shaped like the SQL results"""
+        return (hit["title"], hit["content"], hit["instrument"], hit["source_type"],
+                hit["date_published"], hit["similarity"])
+    
+    def _embed_query(self, text: str) -> List[float]:
+        """Embed the query through the shared cache (blocking)"""
+        return embed_query(self.embedder, text)
+    
+    @staticmethod
+    def _to_vector_literal(embedding: List[float]) -> str:
+        """Format an embedding as a pgvector literal"""
+        # repr() gives the shortest exact form of each float - serialized once per search
+        return '[' + ','.join(map(repr, map(float, embedding))) + ']'
+    
+    def _query_local_index(self, embedding: List[float], limit: int) -> List[tuple]:
+        """Nearest candidates from the in-process index, as rows shaped like the SQL results (blocking)"""
+        hits = self.local_index.semantic_search(embedding, limit * self.candidate_multiplier,
+                                                similarity_threshold=min(RAG_SIMILARITY_THRESHOLDS))
+        return self._select_candidates([self._local_hit_row(hit) for hit in hits], limit)
+    
+    def _query_similar_documents(self, conn, embedding_str: str, limit: int) -> List[tuple]:
+        """Run the similarity search against the documents table on a pooled connection (blocking)"""
+        if self.search_mode == "cascade":
+            return self._query_threshold_cascade(conn, embedding_str, limit)
+        return self._query_single_pass(conn, embedding_str, limit)
+    
+    def _query_single_pass(self, conn, embedding_str: str, limit: int) -> List[tuple]:
+        """One index-ordered query, thresholds applied client-side"""
+        candidates = self._nearest_candidates(conn, embedding_str, limit * self.candidate_multiplier)
+        return self._select_candidates(candidates, limit)
+    
+    @staticmethod
+    def _nearest_candidates(conn, embedding_str: str, count: int) -> List[tuple]:
+        """
+        The `count` nearest rows, nearest first (blocking).
+        
+        `ORDER BY embedding <=> $1 LIMIT n` is the only form the ivfflat/HNSW
+        index can serve; a similarity predicate in WHERE forces a full scan.
+        The vector is bound once and referenced by position. Rows come back
+        nearest first, so each threshold selects a prefix of the candidates.
+        """
+        cursor = conn.cursor()
         try:
-            # Fetch market data for each instrument
-            if self.market_data_tool:
-                for instrument in instruments[:3]:  # Limit to avoid rate limits
-                    try:
-                        print(f"   📊 Fetching market data for {instrument}")
-                        data = self.market_data_tool(instrument, "auto", self.project_id)
-                        market_data[instrument] = data
-                    except Exception as e:
-                        print(f"   ⚠️  Market data failed for {instrument}: {str(e)}")
-                        market_data[instrument] = {"error": str(e)}
-            
-            # Fetch recent news
-            if self.news_data_tool:
-                try:
-                    news_query = self._create_news_query(hypothesis)
-                    print(f"   📰 Fetching news for: {news_query}")
-                    news_data = self.news_data_tool(news_query, 7, self.project_id)
-                except Exception as e:
-                    print(f"   ⚠️  News fetch failed: {str(e)}")
-                    news_data = {"error": str(e)}
-            
-            return {
-                "market_data": market_data,
-                "news_data": news_data,
-                "instruments": instruments,
-                "timestamp": datetime.now().isoformat()
-            }
+            query = """
+                SELECT 
+                    title,
+                    content,
+                    instrument,
+                    source_type,
+                    date_published,
+                    1 - distance AS similarity
+                FROM (
+                    SELECT title, content, instrument, source_type, date_published,
+                           embedding <=> %s::vector AS distance
+                    FROM documents
+                    ORDER BY distance
+                    LIMIT %s
+                ) AS nearest;
+            """
             
+            cursor.execute(query, [embedding_str, count])
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+    
+    @staticmethod
+    def _select_candidates(candidates: List[tuple], limit: int) -> List[tuple]:
+        """Deduplicate nearest-first candidates and apply the threshold cascade"""
+        # Re-processed corpora can hold the same chunk several times - keep the first copy
+        unique_candidates = []
+        seen = set()
+        for row in candidates:
+            key = (row[0], row[1])
+            if key not in seen:
+                seen.add(key)
+                unique_candidates.append(row)
+        
+        for threshold in RAG_SIMILARITY_THRESHOLDS:
+            results = [row for row in unique_candidates if row[5] >= threshold][:limit]
+            if results:
+                print(f"   Found {len(results)} results with threshold {threshold}")
+                return results
+        
+        return []
+    
+    def _query_threshold_cascade(self, conn, embedding_str: str, limit: int) -> List[tuple]:
+        """Previous retrieval: one filtered query per threshold until something matches"""
+        for threshold in RAG_SIMILARITY_THRESHOLDS:
+            cursor = conn.cursor()
+            try:
+                query = """
+                    SELECT 
+                        title,
+                        content,
+                        instrument,
+                        source_type,
+                        date_published,
+                        1 - (embedding <=> %s) AS similarity
+                    FROM documents
+                    WHERE 1 - (embedding <=> %s) >= %s
+                    ORDER BY embedding <=> %s
+                    LIMIT %s;
+                """
+                
+                cursor.execute(query, [embedding_str, embedding_str, threshold, embedding_str, limit])
+                results = cursor.fetchall()
+                
+                if results:
+                    print(f"   Found {len(results)} results with threshold {threshold}")
+                    return results
+                    
+            finally:
+                cursor.close()
+        
+        return []
+    
+    async def _fetch_market_data(self, instrument: str) -> Dict[str, Any]:
+        """Fetch market data for one instrument in a worker thread"""
+        try:
+            print(f"   📊 Fetching market data for {instrument}")
+            return await asyncio.to_thread(self.market_data_tool, instrument, "auto", self.project_id)
+        except Exception as e:
+            print(f"   ⚠️  Market data failed for {instrument}: {str(e)}")
+            return {"error": str(e)}
+    
+    async def _fetch_news(self, hypothesis: str) -> Dict[str, Any]:
+        """Fetch recent news for the hypothesis in a worker thread"""
+        try:
+            news_query = self._create_news_query(hypothesis)
+            print(f"   📰 Fetching news for: {news_query}")
+            return await asyncio.to_thread(self.news_data_tool, news_query, 7, self.project_id)
         except Exception as e:
-            print(f"❌ Real-time search error: {str(e)}")
-            return {"market_data": {}, "news_data": {}, "error": str(e)}
+            print(f"   ⚠️  News fetch failed: {str(e)}")
+            return {"error": str(e)}
     
     def _merge_results(self, rag_results: Dict, real_time_results: Dict, hypothesis: str) -> Dict[str, Any]:
         """Intelligently merge RAG and real-time results"""
@@ -379,23 +602,25 @@ class HybridRAGService:
     
     def close(self):
         """Close database connections"""
-        if self.connection:
-            self.connection.close()
-        if self.connector:
-            self.connector.close()
+        if self.db_pool:
+            self.db_pool.close()
 
 # Singleton instance
 _hybrid_rag_service = None
+_hybrid_rag_service_lock = threading.Lock()
 
 def get_hybrid_rag_service() -> HybridRAGService:
     """Get or create the hybrid RAG service singleton"""
     global _hybrid_rag_service
     if _hybrid_rag_service is None:
-        _hybrid_rag_service = HybridRAGService()
+        with _hybrid_rag_service_lock:
+            if _hybrid_rag_service is None:
+                _hybrid_rag_service = HybridRAGService()
     return _hybrid_rag_service
 
 # Convenience function for async usage
-async def hybrid_research(hypothesis: str, instruments: List[str] = None) -> Dict[str, Any]:
+async def hybrid_research(hypothesis: str, instruments: List[str] = None,
+                          deadline: float = RESEARCH_DEADLINE) -> Dict[str, Any]:
     """Convenience function for hybrid research"""
     service = get_hybrid_rag_service()
-    return await service.hybrid_research(hypothesis, instruments)
+    return await service.hybrid_research(hypothesis, instruments, deadline)
@@ -0,0 +1,134 @@
+# app/services/lexical_search.py - Keyword retrieval over the documents corpus (PostgreSQL full text or local BM25)
+import heapq
+import math
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Stored generated column holding the parsed title + content: written once per row change, so
+# ranking reads it instead of re-parsing every matching row on every query
+DOCUMENT_TSVECTOR = "search_tsv"
+DOCUMENT_TSVECTOR_EXPRESSION = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(content, ''))"
+
+# One statement each (pg8000 runs a single statement per execute)
+LEXICAL_SCHEMA_SQL = [
+    f"""
+    ALTER TABLE documents ADD COLUMN IF NOT EXISTS {DOCUMENT_TSVECTOR} tsvector
+    GENERATED ALWAYS AS ({DOCUMENT_TSVECTOR_EXPRESSION}) STORED;
+    """,
+    # Expression index of earlier schemas, superseded by the column index
+    "DROP INDEX IF EXISTS idx_documents_fts;",
+    f"""
+    CREATE INDEX IF NOT EXISTS idx_documents_search_tsv
+    ON documents USING gin ({DOCUMENT_TSVECTOR});
+    """,
+]
+
+# Tickers, filing names and numbers survive as single tokens: aapl, 10-q, brk.b, s&p
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-.&][a-z0-9]+)*")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it",
+    "its", "of", "on", "or", "that", "the", "this", "to", "was", "were", "will", "with", "would"
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens without stopwords"""
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def query_lexical_documents(conn, query_text: str, embedding_str: str, limit: int) -> List[tuple]:
+    """
+    Full-text match against the documents table, best ts_rank_cd first (blocking).
+
+    Query terms are OR-ed so a long hypothesis still matches documents
+    containing only some of its words. Rows have the same shape as the
+    vector search rows, including the cosine similarity to the query
+    embedding, so both legs can be fused and displayed alike.
+    """
+    if not tokenize(query_text):
+        return []
+
+    cursor = conn.cursor()
+    try:
+        query = f"""
+            SELECT
+                title,
+                content,
+                instrument,
+                source_type,
+                date_published,
+                1 - (embedding <=> %s::vector) AS similarity
+            FROM (
+                SELECT title, content, instrument, source_type, date_published, embedding,
+                       ts_rank_cd({DOCUMENT_TSVECTOR}, q.terms) AS rank
+                FROM documents,
+                     (SELECT replace(plainto_tsquery('english', %s)::text, '&', '|')::tsquery AS terms) AS q
+                WHERE {DOCUMENT_TSVECTOR} @@ q.terms
+                ORDER BY rank DESC
+                LIMIT %s
+            ) AS matches
+            ORDER BY rank DESC;
+        """
+
+        cursor.execute(query, [embedding_str, query_text, limit])
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+class BM25Index:
+    """
+    In-memory Okapi BM25 over integer document ids (0, 1, 2, ... in insertion order).
+
+    Used as the lexical leg when retrieval runs from the local vector
+    index, where ids are the index rows.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_lengths: List[int] = []
+        self._total_length = 0
+
+    def add(self, text: str) -> int:
+        """Index one document; returns its id"""
+        doc_id = len(self.doc_lengths)
+        tokens = tokenize(text)
+        for token in tokens:
+            counts = self.postings.setdefault(token, {})
+            counts[doc_id] = counts.get(doc_id, 0) + 1
+        self.doc_lengths.append(len(tokens))
+        self._total_length += len(tokens)
+        return doc_id
+
+    def search(self, query_text: str, limit: int = 10,
+               allowed: Optional[Callable[[int], bool]] = None) -> List[Tuple[int, float]]:
+        """(doc id, score) pairs, best first; `allowed` filters ids"""
+        count = len(self.doc_lengths)
+        if not count:
+            return []
+        average_length = self._total_length / count or 1.0
+
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query_text)):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        candidates = scores.items() if allowed is None else \
+            ((doc_id, score) for doc_id, score in scores.items() if allowed(doc_id))
+        return heapq.nlargest(limit, candidates, key=lambda item: item[1])
+
+    @classmethod
+    def from_local_index(cls, local_index) -> "BM25Index":
+        """Index title + content of every row of a LocalVectorIndex (ids are its rows)"""
+        bm25 = cls()
+        for row in range(local_index.meta["count"]):
+            doc = local_index.get_document(row)
+            bm25.add(f"{doc.get('title') or ''} {doc.get('content') or ''}")
+        return bm25
@@ -0,0 +1,320 @@
+# app/services/local_vector_index.py - In-process IVF vector index persisted as memory-mapped NumPy files
+import glob
+import json
+import mmap
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+INDEX_FORMAT_VERSION = 1
+EXACT_SEARCH_MAX_ROWS = 4096     # Up to this size one flat scan is already sub-millisecond
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 64      # Training points per inverted list
+
+# Files making up an index directory
+META_FILE = "index_meta.json"
+VECTORS_FILE = "vectors.npy"
+CENTROIDS_FILE = "centroids.npy"
+OFFSETS_FILE = "list_offsets.npy"
+INSTRUMENTS_FILE = "instrument_codes.npy"
+SOURCES_FILE = "source_codes.npy"
+DOCUMENTS_FILE = "documents.jsonl"
+DOC_OFFSETS_FILE = "document_offsets.npy"
+
+DOCUMENT_FIELDS = ["id", "title", "content", "instrument", "source_type", "file_path", "date_published", "metadata"]
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _train_centroids(vectors: np.ndarray, nlist: int, seed: int) -> np.ndarray:
+    """Spherical k-means on a sample of the (unit-length) vectors"""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), nlist * KMEANS_SAMPLE_PER_LIST)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        empty = np.bincount(assignment, minlength=nlist) == 0
+        if empty.any():
+            # Re-seed empty lists with random points so every list stays in use
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+        centroids = _normalize(sums)
+
+    return centroids.astype(np.float32)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+    assignment = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), batch_size):
+        assignment[start:start + batch_size] = np.argmax(vectors[start:start + batch_size] @ centroids.T, axis=1)
+    return assignment
+
+
+class LocalVectorIndex:
+    """
+    Approximate nearest-neighbour index over the corpus embeddings (IVF-flat).
+
+    Vectors are clustered into `nlist` inverted lists by spherical k-means
+    and stored unit-length, grouped by list, so each list is a contiguous
+    slice of a memory-mapped float32 matrix. A search scores the centroids,
+    scans the `nprobe` closest lists with one matrix-vector product each and
+    only reads document metadata for the final hits. Small corpora use a
+    single list, i.e. exact search.
+
+    `semantic_search` takes the same arguments as
+    `CloudSQLVectorDB.semantic_search` and returns rows with the same keys,
+    so it can stand in for pgvector offline, in tests or on edge nodes.
+    """
+
+    def __init__(self, path: str, nprobe: Optional[int] = None):
+        self.path = path
+        with open(os.path.join(path, META_FILE), "r") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported local index version {self.meta.get('version')} in {path}")
+
+        self.vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r")
+        self.centroids = np.load(os.path.join(path, CENTROIDS_FILE))
+        self.offsets = np.load(os.path.join(path, OFFSETS_FILE))
+        self.instrument_codes = np.load(os.path.join(path, INSTRUMENTS_FILE), mmap_mode="r")
+        self.source_codes = np.load(os.path.join(path, SOURCES_FILE), mmap_mode="r")
+        self.doc_offsets = np.load(os.path.join(path, DOC_OFFSETS_FILE), mmap_mode="r")
+
+        self.instruments = {name: code for code, name in enumerate(self.meta["instruments"])}
+        self.sources = {name: code for code, name in enumerate(self.meta["source_types"])}
+        self.nlist = len(self.offsets) - 1
+        self.nprobe = min(nprobe or self.meta["nprobe"], self.nlist)
+
+        self._documents_file = open(os.path.join(path, DOCUMENTS_FILE), "rb")
+        self._documents = mmap.mmap(self._documents_file.fileno(), 0, access=mmap.ACCESS_READ) \
+            if os.path.getsize(os.path.join(path, DOCUMENTS_FILE)) else b""
+
+    @classmethod
+    def build(cls, documents: List[Dict[str, Any]], embeddings: Sequence[Sequence[float]], path: str,
+              nlist: Optional[int] = None, nprobe: Optional[int] = None, seed: int = 0) -> "LocalVectorIndex":
+        """Build an index from documents and their embeddings (same order) and write it to `path`"""
+        if len(documents) != len(embeddings):
+            raise ValueError("documents and embeddings must have the same length")
+        if not documents:
+            raise ValueError("Cannot build an index without documents")
+
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+        count, dim = vectors.shape
+
+        if nlist is None:
+            nlist = 1 if count <= EXACT_SEARCH_MAX_ROWS else int(round(4 * np.sqrt(count)))
+        nlist = max(1, min(nlist, count))
+        if nprobe is None:
+            nprobe = max(1, int(round(np.sqrt(nlist))))
+
+        if nlist > 1:
+            centroids = _train_centroids(vectors, nlist, seed)
+            assignment = _assign(vectors, centroids)
+        else:
+            centroids = _normalize(vectors.mean(axis=0, keepdims=True)).astype(np.float32)
+            assignment = np.zeros(count, dtype=np.int64)
+
+        # Group rows by list so each list is one contiguous slice
+        order = np.argsort(assignment, kind="stable")
+        list_sizes = np.bincount(assignment, minlength=nlist)
+        offsets = np.concatenate([[0], np.cumsum(list_sizes)]).astype(np.int64)
+
+        ordered_docs = [documents[i] for i in order]
+        instruments = sorted({str(doc.get("instrument") or "unknown") for doc in ordered_docs})
+        source_types = sorted({str(doc.get("source_type") or "unknown") for doc in ordered_docs})
+        instrument_ids = {name: code for code, name in enumerate(instruments)}
+        source_ids = {name: code for code, name in enumerate(source_types)}
+
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, VECTORS_FILE), vectors[order])
+        np.save(os.path.join(path, CENTROIDS_FILE), centroids)
+        np.save(os.path.join(path, OFFSETS_FILE), offsets)
+        np.save(os.path.join(path, INSTRUMENTS_FILE), np.array(
+            [instrument_ids[str(doc.get("instrument") or "unknown")] for doc in ordered_docs], dtype=np.int32))
+        np.save(os.path.join(path, SOURCES_FILE), np.array(
+            [source_ids[str(doc.get("source_type") or "unknown")] for doc in ordered_docs], dtype=np.int32))
+
+        doc_offsets = [0]
+        with open(os.path.join(path, DOCUMENTS_FILE), "wb") as f:
+            for doc in ordered_docs:
+                row = {field: doc.get(field) for field in DOCUMENT_FIELDS}
+                if row["date_published"] is None:
+                    row["date_published"] = doc.get("date")
+                f.write(json.dumps(row, default=str).encode("utf-8") + b"\n")
+                doc_offsets.append(f.tell())
+        np.save(os.path.join(path, DOC_OFFSETS_FILE), np.array(doc_offsets, dtype=np.int64))
+
+        # Metadata last: a half-written index directory cannot be opened
+        with open(os.path.join(path, META_FILE), "w") as f:
+            json.dump({
+                "version": INDEX_FORMAT_VERSION,
+                "count": int(count),
+                "dim": int(dim),
+                "nlist": int(nlist),
+                "nprobe": int(nprobe),
+                "instruments": instruments,
+                "source_types": source_types
+            }, f, indent=2)
+
+        print(f"✅ Built local vector index: {count} vectors, dim {dim}, {nlist} lists -> {path}")
+        return cls(path)
+
+    @classmethod
+    def from_corpus_output(cls, corpus_dir: str, path: str, uid: Optional[str] = None,
+                           **build_kwargs) -> "LocalVectorIndex":
+        """
+        Build from a corpus processor run: processed_corpus/embeddings_<uid>.jsonl
+        ({"id", "embedding"} per line) joined by id with documents_<uid>.jsonl.
+        Uses the most recent run unless `uid` is given.
+        """
+        if uid is None:
+            runs = sorted(glob.glob(os.path.join(corpus_dir, "embeddings_*.jsonl")))
+            if not runs:
+                raise FileNotFoundError(f"No embeddings_*.jsonl files in {corpus_dir}")
+            uid = os.path.basename(runs[-1])[len("embeddings_"):-len(".jsonl")]
+
+        embeddings_by_id: Dict[str, List[float]] = {}
+        with open(os.path.join(corpus_dir, f"embeddings_{uid}.jsonl"), "r") as f:
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    embeddings_by_id[str(item["id"])] = item["embedding"]
+
+        documents, embeddings = [], []
+        with open(os.path.join(corpus_dir, f"documents_{uid}.jsonl"), "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                doc = json.loads(line)
+                embedding = embeddings_by_id.get(str(doc.get("id"))) or doc.get("embedding")
+                if embedding:
+                    documents.append(doc)
+                    embeddings.append(embedding)
+
+        print(f"📄 Corpus run {uid}: {len(documents)} documents with embeddings")
+        return cls.build(documents, embeddings, path, **build_kwargs)
+
+    def get_document(self, row: int) -> Dict[str, Any]:
+        """Read one document's metadata straight from the mapped JSONL file"""
+        start, end = int(self.doc_offsets[row]), int(self.doc_offsets[row + 1])
+        return json.loads(self._documents[start:end])
+
+    def score_rows(self, query_embedding, rows: Sequence[int]) -> np.ndarray:
+        """Cosine similarity of the query to specific rows, e.g. hits found by another retriever"""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0 or not len(rows):
+            return np.zeros(len(rows), dtype=np.float32)
+        return self.vectors[np.asarray(rows, dtype=np.int64)] @ (query / norm)
+
+    def _scan_lists(self, lists: Sequence[int], query: np.ndarray, threshold: float,
+                    instrument_code: Optional[int], source_code: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+        rows_found, sims_found = [], []
+        for list_id in lists:
+            start, end = int(self.offsets[list_id]), int(self.offsets[list_id + 1])
+            if start == end:
+                continue
+            sims = self.vectors[start:end] @ query
+            keep = sims >= threshold
+            if instrument_code is not None:
+                keep &= self.instrument_codes[start:end] == instrument_code
+            if source_code is not None:
+                keep &= self.source_codes[start:end] == source_code
+            rows_found.append(np.nonzero(keep)[0] + start)
+            sims_found.append(sims[keep])
+        if not rows_found:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return np.concatenate(rows_found), np.concatenate(sims_found)
+
+    def semantic_search(self, query_embedding, limit=10, instrument_filter=None,
+                        source_filter=None, similarity_threshold=0.7) -> List[Dict[str, Any]]:
+        """Nearest documents by cosine similarity, optionally filtered by instrument / source type"""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0 or limit <= 0:
+            return []
+        query = query / norm
+
+        instrument_code = source_code = None
+        if instrument_filter:
+            instrument_code = self.instruments.get(instrument_filter)
+            if instrument_code is None:
+                return []
+        if source_filter:
+            source_code = self.sources.get(source_filter)
+            if source_code is None:
+                return []
+        threshold = similarity_threshold if similarity_threshold else -np.inf
+
+        if self.nlist == 1:
+            list_order = np.zeros(1, dtype=np.int64)
+        else:
+            list_order = np.argsort(-(self.centroids @ query))
+
+        # Filtered searches widen the probe until enough matches are found
+        filtered = instrument_code is not None or source_code is not None
+        probed, nprobe = 0, self.nprobe
+        rows, sims = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        while probed < self.nlist:
+            new_rows, new_sims = self._scan_lists(list_order[probed:nprobe], query, threshold,
+                                                  instrument_code, source_code)
+            rows, sims = np.concatenate([rows, new_rows]), np.concatenate([sims, new_sims])
+            probed = nprobe
+            if len(rows) >= limit or not filtered:
+                break
+            nprobe = min(self.nlist, nprobe * 2)
+
+        if len(rows) > limit:
+            top = np.argpartition(-sims, limit - 1)[:limit]
+            rows, sims = rows[top], sims[top]
+        best_first = np.argsort(-sims)
+
+        results = []
+        for row, similarity in zip(rows[best_first], sims[best_first]):
+            doc = self.get_document(int(row))
+            doc["similarity"] = float(similarity)
+            results.append(doc)
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Index size and layout"""
+        return {
+            "total_documents": self.meta["count"],
+            "dimension": self.meta["dim"],
+            "lists": self.nlist,
+            "nprobe": self.nprobe,
+            "unique_instruments": len(self.instruments),
+            "unique_sources": len(self.sources)
+        }
+
+    def close(self):
+        if isinstance(self._documents, mmap.mmap):
+            self._documents.close()
+        self._documents_file.close()
+
+
+# Singleton instance
+_local_vector_index = None
+_local_vector_index_lock = threading.Lock()
+
+
+def get_local_vector_index() -> Optional[LocalVectorIndex]:
+    """Open the index at LOCAL_VECTOR_INDEX_PATH once per process (None when unset)"""
+    global _local_vector_index
+    path = os.getenv("LOCAL_VECTOR_INDEX_PATH")
+    if not path:
+        return None
+    if _local_vector_index is None:
+        with _local_vector_index_lock:
+            if _local_vector_index is None:
+                _local_vector_index = LocalVectorIndex(path)
+    return _local_vector_index
@@ -5,6 +5,7 @@ import os
 import time
 import json
 from datetime import datetime, timedelta
+from app.utils.rate_limiter import get_rate_limiter
 
 class MarketDataService:
     def __init__(self):
@@ -16,6 +17,11 @@ class MarketDataService:
         self._cache = {}
         self._cache_duration = 300  # 5 minutes
         
+        # Shared per-provider token buckets; if a provider has no budget left
+        # within this many seconds we fall through to the next source
+        self._rate_limiter = get_rate_limiter()
+        self._rate_limit_wait = float(os.getenv("MARKET_DATA_RATE_LIMIT_WAIT", "2"))
+        
         print("Market data service initialized with:")
         print(f"- Alpha Vantage API key: {'Available' if self.alpha_vantage_key else 'Not found'}")
         print(f"- FMP API key: {'Available' if self.fmp_key else 'Not found'}")
@@ -101,8 +107,15 @@ class MarketDataService:
         print(f"❌ Failed to fetch data for {symbol}: {all_errors}")
         return error_response
     
+    def _acquire(self, provider, display_name):
+        """Take a request token for `provider` or fail fast so the next source is tried"""
+        if not self._rate_limiter.acquire(provider, timeout=self._rate_limit_wait):
+            raise Exception(f"{display_name} request budget exhausted (local rate limit)")
+    
     def _fetch_alpha_vantage(self, symbol):
         """Fetch data from Alpha Vantage API"""
+        self._acquire("alpha_vantage", "Alpha Vantage")
+        
         params = {
             'function': 'GLOBAL_QUOTE',
             'symbol': symbol,
@@ -165,6 +178,8 @@ class MarketDataService:
     
     def _fetch_fmp(self, symbol):
         """Fetch data from Financial Modeling Prep API"""
+        self._acquire("fmp", "FMP")
+        
         url = f"https://financialmodelingprep.com/api/v3/quote/{symbol}"
         params = {'apikey': self.fmp_key}
         
@@ -231,6 +246,8 @@ class MarketDataService:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
         
+        self._acquire("yahoo_finance", "Yahoo Finance")
+        
         try:
             url = f"https://finance.yahoo.com/quote/{yahoo_symbol}"
             response = requests.get(url, headers=headers, timeout=15)
@@ -350,9 +367,6 @@ class MarketDataService:
                 data = self.get_stock_data(symbol)
                 results[symbol] = data
                 
-                # Add small delay to avoid rate limiting
-                time.sleep(0.1)
-                
             except Exception as e:
                 results[symbol] = {
                     'instrument': symbol,
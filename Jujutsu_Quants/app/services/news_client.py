@@ -0,0 +1,210 @@
+# app/services/news_client.py - Cached, concurrent Alpha Vantage news client
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple, Union
+
+import httpx
+
+from app.utils.rate_limiter import RateLimitScheduler, get_rate_limiter
+
+ALPHA_VANTAGE_URL = "https://www.alphavantage.co/query"
+
+NEWS_API_CACHE_TTL = float(os.getenv("NEWS_API_CACHE_TTL", "300"))   # Upstream feed refreshes every few minutes
+NEWS_API_PAGE_SIZE = int(os.getenv("NEWS_API_PAGE_SIZE", "50"))
+NEWS_API_MAX_PAGES = int(os.getenv("NEWS_API_MAX_PAGES", "3"))
+NEWS_API_TIMEOUT = float(os.getenv("NEWS_API_TIMEOUT", "10"))        # Per HTTP request
+NEWS_API_DEADLINE = float(os.getenv("NEWS_API_DEADLINE", "20"))      # Whole multi-topic lookup
+NEWS_API_WORKERS = int(os.getenv("NEWS_API_WORKERS", "4"))
+
+# Topics accepted by the NEWS_SENTIMENT endpoint
+VALID_TOPICS = {
+    "blockchain", "earnings", "ipo", "mergers_and_acquisitions", "financial_markets",
+    "economy_fiscal", "economy_monetary", "economy_macro", "energy_transportation",
+    "finance", "life_sciences", "manufacturing", "real_estate", "retail_wholesale", "technology"
+}
+
+# Free-text query words mapped onto topics
+TOPIC_KEYWORDS = {
+    "bitcoin": "blockchain", "btc": "blockchain", "crypto": "blockchain",
+    "cryptocurrency": "blockchain", "ethereum": "blockchain",
+    "oil": "energy_transportation", "crude": "energy_transportation", "energy": "energy_transportation",
+    "gas": "energy_transportation", "opec": "energy_transportation",
+    "market": "financial_markets", "markets": "financial_markets", "stocks": "financial_markets",
+    "financial": "financial_markets",
+    "fed": "economy_monetary", "rates": "economy_monetary", "monetary": "economy_monetary",
+    "inflation": "economy_macro", "gdp": "economy_macro", "economy": "economy_macro",
+    "tax": "economy_fiscal", "fiscal": "economy_fiscal",
+    "merger": "mergers_and_acquisitions", "acquisition": "mergers_and_acquisitions",
+    "tech": "technology", "ai": "technology", "bank": "finance", "banks": "finance",
+    "housing": "real_estate", "retail": "retail_wholesale", "pharma": "life_sciences",
+}
+DEFAULT_TOPIC = "financial_markets"
+
+AV_TIME_FORMAT = "%Y%m%dT%H%M"
+
+
+def normalize_topics(query: Union[str, List[str]]) -> List[str]:
+    """Turn a topic list or free-text query into valid NEWS_SENTIMENT topics (in order, no duplicates)"""
+    words = re.split(r"[,\s]+", query.lower()) if isinstance(query, str) else [t.lower() for t in query]
+    topics: List[str] = []
+    for word in words:
+        topic = word if word in VALID_TOPICS else TOPIC_KEYWORDS.get(word)
+        if topic and topic not in topics:
+            topics.append(topic)
+    return topics or [DEFAULT_TOPIC]
+
+
+class NewsClient:
+    """
+    Alpha Vantage NEWS_SENTIMENT client.
+
+    Each topic is fetched concurrently with server-side `time_from`
+    filtering, newest first, paging backwards with `time_to` until enough
+    articles are found. Per-topic results are cached for `ttl` seconds keyed
+    by (topic, days), so overlapping topic sets share cache entries, and
+    concurrent requests for the same topic wait on a single upstream call.
+    """
+
+    def __init__(self, ttl: float = NEWS_API_CACHE_TTL, page_size: int = NEWS_API_PAGE_SIZE,
+                 max_pages: int = NEWS_API_MAX_PAGES, timeout: float = NEWS_API_TIMEOUT,
+                 max_workers: int = NEWS_API_WORKERS, rate_limiter: Optional[RateLimitScheduler] = None,
+                 transport: Optional[httpx.BaseTransport] = None):
+        self.ttl = ttl
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self._http = httpx.Client(timeout=timeout, transport=transport)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="news-api")
+        # (topic, days) -> (expires_at, articles, exhausted)
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[Dict], bool]] = {}
+        self._inflight: Dict[Tuple[str, int], Future] = {}
+        self._lock = threading.Lock()
+
+    def _fetch_page(self, topic: str, api_key: str, time_from: str, time_to: Optional[str]) -> List[Dict]:
+        if not self.rate_limiter.acquire("alpha_vantage", timeout=5):
+            raise RuntimeError("Alpha Vantage request budget exhausted")
+
+        params = {
+            "function": "NEWS_SENTIMENT",
+            "topics": topic,
+            "time_from": time_from,
+            "sort": "LATEST",
+            "limit": self.page_size,
+            "apikey": api_key
+        }
+        if time_to:
+            params["time_to"] = time_to
+
+        response = self._http.get(ALPHA_VANTAGE_URL, params=params)
+        response.raise_for_status()
+        data = response.json()
+        if "feed" not in data:
+            # Quota and input errors come back as 200 with a message instead of a feed
+            raise RuntimeError(data.get("Information") or data.get("Note") or data.get("Error Message")
+                               or "No news data found")
+        return data["feed"]
+
+    def _fetch_topic(self, topic: str, days: int, wanted: int, api_key: str) -> Tuple[List[Dict], bool]:
+        """Page backwards through a topic's window; returns (articles, exhausted)"""
+        time_from = (datetime.now() - timedelta(days=days)).strftime(AV_TIME_FORMAT)
+        time_to = None
+        articles: Dict[str, Dict] = {}
+
+        for _ in range(self.max_pages):
+            page = self._fetch_page(topic, api_key, time_from, time_to)
+            for article in page:
+                articles.setdefault(article.get("url") or article.get("title", ""), article)
+            if len(page) < self.page_size:
+                return list(articles.values()), True
+            if len(articles) >= wanted:
+                break
+
+            # Next page ends at the oldest article seen (same minute overlaps, deduplicated by URL)
+            oldest = min(article.get("time_published", "") for article in page)[:13]
+            if not oldest or oldest == time_to or oldest <= time_from:
+                break
+            time_to = oldest
+
+        return list(articles.values()), False
+
+    def _load_topic(self, key: Tuple[str, int], wanted: int, api_key: str) -> List[Dict]:
+        try:
+            articles, exhausted = self._fetch_topic(key[0], key[1], wanted, api_key)
+            with self._lock:
+                self._cache[key] = (time.monotonic() + self.ttl, articles, exhausted)
+            return articles
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _topic_future(self, topic: str, days: int, wanted: int, api_key: str) -> Future:
+        key = (topic, days)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached:
+                expires_at, articles, exhausted = cached
+                if time.monotonic() < expires_at and (exhausted or len(articles) >= wanted):
+                    future: Future = Future()
+                    future.set_result(articles)
+                    return future
+
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._pool.submit(self._load_topic, key, wanted, api_key)
+                self._inflight[key] = future
+            return future
+
+    def get_news(self, topics: Union[str, List[str]], days: int, api_key: str,
+                 limit: int = 10, deadline: float = NEWS_API_DEADLINE) -> Dict:
+        """
+        Latest articles across `topics` published within `days`, newest first.
+
+        Topics that fail or miss the deadline are reported under "errors";
+        the articles of the others are still returned.
+        """
+        topic_list = normalize_topics(topics)
+        futures = {topic: self._topic_future(topic, days, limit, api_key) for topic in topic_list}
+        wait(list(futures.values()), timeout=deadline)
+
+        merged: Dict[str, Dict] = {}
+        errors: Dict[str, str] = {}
+        for topic, future in futures.items():
+            if not future.done():
+                errors[topic] = "timed out"
+                continue
+            if future.exception():
+                errors[topic] = str(future.exception())
+                continue
+            for article in future.result():
+                merged.setdefault(article.get("url") or article.get("title", ""), article)
+
+        articles = sorted(merged.values(), key=lambda a: a.get("time_published", ""), reverse=True)
+        return {
+            "topics": topic_list,
+            "articles": articles[:limit],
+            "errors": errors
+        }
+
+    def clear_cache(self):
+        """Clear the cache - useful for testing"""
+        with self._lock:
+            self._cache.clear()
+
+
+# Singleton instance
+_news_client = None
+_news_client_lock = threading.Lock()
+
+
+def get_news_client() -> NewsClient:
+    """Get or create the shared news client"""
+    global _news_client
+    if _news_client is None:
+        with _news_client_lock:
+            if _news_client is None:
+                _news_client = NewsClient()
+    return _news_client
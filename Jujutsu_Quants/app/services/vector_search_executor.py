@@ -0,0 +1,241 @@
+# app/services/vector_search_executor.py - Hedged, self-tuning find_neighbors calls against Vertex AI Vector Search
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+VECTOR_SEARCH_HEDGE_MS = float(os.getenv("VECTOR_SEARCH_HEDGE_MS", "400"))      # Latency budget before hedging
+VECTOR_SEARCH_HEDGE_PERCENTILE = 95      # Once enough latencies are seen, the budget follows this percentile
+VECTOR_SEARCH_HEDGE_MIN_SAMPLES = 20
+VECTOR_SEARCH_POSTFILTER_OVERFETCH = int(os.getenv("VECTOR_SEARCH_POSTFILTER_OVERFETCH", "4"))
+# Anchored to the project directory, so every working directory shares the learned strategies
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+VECTOR_SEARCH_STRATEGY_CACHE = (os.getenv("VECTOR_SEARCH_STRATEGY_CACHE")
+                                or os.path.join(PROJECT_DIR, ".cache", "vector_search_strategies.json"))
+
+# (name, extra find_neighbors arguments, filters sent as restricts)
+STRATEGIES = [
+    ("Basic Query", {}, True),
+    ("Alternative Parameter Format", {"return_full_datapoint": False}, True),
+    # For indexes built without restricts: over-fetch, filter client-side
+    ("Post-filtered Query", {}, False),
+]
+
+_cache_lock = threading.Lock()
+
+
+def neighbor_id(neighbor: Any) -> str:
+    return getattr(neighbor, "id", str(neighbor))
+
+
+def response_neighbors(response: Any) -> List[Any]:
+    """Neighbours of the first query, whichever response shape the SDK version returns"""
+    if isinstance(response, list) and response:
+        return list(response[0] or [])
+    neighbors = getattr(response, "neighbors", None)
+    if neighbors:
+        return list(neighbors[0] if isinstance(neighbors, list) and isinstance(neighbors[0], list) else neighbors)
+    return []
+
+
+class HedgedQueryExecutor:
+    """
+    Runs `find_neighbors` for one deployed index with the strategy that
+    last worked for it, and only falls back or hedges when needed.
+
+    The preferred strategy is tried first. If it errors, the next one
+    starts at once; if it is merely slow - past the latency budget
+    (VECTOR_SEARCH_HEDGE_MS, then the observed p95) - the next one is
+    fired alongside and the first non-empty answer wins. An empty answer
+    ends the search: other request formats would return the same. The
+    winner becomes the deployment's preference and is saved to
+    VECTOR_SEARCH_STRATEGY_CACHE, so later processes start with it.
+
+    Filters go to the server as restricts. When a filtered search finds
+    nothing but a post-filtered one does, the index has no restricts (e.g.
+    built by the "fixed" processor); that is remembered too and later
+    filtered searches go straight to over-fetch + client-side filtering.
+    """
+
+    def __init__(self, endpoint, deployed_index_id: str, deployment_key: Optional[str] = None,
+                 hedge_after_ms: float = VECTOR_SEARCH_HEDGE_MS, cache_path: Optional[str] = VECTOR_SEARCH_STRATEGY_CACHE,
+                 max_workers: int = 4):
+        self.endpoint = endpoint
+        self.deployed_index_id = deployed_index_id
+        self.deployment_key = deployment_key or deployed_index_id
+        self.hedge_after = hedge_after_ms / 1000
+        self.cache_path = cache_path
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vector-search")
+        self._latencies = deque(maxlen=200)
+        self._lock = threading.Lock()
+        self.state = self._load_state()
+        self.stats = {"queries": 0, "hedged": 0, "fallbacks": 0, "failed": 0,
+                      "wins": {name: 0 for name, _, _ in STRATEGIES}}
+
+    # Learned state
+
+    def _load_state(self) -> Dict[str, Any]:
+        state = {"strategy": STRATEGIES[0][0], "restricts": None}
+        if self.cache_path and os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path, "r") as f:
+                    state.update(json.load(f).get(self.deployment_key, {}))
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Ignoring vector search strategy cache: {str(e)}")
+        return state
+
+    def _save_state(self):
+        if not self.cache_path:
+            return
+        with _cache_lock:
+            try:
+                cache = {}
+                if os.path.exists(self.cache_path):
+                    with open(self.cache_path, "r") as f:
+                        cache = json.load(f)
+                cache[self.deployment_key] = self.state
+                directory = os.path.dirname(self.cache_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(f"{self.cache_path}.tmp", "w") as f:
+                    json.dump(cache, f, indent=2)
+                os.replace(f"{self.cache_path}.tmp", self.cache_path)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Could not save vector search strategy cache: {str(e)}")
+
+    def _learn(self, **changes):
+        with self._lock:
+            changed = any(self.state.get(key) != value for key, value in changes.items())
+            self.state.update(changes)
+        if changed:
+            self._save_state()
+
+    def hedge_budget(self) -> float:
+        """Seconds to wait for a strategy before hedging"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < VECTOR_SEARCH_HEDGE_MIN_SAMPLES:
+            return self.hedge_after
+        return latencies[min(len(latencies) - 1, len(latencies) * VECTOR_SEARCH_HEDGE_PERCENTILE // 100)]
+
+    # Execution
+
+    def _order(self, filters: Dict[str, str]) -> List[Tuple[str, Dict[str, Any], bool]]:
+        strategies = [strategy for strategy in STRATEGIES if filters or strategy[2]]
+        preferred = [strategy for strategy in strategies if strategy[0] == self.state.get("strategy")]
+        order = preferred + [strategy for strategy in strategies if strategy not in preferred]
+        if filters and self.state.get("restricts") is False:
+            # Known index without restricts: server-side filters can only come back empty
+            order = [strategy for strategy in order if not strategy[2]]
+        return order
+
+    def _call(self, strategy, embedding, num_neighbors: int, filters: Dict[str, str],
+              post_filter: Optional[Callable[[List[Any]], List[Any]]]):
+        name, extra, server_filter = strategy
+        params = {"deployed_index_id": self.deployed_index_id, "queries": [embedding],
+                  "num_neighbors": num_neighbors, **extra}
+        if filters and server_filter:
+            params["restricts"] = [{"namespace": namespace, "allow": [value]} for namespace, value in filters.items()]
+        elif filters:
+            params["num_neighbors"] = num_neighbors * VECTOR_SEARCH_POSTFILTER_OVERFETCH
+
+        started = time.monotonic()
+        neighbors = response_neighbors(self.endpoint.find_neighbors(**params))
+        elapsed = time.monotonic() - started
+        if filters and not server_filter and post_filter is not None:
+            neighbors = post_filter(neighbors)
+        return neighbors[:num_neighbors], elapsed
+
+    def search(self, embedding, num_neighbors: int = 5, filters: Optional[Dict[str, str]] = None,
+               post_filter: Optional[Callable[[List[Any]], List[Any]]] = None,
+               debug: bool = False) -> Tuple[List[Any], Optional[str]]:
+        """
+        (neighbours, answering strategy name) - ([], None) when every strategy failed.
+
+        `filters` maps restrict namespaces to the allowed value, e.g.
+        {"instrument": "AAPL"}; `post_filter` keeps the matching neighbours
+        when a strategy had to filter client-side.
+        """
+        filters = {key: value for key, value in (filters or {}).items() if value}
+        remaining = self._order(filters)
+        pending = {}
+        outcomes = {}
+        answered = None
+        self.stats["queries"] += 1
+
+        def launch():
+            strategy = remaining.pop(0)
+            if debug:
+                print(f"   Trying strategy: {strategy[0]}")
+            pending[self._pool.submit(self._call, strategy, embedding, num_neighbors, filters, post_filter)] = strategy
+
+        launch()
+        deadline = time.monotonic() + self.hedge_budget()
+        while pending:
+            timeout = max(0.0, deadline - time.monotonic()) if remaining else None
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Slow, not failed: fire the next strategy alongside, keep both running
+                self.stats["hedged"] += 1
+                if debug:
+                    print(f"   ⏱️  No answer within {self.hedge_budget() * 1000:.0f} ms - hedging")
+                launch()
+                deadline = time.monotonic() + self.hedge_budget()
+                continue
+
+            for future in done:
+                name, _, server_filter = pending.pop(future)
+                try:
+                    neighbors, elapsed = future.result()
+                except Exception as e:
+                    outcomes[name] = "error"
+                    if debug:
+                        print(f"   ❌ Strategy '{name}' failed: {str(e)}")
+                else:
+                    with self._lock:
+                        self._latencies.append(elapsed)
+                    if neighbors:
+                        self._record_win(name, server_filter, filters, outcomes)
+                        if debug:
+                            print(f"   ✅ Strategy '{name}' succeeded in {elapsed * 1000:.0f} ms")
+                        return neighbors, name
+
+                    outcomes[name] = "empty"
+                    answered = answered or name
+                    if debug:
+                        print(f"   ⚠️  Strategy '{name}' returned empty results")
+                    # Empty is an answer - another request format would return the same. Only
+                    # client-side filtering can still find rows, if the index may lack restricts.
+                    remaining[:] = [strategy for strategy in remaining if filters and not strategy[2]
+                                    and self.state.get("restricts") is not True]
+
+                # Failed or empty: the next strategy starts now, without waiting for the budget
+                if remaining and not pending:
+                    launch()
+                    deadline = time.monotonic() + self.hedge_budget()
+
+        if answered:
+            return [], answered
+        self.stats["failed"] += 1
+        return [], None
+
+    def _record_win(self, name: str, server_filter: bool, filters: Dict[str, str], outcomes: Dict[str, str]):
+        self.stats["wins"][name] += 1
+        if outcomes:
+            self.stats["fallbacks"] += 1
+        if filters and not server_filter and "empty" in outcomes.values():
+            self._learn(restricts=False)
+        elif filters and server_filter:
+            self._learn(restricts=True)
+        if server_filter:
+            self._learn(strategy=name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "preferred": self.state.get("strategy"), "restricts": self.state.get("restricts"),
+                "hedge_budget_ms": round(self.hedge_budget() * 1000, 1)}
+
+    def close(self):
+        self._pool.shutdown(wait=False)
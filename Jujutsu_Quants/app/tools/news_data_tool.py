@@ -1,62 +1,48 @@
 # app/tools/news_data_tool.py
-import requests
-from google.cloud import secretmanager
-import json
-from datetime import datetime, timedelta
+from app.services.news_client import get_news_client
+from app.utils.secret_provider import get_secret
 
-def get_secret(secret_name, project_id):
-    """Retrieve secret from Secret Manager."""
-    try:
-        client = secretmanager.SecretManagerServiceClient()
-        name = f"projects/{project_id}/secrets/{secret_name}/versions/latest"
-        response = client.access_secret_version(name=name)
-        return response.payload.data.decode("UTF-8")
-    except Exception as e:
-        print(f"Error retrieving secret {secret_name}: {e}")
-        return None
+def news_data_tool(query, days=7, project_id="letsstock-with-ai", limit=10):
+    """
+    Tool for retrieving financial news.
 
-def news_data_tool(query, days=7, project_id="letsstock-with-ai"):
-    """Tool for retrieving financial news."""
+    `query` may be a list of Alpha Vantage topics or free text
+    ("oil price energy market"), which is mapped onto topics. Topics are
+    fetched concurrently and cached for a few minutes.
+    """
     try:
         # Get news from Alpha Vantage News API
         api_key = get_secret("alpha-vantage-key", project_id)
         if not api_key:
             return {"error": "Alpha Vantage API key not found"}
-            
-        url = f"https://www.alphavantage.co/query?function=NEWS_SENTIMENT&topics={query}&apikey={api_key}"
         
-        response = requests.get(url)
-        response.raise_for_status()
-        av_data = response.json()
+        result = get_news_client().get_news(query, days, api_key, limit=limit)
         
-        # Filter for recent news only
-        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
-        
-        if 'feed' in av_data:
-            filtered_news = [
-                article for article in av_data['feed'] 
-                if article.get('time_published', '') >= cutoff_date
-            ]
-            
-            processed_news = []
-            for article in filtered_news[:10]:  # Limit to 10 articles
-                processed_news.append({
-                    "title": article.get('title', ''),
-                    "summary": article.get('summary', ''),
-                    "source": article.get('source', ''),
-                    "url": article.get('url', ''),
-                    "published": article.get('time_published', ''),
-                    "sentiment": article.get('overall_sentiment_score', 0)
-                })
-            
+        if not result["articles"] and result["errors"]:
             return {
                 "query": query,
-                "days": days,
-                "articles": processed_news,
-                "status": "success"
+                "error": "; ".join(f"{topic}: {error}" for topic, error in result["errors"].items()),
+                "status": "error"
             }
-        else:
-            return {"error": "No news data found", "status": "error"}
+        
+        processed_news = []
+        for article in result["articles"]:
+            processed_news.append({
+                "title": article.get('title', ''),
+                "summary": article.get('summary', ''),
+                "source": article.get('source', ''),
+                "url": article.get('url', ''),
+                "published": article.get('time_published', ''),
+                "sentiment": article.get('overall_sentiment_score', 0)
+            })
+        
+        return {
+            "query": query,
+            "topics": result["topics"],
+            "days": days,
+            "articles": processed_news,
+            "status": "success"
+        }
         
     except Exception as e:
         return {
@@ -0,0 +1,160 @@
+# app/utils/embedding_cache.py - Shared query-embedding cache (in-memory LRU + optional SQLite tier)
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_EMBEDDING_MODEL = "text-embedding-004"
+
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))   # Vectors kept in memory
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")             # e.g. .cache/embeddings.sqlite3
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Cache key normalization: Unicode NFC and collapsed whitespace"""
+    return _WS_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class EmbeddingCache:
+    """
+    Embedding vectors keyed by (model name, normalized text).
+
+    Vectors are held as float32 arrays (3 KB for a 768-d embedding) in an
+    LRU of `max_entries`. With `disk_path` set they are also written to a
+    SQLite file, so repeated queries survive restarts and are shared by the
+    API, the query scripts and the diagnostics.
+    """
+
+    def __init__(self, max_entries: int = EMBEDDING_CACHE_SIZE, disk_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[Tuple[str, str], array]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._conn = None
+        if disk_path:
+            directory = os.path.dirname(disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(disk_path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                )
+            """)
+
+    @staticmethod
+    def _key(model_name: str, text: str) -> Tuple[str, str]:
+        return model_name, hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+    def get(self, model_name: str, text: str) -> Optional[List[float]]:
+        """Cached vector for `text`, or None"""
+        key = self._key(model_name, text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return vector.tolist()
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT vector FROM embeddings WHERE model = ? AND text_hash = ?", key
+                ).fetchone()
+                if row:
+                    vector = array("f")
+                    vector.frombytes(row[0])
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                    return vector.tolist()
+
+            self.misses += 1
+            return None
+
+    def put(self, model_name: str, text: str, vector: Sequence[float]):
+        """Store a vector (converted to float32)"""
+        key = self._key(model_name, text)
+        values = vector.tolist() if hasattr(vector, "tolist") else vector
+        compact = array("f", values)
+        with self._lock:
+            self._remember(key, compact)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                    (key[0], key[1], compact.tobytes())
+                )
+
+    def _remember(self, key: Tuple[str, str], vector: array):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_or_compute(self, model_name: str, text: str,
+                       compute: Callable[[str], Sequence[float]]) -> List[float]:
+        """Return the cached vector, computing and storing it on a miss"""
+        vector = self.get(model_name, text)
+        if vector is None:
+            vector = compute(text)
+            self.put(model_name, text, vector)
+            vector = array("f", vector.tolist() if hasattr(vector, "tolist") else vector).tolist()
+        return vector
+
+    def get_stats(self) -> Dict[str, int]:
+        """Hit/miss counters - useful for checking how often queries repeat"""
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses
+        }
+
+    def clear(self):
+        """Clear both tiers - useful for testing"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM embeddings")
+
+
+# Singleton instance
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the process-wide embedding cache"""
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache(disk_path=EMBEDDING_CACHE_PATH or None)
+    return _embedding_cache
+
+
+def embed_query(embedder, text: str, model_name: Optional[str] = None) -> List[float]:
+    """
+    Embed one query through the shared cache.
+
+    `embedder` is an app.utils.embedding_provider embedder (cached under its
+    own model name, so local and Vertex vectors never mix) or a Vertex AI
+    TextEmbeddingModel.
+    """
+    if hasattr(embedder, "embed"):
+        return get_embedding_cache().get_or_compute(model_name or embedder.model_name, text, embedder.embed)
+    return get_embedding_cache().get_or_compute(
+        model_name or DEFAULT_EMBEDDING_MODEL, text, lambda t: embedder.get_embeddings([t])[0].values
+    )
@@ -0,0 +1,226 @@
+# app/utils/embedding_provider.py - Pluggable text embedding backends with micro-batching
+import hashlib
+import math
+import os
+import queue
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_EMBEDDING_MODEL = "text-embedding-004"
+EMBEDDING_DIMENSION = 768
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "vertex")              # vertex | local
+EMBEDDING_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", "32"))         # Texts per API call (Vertex caps tokens per request)
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))      # API calls in flight
+EMBEDDING_BATCH_WINDOW = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5")) / 1000  # Wait for more texts to batch
+
+
+class EmbeddingProvider(ABC):
+    """A text embedding backend; `embed_batch` makes one call for all texts"""
+
+    model_name = "base"
+    dimension = EMBEDDING_DIMENSION
+
+    @abstractmethod
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """One vector per text, in order"""
+
+
+class VertexEmbeddingProvider(EmbeddingProvider):
+    """Vertex AI TextEmbeddingModel, loaded on first use"""
+
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL, project_id: Optional[str] = None,
+                 location: Optional[str] = None):
+        self.model_name = model_name
+        self.project_id = project_id
+        self.location = location
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    def _get_model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    import vertexai
+                    from vertexai.language_models import TextEmbeddingModel
+                    if self.project_id:
+                        vertexai.init(project=self.project_id, location=self.location)
+                    self._model = TextEmbeddingModel.from_pretrained(self.model_name)
+        return self._model
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        return [list(embedding.values) for embedding in self._get_model().get_embeddings(texts)]
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """
+    Deterministic local embeddings by feature hashing (no model, no network).
+
+    Words and word bigrams are hashed into `dimension` signed buckets and
+    the vector is L2-normalized, so texts sharing vocabulary get a high
+    cosine similarity. Same text, same vector, in every process - suitable
+    for offline pipeline runs and performance tests, not for relevance.
+    """
+
+    _TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+    def __init__(self, dimension: int = EMBEDDING_DIMENSION):
+        self.dimension = dimension
+        self.model_name = f"local-hash-{dimension}"
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        return digest % self.dimension, 1.0 if digest >> 63 else -1.0
+
+    def embed_text(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimension
+        tokens = self._TOKEN_RE.findall(text.lower()) or [""]
+        features = [(token, 1.0) for token in tokens] + \
+                   [(f"{a} {b}", 0.5) for a, b in zip(tokens, tokens[1:])]
+        for feature, weight in features:
+            index, sign = self._bucket(feature)
+            vector[index] += sign * weight
+
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_text(text) for text in texts]
+
+
+class BatchingEmbedder:
+    """
+    Front end shared by every caller of an embedding provider.
+
+    Single `embed` calls from concurrent requests are collected for up to
+    `batch_window` seconds into one provider call of at most
+    `max_batch_size` texts; `embed_many` splits large inputs the same way.
+    At most `max_concurrency` provider calls run at once - while they are
+    busy, new texts keep queueing and go out as fuller batches. Duplicate
+    texts within a batch are embedded once.
+    """
+
+    def __init__(self, provider: EmbeddingProvider, max_batch_size: int = EMBEDDING_MAX_BATCH,
+                 max_concurrency: int = EMBEDDING_CONCURRENCY, batch_window: float = EMBEDDING_BATCH_WINDOW):
+        self.provider = provider
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.batch_window = batch_window
+
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="embedding")
+        self._dispatcher: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.stats = {"texts": 0, "batches": 0, "deduplicated": 0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def model_name(self) -> str:
+        return self.provider.model_name
+
+    @property
+    def dimension(self) -> int:
+        return self.provider.dimension
+
+    def _start(self):
+        if self._dispatcher is None:
+            with self._start_lock:
+                if self._dispatcher is None:
+                    self._dispatcher = threading.Thread(target=self._dispatch, name="embedding-dispatcher",
+                                                        daemon=True)
+                    self._dispatcher.start()
+
+    def _dispatch(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            # Wait for a free call slot; texts arriving meanwhile form the next batch
+            self._slots.acquire()
+            self._pool.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[Tuple[str, Future]]):
+        try:
+            unique_texts = list(dict.fromkeys(text for text, _ in batch))
+            vectors = self.provider.embed_batch(unique_texts)
+            if len(vectors) != len(unique_texts):
+                raise RuntimeError(f"Embedding provider returned {len(vectors)} vectors for {len(unique_texts)} texts")
+            by_text = dict(zip(unique_texts, vectors))
+            with self._stats_lock:
+                self.stats["texts"] += len(batch)
+                self.stats["batches"] += 1
+                self.stats["deduplicated"] += len(batch) - len(unique_texts)
+            for text, future in batch:
+                future.set_result(by_text[text])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
+
+    def submit(self, text: str) -> Future:
+        """Queue one text; the future resolves to its vector"""
+        self._start()
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def embed(self, text: str, timeout: Optional[float] = None) -> List[float]:
+        """Embed one text (blocking), batched with concurrent callers"""
+        return self.submit(text).result(timeout)
+
+    def embed_many(self, texts: Sequence[str], timeout: Optional[float] = None) -> List[List[float]]:
+        """Embed many texts in order; batches run concurrently"""
+        futures = [self.submit(text) for text in texts]
+        return [future.result(timeout) for future in futures]
+
+    def get_stats(self) -> Dict[str, float]:
+        """Batching counters - texts per batch shows how well concurrent calls coalesce"""
+        batches = self.stats["batches"]
+        return {**self.stats, "texts_per_batch": self.stats["texts"] / batches if batches else 0.0}
+
+
+def create_embedding_provider(backend: Optional[str] = None, model_name: Optional[str] = None,
+                              project_id: Optional[str] = None,
+                              location: Optional[str] = None) -> EmbeddingProvider:
+    """Provider for `backend` ("vertex" or "local"; default EMBEDDING_BACKEND)"""
+    backend = backend or EMBEDDING_BACKEND
+    if backend == "local":
+        return HashingEmbeddingProvider()
+    if backend == "vertex":
+        return VertexEmbeddingProvider(model_name or DEFAULT_EMBEDDING_MODEL, project_id, location)
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+# Shared embedders, one per (backend, model)
+_embedders: Dict[Tuple[str, str], BatchingEmbedder] = {}
+_embedders_lock = threading.Lock()
+
+
+def get_embedder(model_name: Optional[str] = None, project_id: Optional[str] = None,
+                 location: Optional[str] = None, backend: Optional[str] = None) -> BatchingEmbedder:
+    """
+    Get or create the process-wide embedder for a model.
+
+    With EMBEDDING_BACKEND=local every model name maps to the deterministic
+    hashing backend, so the whole pipeline runs offline.
+    """
+    backend = backend or EMBEDDING_BACKEND
+    key = (backend, model_name or DEFAULT_EMBEDDING_MODEL)
+    with _embedders_lock:
+        embedder = _embedders.get(key)
+        if embedder is None:
+            embedder = BatchingEmbedder(create_embedding_provider(backend, model_name, project_id, location))
+            _embedders[key] = embedder
+        return embedder
@@ -0,0 +1,305 @@
+# app/utils/html_extractor.py - Fast boilerplate-free text extraction from HTML pages
+import re
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional
+
+try:
+    from lxml import etree
+    import lxml.html
+except ImportError:  # Falls back to the standard library parser
+    lxml = None
+
+# Elements whose content is never article text
+SKIP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object",
+    "nav", "header", "footer", "aside", "form", "button", "select", "textarea", "menu", "dialog"
+}
+
+# Elements that start a new text block
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "h1", "h2", "h3", "h4", "h5", "h6",
+    "li", "ul", "ol", "dl", "dt", "dd", "blockquote", "pre", "table", "tr",
+    "figure", "figcaption", "br", "hr", "body"
+}
+
+# Table cells are kept on their row's line
+CELL_TAGS = {"td", "th"}
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# Containers that are never dropped on class/id alone (some sites tag <body> with "menu-open" etc.)
+NEVER_SKIP_TAGS = {"html", "body", "main", "article"}
+
+# Parts of a class/id token ("main-nav" -> main, nav) that mark navigation, ads and other page chrome
+BOILERPLATE_WORDS = {
+    "nav", "navbar", "navigation", "menu", "breadcrumb", "breadcrumbs", "footer", "sidebar", "cookie", "cookies",
+    "consent", "subscribe", "newsletter", "signup", "paywall", "social", "comment", "comments", "ad", "ads",
+    "advert", "advertisement", "sponsored", "promo", "recommended", "popup", "modal", "banner", "masthead"
+}
+
+# Words that also name financial content ("share-price", "related-party") only count as a
+# whole token or in these known compounds
+BOILERPLATE_TOKENS = {
+    "share", "sharing", "related", "share-bar", "sharebar", "share-buttons", "share-tools", "share-links",
+    "share-icons", "sharing-tools", "related-articles", "related-posts", "related-stories", "related-content",
+    "related-links"
+}
+
+# Elements a later sibling of the same kind closes implicitly (<li>Home<li>About)
+IMPLIED_END_TAGS = {"li", "p", "dt", "dd", "tr", "td", "th", "option"}
+
+# ...unless a nested list, table or select is open in between
+IMPLIED_END_SCOPE_TAGS = {"ul", "ol", "dl", "table", "select"}
+
+MAX_LINK_DENSITY = 0.6      # Blocks that are mostly link text are menus / link lists
+LINK_BLOCK_MAX_CHARS = 300  # ...but only short blocks are dropped for it
+FEED_CHUNK_CHARS = 16 * 1024
+
+_WS_RE = re.compile(r"\s+")
+_TOKEN_PART_RE = re.compile(r"[-_]")
+_HIDDEN_STYLE_RE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.IGNORECASE)
+
+
+def get_backend() -> str:
+    """Name of the parser backend in use ('lxml' or 'html.parser')"""
+    return "lxml" if lxml is not None else "html.parser"
+
+
+class _TextCollector:
+    """
+    Turns a stream of start/text/end events into clean text blocks.
+
+    Both parser backends drive the same collector, so extraction rules are
+    identical whichever one is installed. Once `max_chars` of text has been
+    collected `done` is set and the backend stops parsing.
+    """
+
+    def __init__(self, max_chars: Optional[int] = None):
+        self.max_chars = max_chars
+        self.blocks: List[str] = []
+        self.title: Optional[str] = None
+        self.og_title: Optional[str] = None
+        self.chars = 0
+        self.done = False
+
+        self._buf: List[str] = []
+        self._link_chars = 0
+        self._link_depth = 0
+        self._open: List[str] = []          # Elements open outside the skipped one
+        self._skip_tag: Optional[str] = None
+        self._skip_open: List[str] = []     # Elements open inside the skipped one
+        self._title_parts: Optional[List[str]] = None
+
+    def start(self, tag: str, get_attr: Callable[[str], Optional[str]]):
+        if self._skip_tag:
+            if not self._implicitly_closes_skip(tag):
+                if tag not in VOID_TAGS:
+                    self._skip_open.append(tag)
+                return
+            self._end_skip()
+
+        if tag not in VOID_TAGS:
+            self._open.append(tag)
+
+        if tag == "title":
+            self._title_parts = []
+            return
+        if tag == "meta":
+            if get_attr("property") == "og:title" and not self.og_title:
+                self.og_title = (get_attr("content") or "").strip() or None
+            return
+
+        if tag in SKIP_TAGS or (
+            tag not in NEVER_SKIP_TAGS and tag not in VOID_TAGS and self._is_boilerplate(get_attr)
+        ):
+            if tag not in VOID_TAGS:
+                self._open.pop()
+                self._skip_tag = tag
+                self._skip_open = []
+            return
+
+        if tag in BLOCK_TAGS:
+            self._flush()
+        elif tag in CELL_TAGS:
+            self._buf.append(" ")
+        elif tag == "a":
+            self._link_depth += 1
+
+    @staticmethod
+    def _is_boilerplate(get_attr: Callable[[str], Optional[str]]) -> bool:
+        if get_attr("hidden") is not None or _HIDDEN_STYLE_RE.search(get_attr("style") or ""):
+            return True
+        for token in f"{get_attr('class') or ''} {get_attr('id') or ''}".lower().split():
+            token = token.replace("_", "-")
+            if token in BOILERPLATE_TOKENS or any(part in BOILERPLATE_WORDS for part in _TOKEN_PART_RE.split(token)):
+                return True
+        return False
+
+    def _implicitly_closes_skip(self, tag: str) -> bool:
+        """Whether `tag` opening is a sibling that ends the skipped element (HTML implied end tags)"""
+        return (tag == self._skip_tag and tag in IMPLIED_END_TAGS
+                and not any(open_tag in IMPLIED_END_SCOPE_TAGS for open_tag in self._skip_open))
+
+    def _end_skip(self):
+        self._skip_tag = None
+        self._skip_open = []
+
+    def end(self, tag: str):
+        if self._skip_tag:
+            if tag in self._skip_open:
+                del self._skip_open[len(self._skip_open) - 1 - self._skip_open[::-1].index(tag):]
+                return
+            if tag == self._skip_tag:
+                self._end_skip()
+                return
+            if tag not in self._open:
+                return  # Stray end tag
+            # An ancestor closed, so the skipped element (left open) ends with it
+            self._end_skip()
+
+        if tag in self._open:
+            del self._open[len(self._open) - 1 - self._open[::-1].index(tag):]
+
+        if tag == "title" and self._title_parts is not None:
+            self.title = _WS_RE.sub(" ", "".join(self._title_parts)).strip() or None
+            self._title_parts = None
+        elif tag in BLOCK_TAGS:
+            self._flush()
+        elif tag == "a" and self._link_depth:
+            self._link_depth -= 1
+
+    def text(self, data: str):
+        if self._skip_tag or not data:
+            return
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+            return
+        self._buf.append(data)
+        if self._link_depth:
+            self._link_chars += len(data.strip())
+
+    def close(self):
+        self._flush()
+
+    def _flush(self):
+        if not self._buf:
+            return
+        block = _WS_RE.sub(" ", "".join(self._buf)).strip()
+        link_chars = self._link_chars
+        self._buf = []
+        self._link_chars = 0
+        if not block or self.done:
+            return
+        if len(block) <= LINK_BLOCK_MAX_CHARS and link_chars > MAX_LINK_DENSITY * len(block):
+            return
+
+        self.blocks.append(block)
+        self.chars += len(block) + 1
+        if self.max_chars is not None and self.chars >= self.max_chars:
+            self.done = True
+
+
+class _StdlibParser(HTMLParser):
+    """html.parser backend - pure Python, used when lxml is not installed"""
+
+    def __init__(self, collector: _TextCollector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        # Valueless attributes (<div hidden>) come through as None
+        attr_map = {name: value if value is not None else "" for name, value in attrs}
+        self.collector.start(tag, attr_map.get)
+        if tag in VOID_TAGS:
+            self.collector.end(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.collector.end(tag)
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.text(data)
+
+
+def _parse_stdlib(html: str, collector: _TextCollector):
+    parser = _StdlibParser(collector)
+    # Feed in slices so a length-capped extraction stops reading early
+    for offset in range(0, len(html), FEED_CHUNK_CHARS):
+        parser.feed(html[offset:offset + FEED_CHUNK_CHARS])
+        if collector.done:
+            return
+    parser.close()
+
+
+def _parse_lxml(html: str, collector: _TextCollector):
+    try:
+        root = lxml.html.document_fromstring(html)
+    except (etree.ParserError, ValueError):
+        # Empty documents, or str input carrying an XML encoding declaration
+        _parse_stdlib(html, collector)
+        return
+
+    # Drop comments and processing instructions, keeping the text around them
+    etree.strip_tags(root, etree.Comment, etree.ProcessingInstruction)
+
+    for event, element in etree.iterwalk(root, events=("start", "end")):
+        tag = element.tag
+        if not isinstance(tag, str):
+            continue
+
+        if event == "start":
+            collector.start(tag.lower(), element.get)
+            if element.text:
+                collector.text(element.text)
+        else:
+            collector.end(tag.lower())
+            if element.tail:
+                collector.text(element.tail)
+        if collector.done:
+            return
+
+
+def _extract(html: str, max_chars: Optional[int]) -> _TextCollector:
+    collector = _TextCollector(max_chars)
+    if html:
+        if lxml is not None:
+            _parse_lxml(html, collector)
+        else:
+            _parse_stdlib(html, collector)
+    collector.close()
+    return collector
+
+
+def extract_text(html: str, max_chars: Optional[int] = None, separator: str = "\n") -> str:
+    """
+    Extract readable text from an HTML page.
+
+    Scripts, styles, navigation, headers/footers, forms, hidden elements and
+    elements whose class or id marks them as menus, ads, share bars, cookie
+    banners etc. are dropped, as are short blocks made up mostly of links.
+    Remaining text blocks (paragraphs, headings, list items, table rows) are
+    joined with `separator`. Parsing stops as soon as `max_chars` characters
+    have been collected, so capped extraction of long pages only pays for
+    what it keeps.
+    """
+    collector = _extract(html, max_chars)
+    text = separator.join(collector.blocks)
+    if max_chars is not None:
+        text = text[:max_chars]
+    return text
+
+
+def extract_article(html: str, max_chars: Optional[int] = None, separator: str = "\n") -> Dict[str, Optional[str]]:
+    """Extract `{title, content}` from an HTML page - title from <title>, falling back to og:title"""
+    collector = _extract(html, max_chars)
+    content = separator.join(collector.blocks)
+    if max_chars is not None:
+        content = content[:max_chars]
+    return {
+        "title": collector.title or collector.og_title,
+        "content": content
+    }
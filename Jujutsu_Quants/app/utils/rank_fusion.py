@@ -0,0 +1,34 @@
+# app/utils/rank_fusion.py - Reciprocal rank fusion of several ranked result lists
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+RRF_K = 60  # Standard damping constant; larger values flatten the head of each list
+
+
+def reciprocal_rank_fusion(ranked_lists: Dict[str, Sequence[Any]], key: Callable[[Any], Hashable],
+                           weights: Optional[Dict[str, float]] = None,
+                           k: int = RRF_K) -> List[Tuple[Any, float, List[str]]]:
+    """
+    Fuse ranked lists (best first) by summing weight / (k + rank) per item.
+
+    Only ranks are used, so legs with incomparable scores (cosine
+    similarity, BM25, ts_rank) can be combined without normalization.
+    Items are matched across lists by `key`; the first list an item appears
+    in supplies the returned object.
+
+    Returns:
+        (item, fused score, names of the lists that returned it), best first
+    """
+    weights = weights or {}
+    fused: Dict[Hashable, List[Any]] = {}
+    for name, items in ranked_lists.items():
+        weight = weights.get(name, 1.0)
+        if weight <= 0:
+            continue
+        for rank, item in enumerate(items, start=1):
+            entry = fused.setdefault(key(item), [item, 0.0, []])
+            if name in entry[2]:
+                continue  # Duplicates within one list only count once
+            entry[1] += weight / (k + rank)
+            entry[2].append(name)
+
+    return sorted((tuple(entry) for entry in fused.values()), key=lambda entry: entry[1], reverse=True)
@@ -0,0 +1,251 @@
+# app/utils/rate_limiter.py - Shared token-bucket scheduler for external data providers
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows - cross-process sharing is disabled
+    fcntl = None
+
+# Documented provider limits as (requests, period_seconds) windows.
+# A provider is throttled by every window at once, e.g. GNews allows
+# 4 requests per second but only 1000 per day on the Essential plan.
+PROVIDER_LIMITS: Dict[str, List[Tuple[float, float]]] = {
+    "sec_edgar": [(10, 1.0)],                      # SEC fair access: 10 req/s
+    "gnews": [(4, 1.0), (1000, 86400.0)],          # Essential plan
+    "marketaux": [(100, 86400.0)],                 # Free plan
+    "alpha_vantage": [(5, 60.0), (25, 86400.0)],   # Free plan
+    "fmp": [(250, 86400.0)],                       # Free plan
+    "coingecko": [(30, 60.0)],                     # Demo plan
+    "cryptopanic": [(5, 1.0)],
+    "fred": [(120, 60.0)],
+    "yahoo_finance": [(1, 1.0), (2000, 3600.0)],   # Unofficial, per IP
+    "scrape": [(1, 2.0)],                          # Politeness limit per scraped host
+    "default": [(1, 1.0)],
+}
+
+
+def _parse_limits(spec: str) -> List[Tuple[float, float]]:
+    """Parse an override such as "75/60,1000/86400" into limit windows."""
+    windows = []
+    for part in spec.split(','):
+        requests_str, period_str = part.strip().split('/')
+        windows.append((float(requests_str), float(period_str)))
+    return windows
+
+
+class TokenBucket:
+    """Token bucket holding `capacity` tokens, refilled at capacity/period per second."""
+
+    def __init__(self, capacity: float, period: float):
+        if capacity <= 0 or period <= 0:
+            raise ValueError("capacity and period must be positive")
+        self.capacity = float(capacity)
+        self.rate = self.capacity / float(period)
+        self.tokens = self.capacity
+        self.updated: Optional[float] = None
+
+    def _refill(self, now: float):
+        if self.updated is None:
+            self.updated = now
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def wait_time(self, tokens: float, now: float) -> float:
+        """Seconds until `tokens` are available (0 if available now)."""
+        self._refill(now)
+        if self.tokens >= tokens:
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+
+    def consume(self, tokens: float):
+        self.tokens -= tokens
+
+    def get_state(self) -> List[Optional[float]]:
+        return [self.tokens, self.updated]
+
+    def set_state(self, state: List[Optional[float]]):
+        self.tokens, self.updated = float(state[0]), state[1]
+
+
+class _ProviderLimiter:
+    """All limit windows of one provider, optionally shared across processes via a state file."""
+
+    def __init__(self, name: str, limits: List[Tuple[float, float]], state_path: Optional[str] = None):
+        self.name = name
+        self.limits = limits
+        self.buckets = [TokenBucket(capacity, period) for capacity, period in limits]
+        self.blocked_until = 0.0
+        self.state_path = state_path if fcntl else None
+        self._lock = threading.Lock()
+        # Wall clock is needed when several processes compare timestamps
+        self._clock = time.time if self.state_path else time.monotonic
+
+    @contextmanager
+    def _shared_state(self):
+        if not self.state_path:
+            yield
+            return
+
+        with open(self.state_path, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                if raw:
+                    try:
+                        state = json.loads(raw)
+                        if len(state.get("buckets", [])) == len(self.buckets):
+                            for bucket, bucket_state in zip(self.buckets, state["buckets"]):
+                                bucket.set_state(bucket_state)
+                        self.blocked_until = state.get("blocked_until", 0.0)
+                    except (ValueError, TypeError):
+                        pass  # Corrupt state file: start from full buckets
+                yield
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps({
+                    "buckets": [bucket.get_state() for bucket in self.buckets],
+                    "blocked_until": self.blocked_until
+                }))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def reserve(self, tokens: float) -> float:
+        """Take `tokens` from every window if possible, otherwise return the seconds to wait."""
+        with self._lock, self._shared_state():
+            now = self._clock()
+            wait = max(self.blocked_until - now, 0.0)
+            for bucket in self.buckets:
+                wait = max(wait, bucket.wait_time(tokens, now))
+            if wait <= 0:
+                for bucket in self.buckets:
+                    bucket.consume(tokens)
+            return wait
+
+    def penalize(self, seconds: float):
+        """Block the provider for `seconds`, e.g. after an HTTP 429 response."""
+        with self._lock, self._shared_state():
+            self.blocked_until = max(self.blocked_until, self._clock() + seconds)
+
+
+class RateLimitScheduler:
+    """
+    Shared scheduler with one token bucket per provider.
+
+    Fetchers call `acquire("gnews")` before each request instead of sleeping a
+    fixed amount, so they run at the provider's real allowed rate. Provider
+    names may carry a key after a colon (``scrape:www.fool.com``): the prefix
+    selects the limits, the full name gets its own bucket.
+
+    Limits can be overridden per provider with ``RATE_LIMIT_<PROVIDER>``
+    (e.g. ``RATE_LIMIT_ALPHA_VANTAGE=75/60``). When ``RATE_LIMIT_STATE_DIR``
+    is set, bucket state is kept in lock-protected files so that collectors
+    running concurrently in separate processes share the same budget.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, List[Tuple[float, float]]]] = None,
+                 state_dir: Optional[str] = None):
+        self.limits = dict(PROVIDER_LIMITS)
+        if limits:
+            self.limits.update(limits)
+        self.state_dir = state_dir if state_dir is not None else os.getenv("RATE_LIMIT_STATE_DIR")
+        if self.state_dir:
+            os.makedirs(self.state_dir, exist_ok=True)
+        self._providers: Dict[str, _ProviderLimiter] = {}
+        self._lock = threading.Lock()
+
+    def _limits_for(self, provider: str) -> List[Tuple[float, float]]:
+        base_name = provider.split(':', 1)[0]
+        override = os.getenv(f"RATE_LIMIT_{base_name.upper()}")
+        if override:
+            return _parse_limits(override)
+        return self.limits.get(base_name, self.limits["default"])
+
+    def _get(self, provider: str) -> _ProviderLimiter:
+        with self._lock:
+            limiter = self._providers.get(provider)
+            if limiter is None:
+                state_path = None
+                if self.state_dir:
+                    safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in provider)
+                    state_path = os.path.join(self.state_dir, f"{safe_name}.json")
+                limiter = _ProviderLimiter(provider, self._limits_for(provider), state_path)
+                self._providers[provider] = limiter
+            return limiter
+
+    def acquire(self, provider: str, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Block until `tokens` are available for `provider`.
+
+        Returns False without consuming anything if they cannot be granted
+        within `timeout` seconds (None waits as long as needed).
+        """
+        limiter = self._get(provider)
+        if any(tokens > capacity for capacity, _ in limiter.limits):
+            raise ValueError(f"Requested {tokens} tokens exceeds the capacity of '{provider}'")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = limiter.reserve(tokens)
+            if wait <= 0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    async def acquire_async(self, provider: str, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """Async variant of `acquire` that waits without blocking the event loop."""
+        limiter = self._get(provider)
+        if any(tokens > capacity for capacity, _ in limiter.limits):
+            raise ValueError(f"Requested {tokens} tokens exceeds the capacity of '{provider}'")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # A shared state file means a blocking flock and file I/O - reserve in a worker thread
+            if limiter.state_path:
+                wait = await asyncio.to_thread(limiter.reserve, tokens)
+            else:
+                wait = limiter.reserve(tokens)
+            if wait <= 0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+    def penalize(self, provider: str, seconds: float):
+        """Hold back all requests to `provider` for `seconds` (server asked us to slow down)."""
+        self._get(provider).penalize(seconds)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Current token levels per provider - useful for debugging quota usage"""
+        stats = {}
+        for name, limiter in list(self._providers.items()):
+            stats[name] = {
+                "limits": limiter.limits,
+                "tokens": [round(bucket.tokens, 2) for bucket in limiter.buckets],
+                "blocked_until": limiter.blocked_until
+            }
+        return stats
+
+
+# Singleton instance
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimitScheduler:
+    """Get or create the process-wide rate limit scheduler"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimitScheduler()
+    return _rate_limiter
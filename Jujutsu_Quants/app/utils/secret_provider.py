@@ -0,0 +1,195 @@
+# app/utils/secret_provider.py - Cached secret lookup with env, file and Secret Manager backends
+import os
+import threading
+from abc import ABC, abstractmethod
+import time
+from typing import Dict, List, Optional, Tuple
+
+SECRET_CACHE_TTL = float(os.getenv("SECRET_CACHE_TTL", "3600"))         # Refresh cached secrets hourly
+SECRET_MISS_TTL = float(os.getenv("SECRET_MISS_TTL", "60"))             # Retry missing secrets after a minute
+SECRETS_DIR = os.getenv("SECRETS_DIR", "/run/secrets")                  # Docker / Kubernetes secret mounts
+
+# Secret Manager names whose environment variable doesn't follow the
+# "alpha-vantage-key" -> "ALPHA_VANTAGE_KEY" convention
+ENV_ALIASES: Dict[str, List[str]] = {
+    "alpha-vantage-key": ["ALPHA_VANTAGE_API_KEY"],
+    "fmp-api-key": ["FMP_API_KEY"],
+    "news-api-key": ["NEWS_API_KEY"],
+}
+
+
+class SecretProvider(ABC):
+    """A source of secrets; returns None when it doesn't hold `name`"""
+
+    name = "base"
+
+    @abstractmethod
+    def get(self, name: str, project_id: Optional[str] = None) -> Optional[str]:
+        """The secret value, or None"""
+
+
+class EnvSecretProvider(SecretProvider):
+    """Secrets from environment variables (.env files, Cloud Run secret env vars)"""
+
+    name = "env"
+
+    def get(self, name: str, project_id: Optional[str] = None) -> Optional[str]:
+        candidates = ENV_ALIASES.get(name, []) + [name.upper().replace("-", "_")]
+        for env_name in candidates:
+            value = os.getenv(env_name)
+            if value:
+                return value
+        return None
+
+
+class FileSecretProvider(SecretProvider):
+    """Secrets from files named after the secret, e.g. /run/secrets/alpha-vantage-key"""
+
+    name = "file"
+
+    def __init__(self, directory: str = SECRETS_DIR):
+        self.directory = directory
+
+    def get(self, name: str, project_id: Optional[str] = None) -> Optional[str]:
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+
+class SecretManagerProvider(SecretProvider):
+    """Google Secret Manager, through one client shared by the whole process"""
+
+    name = "secret_manager"
+
+    def __init__(self, default_project_id: Optional[str] = None):
+        self.default_project_id = default_project_id or os.getenv("GOOGLE_CLOUD_PROJECT")
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def _get_client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from google.cloud import secretmanager
+                    self._client = secretmanager.SecretManagerServiceClient()
+        return self._client
+
+    def get(self, name: str, project_id: Optional[str] = None) -> Optional[str]:
+        project_id = project_id or self.default_project_id
+        if not project_id:
+            return None
+        try:
+            secret_path = f"projects/{project_id}/secrets/{name}/versions/latest"
+            response = self._get_client().access_secret_version(name=secret_path)
+            return response.payload.data.decode("UTF-8")
+        except Exception as e:
+            print(f"Error retrieving secret {name}: {e}")
+            return None
+
+
+class SecretStore:
+    """
+    Looks secrets up in a chain of providers and caches them in-process.
+
+    Providers are tried in order (by default env, then files, then Secret
+    Manager), so local development and offline runs never touch the network.
+    Found secrets are cached for `ttl` seconds; once expired the cached value
+    is still returned while a background thread refreshes it, so only the
+    very first lookup of a secret pays for a Secret Manager round trip.
+    Missing secrets are remembered for `miss_ttl` seconds.
+    """
+
+    def __init__(self, providers: Optional[List[SecretProvider]] = None,
+                 ttl: float = SECRET_CACHE_TTL, miss_ttl: float = SECRET_MISS_TTL):
+        self.providers = providers if providers is not None else default_providers()
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self._cache: Dict[Tuple[Optional[str], str], Tuple[Optional[str], float]] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def _lookup(self, name: str, project_id: Optional[str]) -> Optional[str]:
+        for provider in self.providers:
+            value = provider.get(name, project_id)
+            if value:
+                return value
+        return None
+
+    def _store(self, key: Tuple[Optional[str], str], value: Optional[str]):
+        ttl = self.ttl if value else self.miss_ttl
+        with self._lock:
+            self._cache[key] = (value, time.monotonic() + ttl)
+
+    def _refresh(self, key: Tuple[Optional[str], str]):
+        try:
+            value = self._lookup(key[1], key[0])
+            if value:
+                self._store(key, value)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, name: str, project_id: Optional[str] = None) -> Optional[str]:
+        """Return the secret value, or None if no provider has it"""
+        key = (project_id, name)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached:
+                value, expires_at = cached
+                if time.monotonic() < expires_at:
+                    return value
+                if value:
+                    # Serve the stale value and refresh off the request path
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(target=self._refresh, args=(key,), daemon=True).start()
+                    return value
+
+        value = self._lookup(name, project_id)
+        self._store(key, value)
+        return value
+
+    def warm(self, names: List[str], project_id: Optional[str] = None):
+        """Load secrets ahead of the first request, e.g. at service startup"""
+        for name in names:
+            self.get(name, project_id)
+
+    def invalidate(self, name: Optional[str] = None):
+        """Drop one cached secret (all projects), or the whole cache - e.g. after a key rotation"""
+        with self._lock:
+            if name is None:
+                self._cache.clear()
+            else:
+                for key in [key for key in self._cache if key[1] == name]:
+                    del self._cache[key]
+
+
+def default_providers() -> List[SecretProvider]:
+    """env -> files -> Secret Manager (skipped when SECRET_MANAGER_DISABLED=1)"""
+    providers: List[SecretProvider] = [EnvSecretProvider(), FileSecretProvider()]
+    if os.getenv("SECRET_MANAGER_DISABLED", "0") != "1":
+        providers.append(SecretManagerProvider())
+    return providers
+
+
+# Singleton instance
+_secret_store = None
+_secret_store_lock = threading.Lock()
+
+
+def get_secret_store() -> SecretStore:
+    """Get or create the process-wide secret store"""
+    global _secret_store
+    if _secret_store is None:
+        with _secret_store_lock:
+            if _secret_store is None:
+                _secret_store = SecretStore()
+    return _secret_store
+
+
+def get_secret(secret_name: str, project_id: Optional[str] = None) -> Optional[str]:
+    """Retrieve a secret through the shared cached store."""
+    return get_secret_store().get(secret_name, project_id)
@@ -2,8 +2,15 @@
 import requests
 import json
 import os
+import sys
 from datetime import datetime, timedelta
 
+# Add the project root to the Python path for the shared rate limiter
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.rate_limiter import get_rate_limiter
+
+rate_limiter = get_rate_limiter()
+
 # Free API sources with generous limits
 NEWS_SOURCES = [
     {
@@ -38,6 +45,7 @@ def fetch_news(source_config, query):
     elif "query_param" in source_config:
         params[source_config["query_param"]] = query
     
+    rate_limiter.acquire(source_config["name"])
     response = requests.get(source_config["url"], params=params)
     
     if response.status_code == 200:
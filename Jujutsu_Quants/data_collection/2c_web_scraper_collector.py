@@ -3,10 +3,17 @@ import requests
 from bs4 import BeautifulSoup
 import json
 import os
+import sys
 from datetime import datetime
-import time
+from urllib.parse import urlparse
 import random
 
+# Add the project root to the Python path for the shared rate limiter
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.rate_limiter import get_rate_limiter
+
+rate_limiter = get_rate_limiter()
+
 # Financial news websites that allow scraping
 NEWS_SITES = [
     {
@@ -58,6 +65,11 @@ def get_headers():
         'Connection': 'keep-alive',
     }
 
+def polite_get(url, timeout=10):
+    """GET a page after taking a token from the scraped host's bucket"""
+    rate_limiter.acquire(f"scrape:{urlparse(url).netloc}")
+    return requests.get(url, headers=get_headers(), timeout=timeout)
+
 def scrape_yahoo_finance(instrument, symbol):
     """Scrape Yahoo Finance for news"""
     articles = []
@@ -65,7 +77,7 @@ def scrape_yahoo_finance(instrument, symbol):
     try:
         # Get news for specific symbol
         url = f"https://finance.yahoo.com/quote/{symbol}/news"
-        response = requests.get(url, headers=get_headers(), timeout=10)
+        response = polite_get(url)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.content, 'html.parser')
@@ -107,7 +119,7 @@ def scrape_general_news(instrument, keywords):
     try:
         # MarketWatch latest news
         url = "https://www.marketwatch.com/latest-news"
-        response = requests.get(url, headers=get_headers(), timeout=10)
+        response = polite_get(url)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.content, 'html.parser')
@@ -156,8 +168,6 @@ def collect_for_instrument(instrument):
         yahoo_articles = scrape_yahoo_finance(instrument, symbol)
         all_articles.extend(yahoo_articles)
         print(f"    Found {len(yahoo_articles)} articles")
-        
-        time.sleep(random.uniform(2, 5))  # Be respectful
     
     # Try general news scraping
     print(f"  Scraping general news with keywords: {keywords}")
@@ -206,6 +216,5 @@ if __name__ == "__main__":
     for instrument in INSTRUMENT_KEYWORDS.keys():
         collected = collect_for_instrument(instrument)
         total += collected
-        time.sleep(random.uniform(5, 10))  # Longer delays between instruments
     
     print(f"\nTotal articles collected: {total}")
@@ -3,7 +3,13 @@ import requests
 import json
 import os
 from datetime import datetime, timedelta
-import time
+import sys
+
+# Add the project root to the Python path for the shared rate limiter
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.rate_limiter import get_rate_limiter
+
+rate_limiter = get_rate_limiter()
 
 # GNews configuration with expanded content
 GNEWS_CONFIG = {
@@ -93,6 +99,7 @@ def fetch_gnews_articles(query, category="business", days_back=7, max_results=10
     
     try:
         print(f"    Fetching: {query} (last {days_back} days, max {max_results} articles)")
+        rate_limiter.acquire("gnews")
         response = requests.get(GNEWS_CONFIG["url"], params=params, timeout=30)
         
         if response.status_code == 200:
@@ -130,8 +137,8 @@ def fetch_gnews_articles(query, category="business", days_back=7, max_results=10
             print(f"    Error: API key invalid or quota exceeded")
             return []
         elif response.status_code == 429:
-            print(f"    Error: Rate limit exceeded - waiting...")
-            time.sleep(60)  # Wait 1 minute before continuing
+            print(f"    Error: Rate limit exceeded - backing off...")
+            rate_limiter.penalize("gnews", 60)  # Hold all GNews requests for 1 minute
             return []
         else:
             print(f"    Error: HTTP {response.status_code}")
@@ -166,9 +173,6 @@ def collect_news_for_instrument(instrument_name, instrument_config, articles_per
         if articles:
             all_articles.extend(articles)
             print(f"    Added {len(articles)} articles (Total: {len(all_articles)})")
-        
-        # Be respectful of API limits - wait between queries
-        time.sleep(2)
     
     # Remove duplicates based on URL
     unique_articles = {}
@@ -266,9 +270,6 @@ def main():
         
         # Monitor API usage
         print(f"  API requests used so far: {total_requests}")
-        
-        # Wait between instruments to be respectful
-        time.sleep(5)
     
     print(f"\nCollection Summary:")
     print(f"Total articles collected: {total_articles}")
@@ -288,6 +289,7 @@ def test_api_key():
     }
     
     try:
+        rate_limiter.acquire("gnews")
         response = requests.get(GNEWS_CONFIG["url"], params=test_params, timeout=10)
         
         if response.status_code == 200:
@@ -3,7 +3,13 @@ import requests
 import json
 import os
 from datetime import datetime, timedelta
-import time
+import sys
+
+# Add the project root to the Python path for the shared rate limiter
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.rate_limiter import get_rate_limiter
+
+rate_limiter = get_rate_limiter()
 
 class ComprehensiveGNewsCollector:
     def __init__(self, api_key):
@@ -30,6 +36,7 @@ class ComprehensiveGNewsCollector:
             params["category"] = category
             
         try:
+            rate_limiter.acquire("gnews")
             response = requests.get(self.base_url, params=params, timeout=30)
             if response.status_code == 200:
                 data = response.json()
@@ -47,7 +54,6 @@ class ComprehensiveGNewsCollector:
         for query in queries:
             results = self.fetch_articles(query, max_results=30, days_back=14)
             articles.extend(results)
-            time.sleep(1)
         
         self.save_documents(articles, instrument, "news")
         return len(articles)
@@ -61,7 +67,6 @@ class ComprehensiveGNewsCollector:
             analysis_query = f"{query} analysis OR forecast OR prediction OR target OR outlook"
             results = self.fetch_articles(analysis_query, max_results=20, days_back=60)
             articles.extend(results)
-            time.sleep(1)
         
         self.save_documents(articles, instrument, "analysis")
         return len(articles)
@@ -75,7 +80,6 @@ class ComprehensiveGNewsCollector:
             earnings_query = f"{query} earnings OR results OR revenue OR quarterly OR guidance"
             results = self.fetch_articles(earnings_query, max_results=15, days_back=90)
             articles.extend(results)
-            time.sleep(1)
         
         self.save_documents(articles, instrument, "earnings")
         return len(articles)
@@ -89,7 +93,6 @@ class ComprehensiveGNewsCollector:
             tech_query = f"{query} technical analysis OR chart pattern OR trend OR support OR resistance"
             results = self.fetch_articles(tech_query, max_results=10, days_back=30)
             articles.extend(results)
-            time.sleep(1)
         
         self.save_documents(articles, instrument, "technical_analysis")
         return len(articles)
@@ -158,8 +161,6 @@ def main():
         
         total = news_count + analysis_count + earnings_count + technical_count
         print(f"  Total documents for {instrument}: {total}")
-        
-        time.sleep(5)  # Pause between instruments
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,16 @@
 # sec_collector.py
 import requests
 import os
+import sys
 import pandas as pd
-import time
 from datetime import datetime
 
+# Add the project root to the Python path for the shared rate limiter
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.rate_limiter import get_rate_limiter
+
+rate_limiter = get_rate_limiter()
+
 # Company CIK codes (identifier for SEC EDGAR)
 COMPANIES = {
     "AAPL": "0000320193",
@@ -23,6 +29,7 @@ def fetch_company_filings(cik, filing_type="10-Q,10-K"):
         "User-Agent": "Sample Company Name admin@example.com"  # SEC requires a user-agent
     }
     
+    rate_limiter.acquire("sec_edgar")
     response = requests.get(url, headers=headers)
     
     if response.status_code == 200:
@@ -60,6 +67,7 @@ def download_filing_document(cik, accession_number, primary_document):
         "User-Agent": "Sample Company Name admin@example.com"  # SEC requires a user-agent
     }
     
+    rate_limiter.acquire("sec_edgar")
     response = requests.get(url, headers=headers)
     
     if response.status_code == 200:
@@ -90,9 +98,6 @@ for ticker, cik in COMPANIES.items():
     for filing in filings:
         print(f"  Downloading {filing['form']} from {filing['filingDate']}...")
         
-        # Add a delay to avoid rate limiting
-        time.sleep(0.1)
-        
         content = download_filing_document(
             cik, 
             filing["accessionNumber"], 
@@ -109,5 +114,3 @@ for ticker, cik in COMPANIES.items():
             )
     
     print(f"Completed {ticker}\n")
-    # Add a longer delay between companies
-    time.sleep(1)
@@ -3,12 +3,18 @@ import requests
 from bs4 import BeautifulSoup
 import json
 import os
+import sys
 from datetime import datetime
-import time
 import random
-import html2text
 from urllib.parse import urljoin, urlparse
 
+# Add the project root to the Python path for the shared rate limiter and HTML extractor
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.html_extractor import extract_text
+from app.utils.rate_limiter import get_rate_limiter
+
+rate_limiter = get_rate_limiter()
+
 # Publicly available analyst and financial analysis sites
 ANALYST_SOURCES = [
     {
@@ -76,21 +82,16 @@ def get_headers():
         'Cache-Control': 'max-age=0',
     }
 
+def polite_get(url, timeout=15):
+    """GET a page after taking a token from the scraped host's bucket"""
+    rate_limiter.acquire(f"scrape:{urlparse(url).netloc}")
+    return requests.get(url, headers=get_headers(), timeout=timeout)
+
 def extract_text_from_html(html_content, max_length=2000):
     """Extract clean text from HTML content"""
     try:
-        # Use html2text for better formatting
-        h = html2text.HTML2Text()
-        h.ignore_links = True
-        h.ignore_images = True
-        h.ignore_emphasis = False
-        h.body_width = 0  # Don't wrap lines
-        
-        text = h.handle(html_content)
-        
-        # Clean up the text
-        text = text.replace('\n\n\n', '\n\n')  # Remove excessive newlines
-        text = text.strip()
+        # Read one character past the limit so we know whether to add an ellipsis
+        text = extract_text(html_content, max_chars=max_length + 1, separator="\n\n")
         
         # Truncate if too long
         if len(text) > max_length:
@@ -113,7 +114,7 @@ def scrape_seeking_alpha(instrument_data, max_articles=5):
         url = f"https://seekingalpha.com/symbol/{symbol}/analysis"
         print(f"    Scraping {url}")
         
-        response = requests.get(url, headers=get_headers(), timeout=15)
+        response = polite_get(url)
         
         if response.status_code == 200:
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -167,7 +168,7 @@ def scrape_yahoo_analysis(instrument_data, max_articles=3):
         url = f"https://finance.yahoo.com/quote/{symbol}/analysis"
         print(f"    Scraping {url}")
         
-        response = requests.get(url, headers=get_headers(), timeout=15)
+        response = polite_get(url)
         
         if response.status_code == 200:
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -224,7 +225,7 @@ def scrape_generic_financial_sites(instrument_data, max_articles=5):
     for site_url in sites_to_scrape:
         try:
             print(f"    Trying {site_url}")
-            response = requests.get(site_url, headers=get_headers(), timeout=15)
+            response = polite_get(site_url)
             
             if response.status_code == 200:
                 soup = BeautifulSoup(response.content, 'html.parser')
@@ -262,8 +263,6 @@ def scrape_generic_financial_sites(instrument_data, max_articles=5):
                         
                     except Exception as e:
                         continue
-                        
-            time.sleep(random.uniform(1, 3))  # Be respectful
             
         except Exception as e:
             print(f"    Error with {site_url}: {str(e)}")
@@ -283,16 +282,12 @@ def collect_analyst_reports_for_instrument(instrument_name, instrument_data):
     all_articles.extend(seeking_alpha_articles)
     print(f"    Found {len(seeking_alpha_articles)} articles")
     
-    time.sleep(random.uniform(2, 4))
-    
     # Try Yahoo Analysis
     print("  Trying Yahoo Finance Analysis...")
     yahoo_articles = scrape_yahoo_analysis(instrument_data, max_articles=3)
     all_articles.extend(yahoo_articles)
     print(f"    Found {len(yahoo_articles)} articles")
     
-    time.sleep(random.uniform(2, 4))
-    
     # Try generic sites
     print("  Trying generic financial sites...")
     generic_articles = scrape_generic_financial_sites(instrument_data, max_articles=5)
@@ -332,9 +327,6 @@ def main():
     for instrument_name, instrument_data in INSTRUMENTS.items():
         collected = collect_analyst_reports_for_instrument(instrument_name, instrument_data)
         total_articles += collected
-        
-        # Longer pause between instruments to be respectful
-        time.sleep(random.uniform(5, 10))
     
     print(f"\nCollection complete!")
     print(f"Total analyst reports collected: {total_articles}")
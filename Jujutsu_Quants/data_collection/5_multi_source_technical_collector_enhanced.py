@@ -5,10 +5,16 @@ import numpy as np
 import json
 import os
 from datetime import datetime, timedelta
+import sys
 import time
-import random
 import requests
 
+# Add the project root to the Python path for the shared rate limiter
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.rate_limiter import get_rate_limiter
+
+rate_limiter = get_rate_limiter()
+
 # Define instruments with proper Yahoo Finance tickers and Alpha Vantage alternatives
 INSTRUMENTS = {
     "AAPL": {
@@ -99,6 +105,7 @@ def fetch_from_alpha_vantage(symbol, instrument_config, api_key=None):
     }
     
     try:
+        rate_limiter.acquire("alpha_vantage")
         response = requests.get(url, params=params, timeout=15)
         data = response.json()
         
@@ -174,6 +181,7 @@ def fetch_from_federal_reserve(instrument_name):
             'sort_order': 'desc'
         }
         
+        rate_limiter.acquire("fred")
         response = requests.get(url, params=params, timeout=15)
         
         if response.status_code == 200:
@@ -302,6 +310,7 @@ def fetch_historical_data(ticker, instrument_config, period="6mo", max_retries=2
             # Create ticker object with session
             stock = yf.Ticker(yahoo_ticker, session=session)
             
+            rate_limiter.acquire("yahoo_finance")
             data = stock.history(period=period, timeout=30)
             
             if not data.empty and len(data) > 20:  # Need at least 20 data points
@@ -647,9 +656,6 @@ def main():
         except Exception as e:
             results[name] = f"❌ Error: {str(e)}"
             print(f"  ❌ Error processing {name}: {str(e)}")
-        
-        # Delay between instruments
-        time.sleep(random.uniform(3, 6))
     
     # Print summary
     print(f"\n" + "="*60)
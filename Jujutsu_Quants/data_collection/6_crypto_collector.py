@@ -2,8 +2,14 @@
 import requests
 import json
 import os
+import sys
 from datetime import datetime
-import time
+
+# Add the project root to the Python path for the shared rate limiter
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.rate_limiter import get_rate_limiter
+
+rate_limiter = get_rate_limiter()
 
 # Define cryptocurrency assets
 CRYPTO_ASSETS = ["bitcoin", "ethereum"]
@@ -15,19 +21,18 @@ def fetch_coingecko_data(coin_id):
     market_url = f"https://api.coingecko.com/api/v3/coins/{coin_id}"
     
     try:
+        rate_limiter.acquire("coingecko")
         market_response = requests.get(market_url)
         market_response.raise_for_status()
         market_data = market_response.json()
         
         # Historical price data (last 30 days)
         history_url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart?vs_currency=usd&days=30&interval=daily"
+        rate_limiter.acquire("coingecko")
         history_response = requests.get(history_url)
         history_response.raise_for_status()
         history_data = history_response.json()
         
-        # Be respectful of API rate limits
-        time.sleep(1.5)
-        
         return {
             "market_data": market_data,
             "history_data": history_data
@@ -44,13 +49,11 @@ def fetch_crypto_news(coin):
     url = f"https://cryptopanic.com/api/v1/posts/?auth_token=YOUR_FREE_TOKEN&currencies={coin}"
     
     try:
+        rate_limiter.acquire("cryptopanic")
         response = requests.get(url)
         response.raise_for_status()
         news_data = response.json()
         
-        # Be respectful of API rate limits
-        time.sleep(1)
-        
         return news_data
     
     except Exception as e:
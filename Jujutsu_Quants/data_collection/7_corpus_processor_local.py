@@ -0,0 +1,75 @@
+# corpus_processor_local.py
+"""
+Process the corpus into a local snapshot only - no Cloud SQL or Vertex AI resources.
+
+The snapshot (vectors.npy + documents.parquet) is what the cloud processors
+also write when CORPUS_SNAPSHOT_DIR is set; LocalVectorIndex and re-exports
+are rebuilt from it offline (scripts/build_local_index.py --snapshot).
+
+Usage:
+    python 7_corpus_processor_local.py                         # -> processed_corpus/snapshot
+    python 7_corpus_processor_local.py --out /data/snapshot --index .cache/local_index
+"""
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+
+# Add the project root to the Python path for the shared corpus pipeline
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_collection.corpus.runner import run_corpus_pipeline
+from data_collection.corpus.sinks import LocalSnapshotSink, load_snapshot
+
+OUTPUT_DIR = "processed_corpus"
+
+def main():
+    """Main function for local snapshot processing"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=os.getenv("CORPUS_SNAPSHOT_DIR") or os.path.join(OUTPUT_DIR, "snapshot"),
+                        help="Snapshot directory to write")
+    parser.add_argument("--index", default=None, help="Also build a LocalVectorIndex into this directory")
+    args = parser.parse_args()
+
+    print("🚀 TradeSage Local Snapshot Corpus Processor")
+    print("=" * 60)
+    print(f"Snapshot: {args.out}")
+    print("=" * 60)
+
+    print("\n📚 Streaming documents -> chunks -> embeddings -> local snapshot...")
+    summary = run_corpus_pipeline([LocalSnapshotSink(args.out)], output_dir=OUTPUT_DIR)
+
+    if not summary["documents"]:
+        print("❌ No documents found!")
+        return
+
+    snapshot = summary["sinks"]["local"]
+    print(f"📄 Total documents: {summary['documents']}")
+    print(f"📝 Total chunks: {summary['chunks']}, {snapshot['written']} embedded")
+
+    if args.index and snapshot["written"]:
+        from app.services.local_vector_index import LocalVectorIndex
+
+        print("\n🔍 Building local vector index...")
+        documents, vectors = load_snapshot(args.out)
+        LocalVectorIndex.build(documents, vectors, args.index).close()
+
+    metadata = {
+        "snapshot_path": args.out,
+        "total_documents": snapshot["written"],
+        "original_documents": summary["documents"],
+        "chunked_documents": summary["chunks"],
+        "instruments": sorted(summary["instruments"]),
+        "source_types": sorted(summary["source_types"]),
+        "metadata_format": snapshot["metadata_format"],
+        "created_at": datetime.now().isoformat(),
+        "database_type": "local_snapshot"
+    }
+
+    with open(f"{OUTPUT_DIR}/snapshot_metadata_{datetime.now().strftime('%Y%m%d%H%M%S')}.json", 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    print(f"\n✅ Local snapshot complete: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,20 @@
 # corpus_processor_vertex_only.py
 import os
+import sys
 import json
-import html2text
-from bs4 import BeautifulSoup
-import glob
-import uuid
 from datetime import datetime
-from tqdm import tqdm
-import time
+
+# Add the project root to the Python path for the shared corpus pipeline and embedding provider
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.services.document_store import DocumentStore
+from app.utils.embedding_cache import embed_query
+from app.utils.embedding_provider import get_embedder
+from data_collection.corpus.runner import run_corpus_pipeline
+from data_collection.corpus.sinks import VertexJsonlSink, with_local_snapshot
 
 # Google Cloud imports
-from google.cloud import storage
 from google.cloud import aiplatform
 import vertexai
-from vertexai.language_models import TextEmbeddingModel
 
 # Set up environment
 PROJECT_ID = "your-gcp-project-id"  # Update with your Google Cloud project ID
@@ -29,274 +30,6 @@ vertexai.init(project=PROJECT_ID, location=LOCATION)
 OUTPUT_DIR = "processed_corpus"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def preprocess_text(text):
-    """Clean and normalize text content"""
-    if "<" in text and ">" in text:
-        h = html2text.HTML2Text()
-        h.ignore_links = False
-        text = h.handle(text)
-    
-    text = text.replace("\n\n", " ").replace("\t", " ").strip()
-    text = " ".join(text.split())
-    return text
-
-def extract_text_from_item(item, instrument, source_type, file_path):
-    """Extract text content from a JSON item"""
-    title_fields = ["title", "headline", "name", "symbol"]
-    content_fields = ["text", "content", "summary", "description", "analysis_text", "article"]
-    
-    # Find title
-    title = None
-    for field in title_fields:
-        if field in item and item[field]:
-            title = item[field]
-            break
-    
-    # Find content
-    content = None
-    for field in content_fields:
-        if field in item and item[field]:
-            content = item[field]
-            break
-    
-    # Look deeper for nested content
-    if not content and isinstance(item, dict):
-        for key, value in item.items():
-            if isinstance(value, dict):
-                for field in content_fields:
-                    if field in value and value[field]:
-                        content = value[field]
-                        break
-    
-    if not content or len(content) < 50:
-        return None
-    
-    content = preprocess_text(content)
-    
-    # Extract date
-    date = None
-    date_fields = ["date", "publish_date", "published", "timestamp", "created_at"]
-    for field in date_fields:
-        if field in item and item[field]:
-            date = item[field]
-            break
-    
-    if date and isinstance(date, str):
-        try:
-            if 'T' in date:
-                date = date.split('T')[0]
-            elif '/' in date:
-                parts = date.split('/')
-                if len(parts) == 3:
-                    date = f"{parts[2]}-{parts[0]}-{parts[1]}"
-        except:
-            date = None
-    
-    return {
-        "id": str(uuid.uuid4()),
-        "title": title if title else "Untitled Document",
-        "content": content,
-        "instrument": instrument,
-        "source_type": source_type,
-        "file_path": file_path,
-        "date": date if date else "Unknown",
-        "metadata": {
-            "instrument": instrument,
-            "source_type": source_type,
-            "has_title": bool(title)
-        }
-    }
-
-def process_json_files(directory):
-    """Process JSON files and extract text content"""
-    processed_documents = []
-    json_files = glob.glob(f"{directory}/**/*.json", recursive=True)
-    
-    for file_path in tqdm(json_files, desc=f"Processing JSON files in {directory}"):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            parts = file_path.split(os.path.sep)
-            instrument = parts[-2] if len(parts) >= 2 else "unknown"
-            source_type = parts[-3] if len(parts) >= 3 else "unknown"
-            
-            if isinstance(data, list):
-                for item in data:
-                    doc = extract_text_from_item(item, instrument, source_type, file_path)
-                    if doc:
-                        processed_documents.append(doc)
-            else:
-                doc = extract_text_from_item(data, instrument, source_type, file_path)
-                if doc:
-                    processed_documents.append(doc)
-                    
-        except Exception as e:
-            print(f"Error processing {file_path}: {str(e)}")
-    
-    return processed_documents
-
-def process_html_files(directory):
-    """Process HTML files"""
-    processed_documents = []
-    html_files = glob.glob(f"{directory}/**/*.html", recursive=True)
-    
-    for file_path in tqdm(html_files, desc=f"Processing HTML files in {directory}"):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            parts = file_path.split(os.path.sep)
-            instrument = parts[-2] if len(parts) >= 2 else "unknown"
-            source_type = parts[-3] if len(parts) >= 3 else "unknown"
-            
-            # Convert HTML to text
-            soup = BeautifulSoup(html_content, 'html.parser')
-            content = soup.get_text(separator="\n")
-            content = preprocess_text(content)
-            
-            if len(content) < 100:
-                continue
-            
-            filename = os.path.basename(file_path)
-            title = filename.replace('.html', '').replace('_', ' ')
-            
-            doc = {
-                "id": str(uuid.uuid4()),
-                "title": title,
-                "content": content,
-                "instrument": instrument,
-                "source_type": source_type,
-                "file_path": file_path,
-                "date": "Unknown",
-                "metadata": {
-                    "instrument": instrument,
-                    "source_type": source_type,
-                    "has_title": True
-                }
-            }
-            
-            processed_documents.append(doc)
-                    
-        except Exception as e:
-            print(f"Error processing {file_path}: {str(e)}")
-    
-    return processed_documents
-
-def chunk_document(doc, chunk_size=512):
-    """Split document into chunks"""
-    content = doc["content"]
-    paragraphs = content.split("\n\n")
-    
-    chunks = []
-    current_chunk = ""
-    
-    for para in paragraphs:
-        if len(current_chunk) + len(para) <= chunk_size:
-            current_chunk += para + "\n\n"
-        else:
-            if current_chunk:
-                chunk_doc = doc.copy()
-                chunk_doc["id"] = f"{doc['id']}_chunk_{len(chunks)}"
-                chunk_doc["content"] = current_chunk.strip()
-                chunks.append(chunk_doc)
-            
-            current_chunk = para + "\n\n"
-    
-    if current_chunk:
-        chunk_doc = doc.copy()
-        chunk_doc["id"] = f"{doc['id']}_chunk_{len(chunks)}"
-        chunk_doc["content"] = current_chunk.strip()
-        chunks.append(chunk_doc)
-    
-    return chunks
-
-def generate_embeddings_and_upload(documents):
-    """Generate embeddings and upload to GCS in Vector Search format"""
-    print("🔮 Generating embeddings and uploading to GCS...")
-    
-    # Initialize embedding model - use gemini-embedding-001 which requires batch_size=1
-    embedding_model = TextEmbeddingModel.from_pretrained("text-embedding-004")
-    
-    # Create GCS bucket if it doesn't exist
-    storage_client = storage.Client(project=PROJECT_ID)
-    try:
-        bucket = storage_client.get_bucket(BUCKET_NAME)
-        print(f"✅ Using existing bucket: {BUCKET_NAME}")
-    except:
-        bucket = storage_client.create_bucket(BUCKET_NAME, location=LOCATION)
-        print(f"✅ Created new bucket: {BUCKET_NAME}")
-    
-    # Generate embeddings one by one (batch_size=1 for gemini-embedding-001)
-    all_embeddings = []
-    failed_count = 0
-    
-    for i, doc in enumerate(tqdm(documents, desc="Generating embeddings")):
-        try:
-            # Generate embedding for single document
-            embeddings = embedding_model.get_embeddings([doc["content"]])
-            
-            # Format for Vector Search: one JSON object per line
-            embedding_data = {
-                "id": doc["id"],
-                "embedding": embeddings[0].values,
-                "restricts": [
-                    {"namespace": "instrument", "allow": [doc["instrument"]]},
-                    {"namespace": "source_type", "allow": [doc["source_type"]]},
-                    {"namespace": "has_title", "allow": [str(doc["metadata"]["has_title"])]}
-                ]
-            }
-            all_embeddings.append(embedding_data)
-            
-            # Add small delay to avoid rate limiting
-            if i % 10 == 0 and i > 0:
-                time.sleep(0.1)
-                
-        except Exception as e:
-            failed_count += 1
-            print(f"❌ Error generating embedding for document {i+1}: {str(e)}")
-            if failed_count > len(documents) * 0.5:  # If more than 50% fail, stop
-                print(f"❌ Too many failures ({failed_count}), stopping...")
-                break
-            continue
-    
-    if not all_embeddings:
-        raise Exception("No embeddings generated successfully")
-    
-    success_rate = len(all_embeddings) / len(documents) * 100
-    print(f"✅ Successfully generated {len(all_embeddings)}/{len(documents)} embeddings ({success_rate:.1f}% success rate)")
-    
-    # Save embeddings to JSONL file
-    embeddings_file = f"{OUTPUT_DIR}/embeddings_{UID}.jsonl"
-    with open(embeddings_file, 'w') as f:
-        for embedding_data in all_embeddings:
-            # Convert numpy array to list for JSON serialization
-            embedding_copy = embedding_data.copy()
-            # Check if embedding is already a list or needs conversion
-            if hasattr(embedding_copy["embedding"], 'tolist'):
-                embedding_copy["embedding"] = embedding_copy["embedding"].tolist()
-            # If it's already a list, keep it as is
-            f.write(json.dumps(embedding_copy) + '\n')
-    
-    # Upload to GCS
-    blob_name = f"embeddings/embeddings_{UID}.jsonl"
-    blob = bucket.blob(blob_name)
-    blob.upload_from_filename(embeddings_file)
-    
-    gcs_uri = f"gs://{BUCKET_NAME}/{blob_name}"
-    print(f"✅ Uploaded {len(all_embeddings)} embeddings to: {gcs_uri}")
-    
-    # Also save document metadata for reference
-    metadata_file = f"{OUTPUT_DIR}/documents_{UID}.jsonl"
-    with open(metadata_file, 'w') as f:
-        for doc in documents:
-            f.write(json.dumps(doc) + '\n')
-    
-    metadata_blob = bucket.blob(f"metadata/documents_{UID}.jsonl")
-    metadata_blob.upload_from_filename(metadata_file)
-    
-    return gcs_uri
-
 def create_vector_search_index(gcs_uri):
     """Create Vertex AI Vector Search index using the current API"""
     print("🔍 Creating Vertex AI Vector Search index...")
@@ -356,14 +89,13 @@ def deploy_index(my_index, my_index_endpoint):
         print(f"❌ Error deploying index: {str(e)}")
         raise
 
-def create_query_function(my_index_endpoint, deployed_index_id, documents):
-    """Create a query function for the deployed index"""
+def create_query_function(my_index_endpoint, deployed_index_id, doc_lookup):
+    """Create a query function for the deployed index (`doc_lookup`: the run's DocumentStore)"""
     def query_vector_search(query_text, num_neighbors=5, instrument_filter=None):
         """Query the Vector Search index"""
         try:
             # Generate embedding for query using the same model
-            embedding_model = TextEmbeddingModel.from_pretrained("text-embedding-004")
-            query_embedding = embedding_model.get_embeddings([query_text])[0].values
+            query_embedding = embed_query(get_embedder(), query_text)
             
             # Prepare restricts for filtering
             restricts = []
@@ -385,7 +117,7 @@ def create_query_function(my_index_endpoint, deployed_index_id, documents):
             results = []
             for neighbor in response[0]:
                 # Find corresponding document
-                doc = next((d for d in documents if d["id"] == neighbor.id), None)
+                doc = doc_lookup.get(neighbor.id)
                 
                 if doc:
                     results.append({
@@ -415,42 +147,26 @@ def main():
     print(f"Unique ID: {UID}")
     print("=" * 70)
     
-    # Step 1: Process documents
-    print("\n📚 Step 1: Processing documents...")
-    all_documents = []
-    
-    # Process different document types
-    directories = ["news", "analyst_reports", "technical_analysis"]
-    for directory in directories:
-        if os.path.exists(directory):
-            docs = process_json_files(directory)
-            all_documents.extend(docs)
-            print(f"  - {directory}: {len(docs)} documents")
+    # Steps 1-3: Stream documents -> chunks -> embeddings -> JSONL, then upload to GCS
+    # (CORPUS_SNAPSHOT_DIR also writes a local snapshot from the same run)
+    print("\n🔮 Steps 1-3: Processing documents, generating embeddings and uploading...")
+    export_sink = VertexJsonlSink(OUTPUT_DIR, UID, bucket_name=BUCKET_NAME,
+                                  project_id=PROJECT_ID, location=LOCATION)
+    summary = run_corpus_pipeline(with_local_snapshot([export_sink]), output_dir=OUTPUT_DIR)
     
-    # Process HTML files
-    if os.path.exists("earnings"):
-        html_docs = process_html_files("earnings")
-        all_documents.extend(html_docs)
-        print(f"  - earnings: {len(html_docs)} documents")
-    
-    if not all_documents:
+    if not summary["documents"]:
         print("❌ No documents found! Please check your directory structure.")
         return
     
-    print(f"📄 Total documents: {len(all_documents)}")
-    
-    # Step 2: Chunk documents
-    print("\n✂️  Step 2: Chunking documents...")
-    chunked_documents = []
-    for doc in tqdm(all_documents, desc="Chunking"):
-        chunks = chunk_document(doc)
-        chunked_documents.extend(chunks)
+    print(f"📄 Total documents: {summary['documents']}")
+    print(f"📝 Total chunks: {summary['chunks']}")
     
-    print(f"📝 Total chunks: {len(chunked_documents)}")
-    
-    # Step 3: Generate embeddings and upload to GCS
-    print("\n🔮 Step 3: Generating embeddings and uploading...")
-    gcs_uri = generate_embeddings_and_upload(chunked_documents)
+    export = summary["sinks"]["vertex"]
+    if not export["written"]:
+        raise Exception("No embeddings generated successfully")
+    success_rate = export["written"] / summary["chunks"] * 100
+    print(f"✅ Generated {export['written']}/{summary['chunks']} embeddings ({success_rate:.1f}% success rate)")
+    gcs_uri = export["gcs_uri"]
     
     # Step 4: Create Vector Search Index
     print("\n🔍 Step 4: Creating Vector Search Index...")
@@ -466,7 +182,8 @@ def main():
     
     # Step 7: Create query function and test
     print("\n🔍 Step 7: Testing Vector Search...")
-    query_func = create_query_function(my_index_endpoint, deployed_index_id, chunked_documents)
+    doc_lookup = DocumentStore(export["document_store"])
+    query_func = create_query_function(my_index_endpoint, deployed_index_id, doc_lookup)
     
     # Test queries
     test_queries = [
@@ -494,14 +211,15 @@ def main():
         "location": LOCATION,
         "uid": UID,
         "bucket_name": BUCKET_NAME,
-        "total_documents": len(chunked_documents),
-        "original_documents": len(all_documents),
-        "instruments": list(set(doc["instrument"] for doc in all_documents)),
-        "source_types": list(set(doc["source_type"] for doc in all_documents)),
+        "total_documents": export["written"],
+        "original_documents": summary["documents"],
+        "instruments": sorted(summary["instruments"]),
+        "source_types": sorted(summary["source_types"]),
         "index_name": my_index.resource_name,
         "endpoint_name": my_index_endpoint.resource_name,
         "deployed_index_id": deployed_index_id,
         "gcs_uri": gcs_uri,
+        "document_store": export["document_store"],
         "created_at": datetime.now().isoformat()
     }
     
@@ -510,7 +228,7 @@ def main():
     
     print(f"\n✅ Vector Search setup complete!")
     print(f"📊 Summary:")
-    print(f"   - Total chunks: {len(chunked_documents)}")
+    print(f"   - Total chunks: {export['written']}")
     print(f"   - Index: {my_index.display_name}")
     print(f"   - Endpoint: {my_index_endpoint.display_name}")
     print(f"   - Deployed ID: {deployed_index_id}")
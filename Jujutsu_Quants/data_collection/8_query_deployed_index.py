@@ -1,9 +1,14 @@
 # query_deployed_index.py
 import json
 import os
+import sys
 from google.cloud import aiplatform
 import vertexai
-from vertexai.language_models import TextEmbeddingModel
+
+# Add the project root to the Python path for the shared embedding cache and provider
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.embedding_cache import embed_query
+from app.utils.embedding_provider import get_embedder
 
 # Configuration - UPDATE THESE VALUES
 PROJECT_ID = "your-gcp-project-id"  # Update with your project ID
@@ -57,7 +62,7 @@ def create_query_function(endpoint_name, deployed_index_id):
         return None
     
     # Initialize embedding model (same as used for indexing)
-    embedding_model = TextEmbeddingModel.from_pretrained("text-embedding-004")
+    embedder = get_embedder()
     
     def query_vector_search(query_text, num_neighbors=5, instrument_filter=None):
         """Query the Vector Search index"""
@@ -65,7 +70,7 @@ def create_query_function(endpoint_name, deployed_index_id):
             print(f"🔍 Searching for: '{query_text}'")
             
             # Generate embedding for query
-            query_embedding = embedding_model.get_embeddings([query_text])[0].values
+            query_embedding = embed_query(embedder, query_text)
             
             # Prepare restricts for filtering
             restricts = []
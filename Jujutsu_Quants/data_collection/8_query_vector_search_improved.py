@@ -1,11 +1,18 @@
 # query_vector_search_improved.py
 import json
 import os
+import sys
 import time
 from google.cloud import aiplatform
 from google.cloud import storage
 import vertexai
-from vertexai.language_models import TextEmbeddingModel
+
+# Add the project root to the Python path for the shared embedding cache and provider
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.services.document_store import DocumentStore
+from app.services.vector_search_executor import HedgedQueryExecutor, neighbor_id
+from app.utils.embedding_cache import embed_query
+from app.utils.embedding_provider import get_embedder
 
 # Configuration - UPDATE THESE VALUES
 PROJECT_ID = "your-gcp-project-id"  # Update with your project ID
@@ -37,32 +44,42 @@ def load_deployment_metadata():
     return metadata
 
 def load_document_metadata(metadata):
-    """Load document metadata for result enrichment"""
+    """Open the document metadata store for result enrichment (built once per corpus run)"""
     bucket_name = metadata.get("bucket_name")
     uid = metadata.get("uid")
     
-    if not bucket_name or not uid:
-        print("⚠️  Missing bucket or UID in metadata")
+    if not uid:
+        print("⚠️  Missing UID in metadata")
         return {}
     
+    # Built by the corpus processor; rebuilt from its documents JSONL on another machine
+    store_path = metadata.get("document_store") or f"processed_corpus/documents_{uid}.sqlite"
+    documents_file = f"processed_corpus/documents_{uid}.jsonl"
+    
     try:
-        storage_client = storage.Client(project=PROJECT_ID)
-        bucket = storage_client.bucket(bucket_name)
-        blob = bucket.blob(f"metadata/documents_{uid}.jsonl")
-        
-        if not blob.exists():
-            print("⚠️  Document metadata file not found in GCS")
-            return {}
-        
-        content = blob.download_as_text()
-        doc_lookup = {}
-        
-        for line in content.strip().split('\n'):
-            if line:
-                doc = json.loads(line)
-                doc_lookup[doc["id"]] = doc
+        if not os.path.exists(store_path):
+            if not os.path.exists(documents_file):
+                if not bucket_name:
+                    print("⚠️  Missing bucket in metadata")
+                    return {}
+                
+                storage_client = storage.Client(project=PROJECT_ID)
+                bucket = storage_client.bucket(bucket_name)
+                blob = bucket.blob(f"metadata/documents_{uid}.jsonl")
+                
+                if not blob.exists():
+                    print("⚠️  Document metadata file not found in GCS")
+                    return {}
+                
+                # Downloaded to disk and streamed into the store - never held in memory
+                blob.download_to_filename(f"{documents_file}.part")
+                os.replace(f"{documents_file}.part", documents_file)
+            
+            DocumentStore.from_jsonl(documents_file, store_path)
         
-        print(f"✅ Loaded {len(doc_lookup)} document metadata records")
+        # Rows are read by id as results come back; nothing is loaded up front
+        doc_lookup = DocumentStore(store_path)
+        print(f"✅ Opened document metadata store: {store_path}")
         return doc_lookup
         
     except Exception as e:
@@ -117,19 +134,20 @@ def create_robust_query_function(metadata, doc_lookup):
     
     try:
         endpoint = aiplatform.MatchingEngineIndexEndpoint(endpoint_name)
-        embedding_model = TextEmbeddingModel.from_pretrained("text-embedding-004")
+        embedder = get_embedder()
+        executor = HedgedQueryExecutor(endpoint, deployed_index_id, deployment_key=f"{endpoint_name}/{deployed_index_id}")
         
         print(f"✅ Connected to endpoint: {endpoint.display_name}")
         print(f"✅ Using deployed index ID: {deployed_index_id}")
         
         def query_vector_search(query_text, num_neighbors=5, instrument_filter=None, source_filter=None, debug=False):
-            """Robust query function with multiple fallback strategies"""
+            """Robust query function: learned strategy, hedged when slow, filters pushed to the index"""
             try:
                 if debug:
                     print(f"🔍 Debug mode: Searching for '{query_text}'")
                 
                 # Generate embedding for query
-                query_embedding = embedding_model.get_embeddings([query_text])[0].values
+                query_embedding = embed_query(embedder, query_text)
                 
                 # Convert to list format (most compatible)
                 if hasattr(query_embedding, 'tolist'):
@@ -141,108 +159,62 @@ def create_robust_query_function(metadata, doc_lookup):
                     print(f"   Generated embedding: {len(embedding_list)} dimensions")
                     print(f"   Sample values: {embedding_list[:3]}")
                 
-                # Try multiple query strategies
-                strategies = [
-                    {
-                        "name": "Basic Query",
-                        "params": {
-                            "deployed_index_id": deployed_index_id,
-                            "queries": [embedding_list],
-                            "num_neighbors": num_neighbors
-                        }
-                    },
-                    {
-                        "name": "Alternative Parameter Format",
-                        "params": {
-                            "deployed_index_id": deployed_index_id,
-                            "queries": [embedding_list],
-                            "num_neighbors": num_neighbors,
-                            "return_full_datapoint": False
-                        }
-                    }
-                ]
+                # Filters are sent as restricts; the executor starts with the strategy that last
+                # worked for this deployment and only hedges or falls back when it is slow or fails
+                filters = {"instrument": instrument_filter, "source_type": source_filter}
+                documents = {}
                 
-                # Add filtering strategy if filters specified
-                if instrument_filter or source_filter:
-                    restricts = []
-                    if instrument_filter:
-                        restricts.append({"namespace": "instrument", "allow": [instrument_filter]})
-                    if source_filter:
-                        restricts.append({"namespace": "source_type", "allow": [source_filter]})
-                    
-                    strategies.append({
-                        "name": "Filtered Query",
-                        "params": {
-                            "deployed_index_id": deployed_index_id,
-                            "queries": [embedding_list],
-                            "num_neighbors": num_neighbors * 2,  # Get more to filter
-                            "restricts": restricts
-                        }
-                    })
+                def hydrate(neighbors):
+                    """Load document metadata for neighbours not seen yet - one indexed lookup per page"""
+                    missing = [neighbor_id(neighbor) for neighbor in neighbors if neighbor_id(neighbor) not in documents]
+                    if hasattr(doc_lookup, "get_many"):
+                        documents.update(doc_lookup.get_many(missing))
+                    else:
+                        documents.update({doc_id: doc_lookup[doc_id] for doc_id in missing if doc_id in doc_lookup})
                 
-                response = None
-                successful_strategy = None
+                def post_filter(neighbors):
+                    """Client-side filtering, for indexes built without restricts"""
+                    hydrate(neighbors)
+                    kept = []
+                    for neighbor in neighbors:
+                        doc = documents.get(neighbor_id(neighbor), {})
+                        if instrument_filter and doc.get("instrument") != instrument_filter:
+                            continue
+                        if source_filter and doc.get("source_type") != source_filter:
+                            continue
+                        kept.append(neighbor)
+                    return kept
                 
-                for strategy in strategies:
-                    try:
-                        if debug:
-                            print(f"   Trying strategy: {strategy['name']}")
-                        
-                        response = endpoint.find_neighbors(**strategy['params'])
-                        
-                        # Check if we got a valid response
-                        if response and len(response) > 0:
-                            # Handle different response formats
-                            if isinstance(response, list) and len(response[0]) > 0:
-                                successful_strategy = strategy['name']
-                                if debug:
-                                    print(f"   ✅ Strategy '{strategy['name']}' succeeded!")
-                                break
-                            elif hasattr(response, 'neighbors') and response.neighbors:
-                                successful_strategy = strategy['name']
-                                if debug:
-                                    print(f"   ✅ Strategy '{strategy['name']}' succeeded!")
-                                break
-                        
-                        if debug:
-                            print(f"   ⚠️  Strategy '{strategy['name']}' returned empty results")
-                            
-                    except Exception as e:
-                        if debug:
-                            print(f"   ❌ Strategy '{strategy['name']}' failed: {str(e)}")
-                        continue
+                neighbors, successful_strategy = executor.search(embedding_list, num_neighbors, filters,
+                                                                 post_filter=post_filter, debug=debug)
                 
-                if not response or not successful_strategy:
+                if not successful_strategy:
                     print("❌ All query strategies failed")
                     return []
                 
-                # Process the response
-                neighbors = []
-                if isinstance(response, list) and len(response) > 0:
-                    neighbors = response[0]
-                elif hasattr(response, 'neighbors'):
-                    neighbors = response.neighbors[0] if isinstance(response.neighbors, list) else response.neighbors
-                
                 if not neighbors:
                     print("⚠️  No neighbors found in response")
                     return []
                 
                 print(f"✅ Found {len(neighbors)} results using '{successful_strategy}'")
                 
+                # Hydrate only the returned neighbours
+                hydrate(neighbors)
+                
                 # Format results
                 results = []
                 for i, neighbor in enumerate(neighbors):
                     try:
                         # Extract neighbor data
-                        neighbor_id = getattr(neighbor, 'id', str(neighbor))
+                        doc_id = neighbor_id(neighbor)
                         distance = getattr(neighbor, 'distance', 0.0)
                         
                         # Look up document metadata
-                        doc = doc_lookup.get(neighbor_id, {})
+                        doc = documents.get(doc_id, {})
                         
                         result = {
                             "rank": i + 1,
-                            "id": neighbor_id,
+                            "id": doc_id,
                             "distance": distance,
                             "similarity": 1 - distance if distance <= 1 else 1 / (1 + distance),
                             "title": doc.get("title", "Unknown Document"),
@@ -259,23 +231,14 @@ def create_robust_query_function(metadata, doc_lookup):
                             print(f"   ⚠️  Error processing result {i}: {str(e)}")
                         continue
                 
-                # Apply manual filtering if needed
-                if instrument_filter or source_filter:
-                    filtered_results = []
-                    for result in results:
-                        if instrument_filter and result["instrument"] != instrument_filter:
-                            continue
-                        if source_filter and result["source_type"] != source_filter:
-                            continue
-                        filtered_results.append(result)
-                    results = filtered_results[:num_neighbors]
-                
                 return results[:num_neighbors]
                 
             except Exception as e:
                 print(f"❌ Error in query function: {str(e)}")
                 return []
         
+        # Callers release the executor's worker threads when done
+        query_vector_search.close = executor.close
         return query_vector_search
         
     except Exception as e:
@@ -472,12 +435,15 @@ def main():
         return
     
     # Run tests
-    if run_comprehensive_tests(query_func, metadata):
-        print("\n✅ System is working! Ready for interactive search.")
-        interactive_search(query_func)
-    else:
-        print("\n❌ System tests failed. Please check your deployment.")
-        print("💡 Try waiting longer or recreating the index.")
+    try:
+        if run_comprehensive_tests(query_func, metadata):
+            print("\n✅ System is working! Ready for interactive search.")
+            interactive_search(query_func)
+        else:
+            print("\n❌ System tests failed. Please check your deployment.")
+            print("💡 Try waiting longer or recreating the index.")
+    finally:
+        query_func.close()
 
 if __name__ == "__main__":
     import sys
@@ -1,9 +1,14 @@
 # cloudsql_diagnostics.py
 import os
+import sys
 import json
 from corpus_processor_cloudsql import CloudSQLVectorDB, create_query_function
 import vertexai
-from vertexai.language_models import TextEmbeddingModel
+
+# Add the project root to the Python path for the shared embedding cache and provider
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.embedding_cache import embed_query
+from app.utils.embedding_provider import get_embedder
 
 # Configuration
 PROJECT_ID = "letsstock-with-ai"
@@ -26,7 +31,7 @@ def test_similarity_thresholds():
     
     # Initialize embedding model
     vertexai.init(project=PROJECT_ID, location=REGION)
-    embedding_model = TextEmbeddingModel.from_pretrained("text-embedding-004")
+    embedder = get_embedder()
     
     # Test queries
     test_queries = [
@@ -45,8 +50,7 @@ def test_similarity_thresholds():
         print("-" * 40)
         
         # Generate embedding
-        query_embedding = embedding_model.get_embeddings([query])[0].values
-        embedding_list = query_embedding.tolist() if hasattr(query_embedding, 'tolist') else list(query_embedding)
+        embedding_list = embed_query(embedder, query)
         
         for threshold in thresholds:
             results = db.semantic_search(
@@ -1,9 +1,14 @@
 # standalone_cloudsql_diagnostics.py
 import json
 import os
+import sys
 from google.cloud.sql.connector import Connector
 import vertexai
-from vertexai.language_models import TextEmbeddingModel
+
+# Add the project root to the Python path for the shared embedding cache and provider
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.embedding_cache import embed_query
+from app.utils.embedding_provider import get_embedder
 
 # Configuration
 PROJECT_ID = "letsstock-with-ai"
@@ -179,7 +184,7 @@ def test_search_with_thresholds():
     
     # Initialize embedding model
     vertexai.init(project=PROJECT_ID, location=REGION)
-    embedding_model = TextEmbeddingModel.from_pretrained("text-embedding-004")
+    embedder = get_embedder()
     
     # Test queries
     test_queries = [
@@ -196,8 +201,7 @@ def test_search_with_thresholds():
         
         try:
             # Generate embedding
-            query_embedding = embedding_model.get_embeddings([query_text])[0].values
-            embedding_list = query_embedding.tolist() if hasattr(query_embedding, 'tolist') else list(query_embedding)
+            embedding_list = embed_query(embedder, query_text)
             embedding_str = '[' + ','.join(map(str, embedding_list)) + ']'
             
             # Test different thresholds
@@ -236,7 +240,7 @@ def interactive_search():
     
     # Initialize embedding model
     vertexai.init(project=PROJECT_ID, location=REGION)
-    embedding_model = TextEmbeddingModel.from_pretrained("text-embedding-004")
+    embedder = get_embedder()
     
     while True:
         print("\n" + "-" * 30)
@@ -250,8 +254,7 @@ def interactive_search():
         
         try:
             # Generate embedding
-            query_embedding = embedding_model.get_embeddings([user_input])[0].values
-            embedding_list = query_embedding.tolist() if hasattr(query_embedding, 'tolist') else list(query_embedding)
+            embedding_list = embed_query(embedder, user_input)
             embedding_str = '[' + ','.join(map(str, embedding_list)) + ']'
             
             # Try different thresholds automatically
@@ -0,0 +1,201 @@
+# data_collection/corpus/bulk_loader.py - COPY-based bulk load of corpus documents into pgvector
+import json
+import os
+import struct
+import uuid
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+BULK_LOAD_FORMAT = os.getenv("BULK_LOAD_FORMAT", "binary")          # binary | text
+BULK_LOAD_CHUNK_ROWS = int(os.getenv("BULK_LOAD_CHUNK_ROWS", "20000"))  # Rows per COPY statement
+BULK_LOAD_FLUSH_BYTES = 1 << 20                                      # Stream to the server in ~1 MB pieces
+
+# Dropping the vector index and rebuilding it once is faster than updating it row by row
+# when a load adds at least this fraction of the table
+INDEX_REBUILD_FRACTION = 0.2
+
+COPY_COLUMNS = ["id", "title", "content", "instrument", "source_type", "file_path",
+                "date_published", "embedding", "metadata"]
+
+STAGING_TABLE = "documents_staging"
+
+PG_EPOCH = date(2000, 1, 1)
+BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+BINARY_TRAILER = struct.pack("!h", -1)
+NULL_FIELD = struct.pack("!i", -1)
+
+
+def _parse_date(value) -> Optional[date]:
+    if not value or value == "Unknown":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def _row_values(doc: Dict[str, Any]) -> List[Any]:
+    return [
+        doc["id"],
+        doc.get("title"),
+        doc.get("content"),
+        doc.get("instrument"),
+        doc.get("source_type"),
+        doc.get("file_path"),
+        _parse_date(doc.get("date_published", doc.get("date"))),
+        doc["embedding"],
+        doc.get("metadata") or {}
+    ]
+
+
+def _binary_field(data: Optional[bytes]) -> bytes:
+    return NULL_FIELD if data is None else struct.pack("!i", len(data)) + data
+
+
+def _binary_text(value: Optional[str]) -> Optional[bytes]:
+    # PostgreSQL text cannot hold NUL characters
+    return None if value is None else str(value).replace("\x00", "").encode("utf-8")
+
+
+def encode_binary_row(doc: Dict[str, Any]) -> bytes:
+    """
+    One tuple in PostgreSQL binary COPY format.
+
+    uuid as 16 raw bytes, date as days since 2000-01-01, vector in
+    pgvector's wire format (int16 dim, int16 unused, float4 values) and
+    jsonb as version byte 1 + JSON text - no float-to-text round trip.
+    """
+    doc_id, title, content, instrument, source_type, file_path, published, embedding, metadata = _row_values(doc)
+    vector = struct.pack(f"!hh{len(embedding)}f", len(embedding), 0, *embedding)
+    fields = [
+        uuid.UUID(str(doc_id)).bytes,
+        _binary_text(title),
+        _binary_text(content),
+        _binary_text(instrument),
+        _binary_text(source_type),
+        _binary_text(file_path),
+        None if published is None else struct.pack("!i", (published - PG_EPOCH).days),
+        vector,
+        b"\x01" + json.dumps(metadata, default=str).replace("\\u0000", "").encode("utf-8")
+    ]
+    return struct.pack("!h", len(fields)) + b"".join(_binary_field(field) for field in fields)
+
+
+def _text_field(value) -> str:
+    if value is None:
+        return "\\N"
+    text = str(value).replace("\x00", "")
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def encode_text_row(doc: Dict[str, Any]) -> bytes:
+    """One line in PostgreSQL text COPY format (tab separated, backslash escaped)"""
+    doc_id, title, content, instrument, source_type, file_path, published, embedding, metadata = _row_values(doc)
+    fields = [
+        str(doc_id), title, content, instrument, source_type, file_path,
+        published.isoformat() if published else None,
+        "[" + ",".join(map(repr, map(float, embedding))) + "]",
+        json.dumps(metadata, default=str).replace("\\u0000", "")
+    ]
+    return ("\t".join(_text_field(field) for field in fields) + "\n").encode("utf-8")
+
+
+def copy_stream(documents: Iterable[Dict[str, Any]], copy_format: str = BULK_LOAD_FORMAT) -> Iterator[bytes]:
+    """COPY FROM STDIN payload, generated lazily in ~1 MB pieces"""
+    binary = copy_format == "binary"
+    encode = encode_binary_row if binary else encode_text_row
+    buffer = bytearray(BINARY_HEADER if binary else b"")
+    for doc in documents:
+        buffer += encode(doc)
+        if len(buffer) >= BULK_LOAD_FLUSH_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if binary:
+        buffer += BINARY_TRAILER
+    if buffer:
+        yield bytes(buffer)
+
+
+def _copy(cursor, sql: str, stream: Iterator[bytes]):
+    if hasattr(cursor, "copy_expert"):
+        # psycopg2 wants a file-like object
+        import io
+        cursor.copy_expert(sql, io.BytesIO(b"".join(stream)))
+    else:
+        # pg8000 consumes any iterable of bytes
+        cursor.execute(sql, stream=stream)
+
+
+def bulk_load_documents(conn, documents: List[Dict[str, Any]], copy_format: str = BULK_LOAD_FORMAT,
+                        chunk_rows: int = BULK_LOAD_CHUNK_ROWS,
+                        drop_vector_index: Optional[bool] = None,
+                        vector_index_name: str = "idx_documents_embedding") -> Dict[str, Any]:
+    """
+    Load documents (with embeddings) into `documents` in one transaction.
+
+    Rows are streamed with COPY into a temporary (not WAL-logged) staging
+    table, then merged with a single INSERT ... SELECT ... ON CONFLICT (id)
+    that only rewrites rows whose content changed. For large loads the
+    vector index is dropped before the merge (`drop_vector_index`, default:
+    when the load is at least INDEX_REBUILD_FRACTION of the table); the
+    caller rebuilds it afterwards.
+
+    Returns:
+        {"staged", "upserted", "index_dropped"}
+    """
+    columns = ", ".join(COPY_COLUMNS)
+    copy_options = "(FORMAT binary)" if copy_format == "binary" else ""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE}
+            (LIKE documents INCLUDING DEFAULTS) ON COMMIT DELETE ROWS;
+        """)
+
+        for start in range(0, len(documents), chunk_rows):
+            _copy(cursor, f"COPY {STAGING_TABLE} ({columns}) FROM STDIN {copy_options}",
+                  copy_stream(documents[start:start + chunk_rows], copy_format))
+
+        if drop_vector_index is None:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = 'documents'")
+            row = cursor.fetchone()
+            existing_rows = max(row[0] if row else 0, 0)
+            drop_vector_index = len(documents) >= existing_rows * INDEX_REBUILD_FRACTION
+        if drop_vector_index:
+            cursor.execute(f"DROP INDEX IF EXISTS {vector_index_name}")
+
+        # One staged copy per id (an upsert cannot touch a row twice); rows identical in every
+        # updated column are left untouched, so a rerun over an unchanged corpus writes nothing
+        cursor.execute(f"""
+            INSERT INTO documents ({columns})
+            SELECT DISTINCT ON (id) {columns}
+            FROM {STAGING_TABLE}
+            ORDER BY id
+            ON CONFLICT (id) DO UPDATE SET
+                title = EXCLUDED.title,
+                content = EXCLUDED.content,
+                instrument = EXCLUDED.instrument,
+                source_type = EXCLUDED.source_type,
+                file_path = EXCLUDED.file_path,
+                date_published = EXCLUDED.date_published,
+                embedding = EXCLUDED.embedding,
+                metadata = EXCLUDED.metadata,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE (documents.title, documents.content, documents.instrument, documents.source_type,
+                   documents.file_path, documents.date_published, documents.embedding, documents.metadata)
+                IS DISTINCT FROM (EXCLUDED.title, EXCLUDED.content, EXCLUDED.instrument, EXCLUDED.source_type,
+                   EXCLUDED.file_path, EXCLUDED.date_published, EXCLUDED.embedding, EXCLUDED.metadata);
+        """)
+        upserted = cursor.rowcount
+
+        conn.commit()
+        return {"staged": len(documents), "upserted": upserted, "index_dropped": drop_vector_index}
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
@@ -0,0 +1,194 @@
+# data_collection/corpus/chunker.py - Sentence and token aware chunking with overlap
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from data_collection.corpus.ids import chunk_id
+
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "256"))         # Chunk size limit
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))  # Carried over from the previous chunk
+CHUNK_MIN_TOKENS = int(os.getenv("CHUNK_MIN_TOKENS", "16"))          # Smaller tails are merged into the last chunk
+
+# Words, numbers (3.5, 1,200) and single punctuation marks - close to what subword tokenizers count
+TOKEN_RE = re.compile(r"\w+(?:[.,']\w+)*|[^\w\s]")
+PARAGRAPH_BREAK_RE = re.compile(r"\n\s*\n")
+# Sentence end: terminal punctuation (plus closing quotes/brackets), whitespace, then an upper-case or digit start
+SENTENCE_END_RE = re.compile(r"[.!?]+[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])")
+ABBREVIATIONS = {
+    "inc", "corp", "co", "ltd", "llc", "plc", "mr", "mrs", "ms", "dr", "st", "vs", "no", "est", "approx",
+    "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+    "u.s", "u.k", "e.g", "i.e", "etc", "fig", "avg"
+}
+
+Span = Tuple[int, int, int]  # (start, end, tokens) - character offsets into the parent text
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count (words, numbers and punctuation marks)"""
+    return len(TOKEN_RE.findall(text))
+
+
+def _is_abbreviation(text: str, dot: int) -> bool:
+    word_start = dot
+    while word_start > 0 and (text[word_start - 1].isalnum() or text[word_start - 1] == "."):
+        word_start -= 1
+    word = text[word_start:dot].lower()
+    # Initials ("J. Powell") and known abbreviations do not end a sentence
+    return len(word) == 1 and word.isalpha() or word in ABBREVIATIONS
+
+
+def sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """(start, end) of every sentence; paragraph breaks always end a sentence"""
+    spans = []
+    paragraph_start = 0
+    for paragraph_break in list(PARAGRAPH_BREAK_RE.finditer(text)) + [None]:
+        paragraph_end = paragraph_break.start() if paragraph_break else len(text)
+        start = paragraph_start
+        for match in SENTENCE_END_RE.finditer(text, paragraph_start, paragraph_end):
+            if text[match.start()] == "." and _is_abbreviation(text, match.start()):
+                continue
+            end = match.end() - (len(match.group()) - len(match.group().rstrip()))
+            if end > start:
+                spans.append((start, end))
+            start = match.end()
+        if paragraph_end > start and text[start:paragraph_end].strip():
+            spans.append((start, paragraph_end))
+        if paragraph_break:
+            paragraph_start = paragraph_break.end()
+    return spans
+
+
+def _token_spans(text: str, start: int, end: int) -> List[Tuple[int, int]]:
+    return [match.span() for match in TOKEN_RE.finditer(text, start, end)]
+
+
+class Chunker:
+    """
+    Splits text into chunks of at most `max_tokens` tokens on sentence boundaries.
+
+    Sentences are packed greedily; each chunk starts with the last
+    sentences of the previous one, up to `overlap_tokens`, so a fact at a
+    boundary is retrievable from both sides. A sentence longer than
+    `max_tokens` is cut at token boundaries (with token overlap). A final
+    chunk below `min_tokens` is merged into its predecessor when it fits
+    rather than embedded on its own.
+
+    Chunks are (start, end, tokens) character offsets into the input; no
+    text is copied until a caller slices it.
+    """
+
+    def __init__(self, max_tokens: int = CHUNK_MAX_TOKENS, overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+                 min_tokens: int = CHUNK_MIN_TOKENS, token_counter: Callable[[str], int] = count_tokens):
+        if max_tokens < 1 or not 0 <= overlap_tokens < max_tokens:
+            raise ValueError("Need max_tokens >= 1 and 0 <= overlap_tokens < max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.min_tokens = min_tokens
+        self.token_counter = token_counter
+
+    def _split_long_sentence(self, text: str, start: int, end: int) -> List[Span]:
+        tokens = _token_spans(text, start, end)
+        step = self.max_tokens - self.overlap_tokens
+        pieces = []
+        for first in range(0, len(tokens), step):
+            window = tokens[first:first + self.max_tokens]
+            pieces.append((window[0][0], window[-1][1], len(window)))
+            if first + self.max_tokens >= len(tokens):
+                break
+        return pieces
+
+    def spans(self, text: str) -> List[Span]:
+        """Chunk offsets for `text`"""
+        sentences: List[Span] = []
+        for start, end in sentence_spans(text):
+            tokens = self.token_counter(text[start:end])
+            if tokens > self.max_tokens:
+                # Oversized pieces become chunks of their own
+                sentences.extend((piece_start, piece_end, -piece_tokens) for piece_start, piece_end, piece_tokens
+                                 in self._split_long_sentence(text, start, end))
+            elif tokens:
+                sentences.append((start, end, tokens))
+
+        chunks: List[Span] = []
+        current: List[Span] = []
+        current_tokens = 0
+        carried = 0  # Sentences at the head of `current` that repeat the previous chunk
+        for sentence in sentences:
+            start, end, tokens = sentence
+            if tokens < 0:
+                if len(current) > carried:
+                    chunks.append(self._close(current, current_tokens))
+                chunks.append((start, end, -tokens))
+                current, current_tokens, carried = [], 0, 0
+                continue
+
+            if current and current_tokens + tokens > self.max_tokens:
+                chunks.append(self._close(current, current_tokens))
+                current, current_tokens = self._overlap(current, tokens)
+                carried = len(current)
+            current.append(sentence)
+            current_tokens += tokens
+
+        if len(current) > carried:
+            if chunks and current_tokens < self.min_tokens:
+                last_start, _, last_tokens = chunks[-1]
+                tail_tokens = sum(tokens for _, _, tokens in current[carried:])
+                if last_tokens + tail_tokens <= self.max_tokens:
+                    chunks[-1] = (last_start, current[-1][1], last_tokens + tail_tokens)
+                    return chunks
+            chunks.append(self._close(current, current_tokens))
+        return chunks
+
+    @staticmethod
+    def _close(sentences: List[Span], tokens: int) -> Span:
+        return sentences[0][0], sentences[-1][1], tokens
+
+    def _overlap(self, sentences: List[Span], next_tokens: int) -> Tuple[List[Span], int]:
+        """Trailing sentences of a finished chunk that fit the overlap budget and leave room for the next"""
+        kept: List[Span] = []
+        kept_tokens = 0
+        for sentence in reversed(sentences):
+            tokens = sentence[2]
+            if kept_tokens + tokens > self.overlap_tokens or kept_tokens + tokens + next_tokens > self.max_tokens:
+                break
+            kept.insert(0, sentence)
+            kept_tokens += tokens
+        return kept, kept_tokens
+
+
+_default_chunker: Optional[Chunker] = None
+
+
+def chunk_document(doc: Dict[str, Any], chunker: Optional[Chunker] = None) -> List[Dict[str, Any]]:
+    """
+    Chunk documents for embedding, one dict per chunk.
+
+    Chunk dicts share the parent's field values; the chunk text is a
+    slice of the parent content. Each chunk gets its own metadata dict
+    with the chunk's position (offsets into the parent content) instead
+    of sharing - and overwriting - the parent's.
+    """
+    global _default_chunker
+    if chunker is None:
+        _default_chunker = _default_chunker or Chunker()
+        chunker = _default_chunker
+
+    content = doc["content"]
+    spans = chunker.spans(content)
+    chunks = []
+    for index, (start, end, tokens) in enumerate(spans):
+        text = content[start:end]
+        chunk = {key: value for key, value in doc.items() if key not in ("content", "metadata")}
+        chunk["id"] = chunk_id(doc["id"], start, text)
+        chunk["content"] = text
+        chunk["metadata"] = {
+            **(doc.get("metadata") or {}),
+            "parent_id": doc["id"],
+            "chunk_index": index,
+            "chunk_count": len(spans),
+            "char_start": start,
+            "char_end": end,
+            "token_count": tokens
+        }
+        chunks.append(chunk)
+    return chunks
@@ -0,0 +1,155 @@
+# data_collection/corpus/dates.py - Memoized publication date parsing for corpus ingestion
+import os
+import re
+import threading
+from datetime import date, datetime
+from email.utils import parsedate
+from functools import lru_cache
+from typing import Dict, Optional
+
+DATE_CACHE_SIZE = int(os.getenv("DATE_CACHE_SIZE", "65536"))  # Distinct raw date strings remembered
+
+# Fallback formats, tried in this order (a source's last working format goes first)
+DATE_FORMATS = [
+    "%d %b %Y",             # 21 May 2025
+    "%B %d, %Y",            # May 21, 2025
+    "%b %d, %Y",            # May 21, 2025 (abbreviated month)
+    "%m/%d/%Y",             # 05/21/2025
+    "%d/%m/%Y",             # 21/05/2025
+    "%a, %d %b %Y %H:%M:%S",  # Wed, 21 May 2025 19:35:38 (no zone)
+]
+
+# Formats that can read the same string two ways (05/06/2025). Never remembered per source, so
+# these strings always resolve in DATE_FORMATS order, whatever the parser has seen before
+AMBIGUOUS_FORMATS = {"%m/%d/%Y", "%d/%m/%Y"}
+
+# 2025-05-21, 2025-05-21T19:35:38, ...Z, ...123456, ...+02:00, 2025-05-21 19:35:38
+ISO_DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})(?:$|[T ])")
+# RSS / email style: Wed, 21 May 2025 19:35:38 GMT
+RFC_2822_RE = re.compile(r"[A-Z][a-z]{2}, \d{1,2} [A-Z][a-z]{2} \d{4}")
+# Last resort: a year-month-day anywhere in the string
+EMBEDDED_DATE_RE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+
+
+class DateParser:
+    """
+    Publication dates from the many string formats found in collected items.
+
+    Checked in order of cost: ISO-8601 prefixes and RFC 2822 dates are
+    recognized without strptime; then the format that last worked for the
+    same source is tried before the rest of DATE_FORMATS, since items from
+    one source share a format and the first attempt almost always hits.
+    Day/month orders (AMBIGUOUS_FORMATS) are never remembered, so a date
+    never depends on which strings a parser (or pool worker) saw first.
+    Results - including failures - are cached per (source, raw string) in
+    an LRU, so repeated strings (feeds re-collected daily, one date per
+    batch) cost a dict lookup.
+    """
+
+    def __init__(self, formats=DATE_FORMATS, cache_size: int = DATE_CACHE_SIZE):
+        self.formats = list(formats)
+        self._source_formats: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.stats = {"iso": 0, "rfc2822": 0, "remembered": 0, "format": 0, "embedded": 0, "failed": 0}
+        self._cached_parse = lru_cache(maxsize=cache_size)(self._parse)
+
+    def parse(self, value, source: Optional[str] = None) -> Optional[date]:
+        """The date in `value` (str, date or datetime), or None"""
+        if not value:
+            return None
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        if not isinstance(value, str):
+            return None
+        return self._cached_parse(source, value)
+
+    def parse_iso(self, value, source: Optional[str] = None) -> Optional[str]:
+        """Like `parse`, as a YYYY-MM-DD string"""
+        parsed = self.parse(value, source)
+        return parsed.isoformat() if parsed else None
+
+    def _count(self, path: str):
+        with self._lock:
+            self.stats[path] += 1
+
+    def _parse(self, source: Optional[str], raw: str) -> Optional[date]:
+        text = raw.strip()
+
+        match = ISO_DATE_RE.match(text)
+        if match:
+            parsed = self._from_parts(*match.groups())
+            if parsed:
+                self._count("iso")
+                return parsed
+
+        if RFC_2822_RE.match(text):
+            parts = parsedate(text)
+            if parts:
+                self._count("rfc2822")
+                return self._from_parts(*parts[:3])
+
+        remembered = self._source_formats.get(source) if source else None
+        if remembered:
+            parsed = self._strptime(text, remembered)
+            if parsed:
+                self._count("remembered")
+                return parsed
+
+        for fmt in self.formats:
+            if fmt == remembered:
+                continue
+            parsed = self._strptime(text, fmt)
+            if parsed:
+                if source and fmt not in AMBIGUOUS_FORMATS:
+                    self._source_formats[source] = fmt
+                self._count("format")
+                return parsed
+
+        match = EMBEDDED_DATE_RE.search(text)
+        if match:
+            parsed = self._from_parts(*match.groups())
+            if parsed:
+                self._count("embedded")
+                return parsed
+
+        self._count("failed")
+        return None
+
+    @staticmethod
+    def _strptime(text: str, fmt: str) -> Optional[date]:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _from_parts(year, month, day) -> Optional[date]:
+        try:
+            return date(int(year), int(month), int(day))
+        except ValueError:
+            return None
+
+    def cache_info(self):
+        return self._cached_parse.cache_info()
+
+
+# Shared parser - one per process, so each worker of a parsing pool has its own cache
+_date_parser = None
+_date_parser_lock = threading.Lock()
+
+
+def get_date_parser() -> DateParser:
+    """Get or create the process-wide date parser"""
+    global _date_parser
+    if _date_parser is None:
+        with _date_parser_lock:
+            if _date_parser is None:
+                _date_parser = DateParser()
+    return _date_parser
+
+
+def parse_date(value, source: Optional[str] = None) -> Optional[date]:
+    """Parse a publication date with the shared parser"""
+    return get_date_parser().parse(value, source)
@@ -0,0 +1,303 @@
+# data_collection/corpus/embedding_stage.py - Concurrent, resumable embedding of corpus chunks
+import base64
+import json
+import os
+import random
+import threading
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.utils.embedding_provider import EMBEDDING_CONCURRENCY, EmbeddingProvider, get_embedder
+from data_collection.corpus.ids import content_hash
+
+EMBEDDING_CHECKPOINT_PATH = os.getenv("EMBEDDING_CHECKPOINT_PATH", "processed_corpus/embedding_checkpoint.jsonl")
+EMBED_STAGE_MAX_BATCH = int(os.getenv("EMBED_STAGE_MAX_BATCH", "250"))          # Vertex: 250 texts per request
+EMBED_STAGE_MAX_BATCH_TOKENS = int(os.getenv("EMBED_STAGE_MAX_BATCH_TOKENS", "18000"))  # Vertex: 20k tokens per request
+EMBED_STAGE_INITIAL_BATCH = 32
+EMBED_STAGE_MAX_RETRIES = int(os.getenv("EMBED_STAGE_MAX_RETRIES", "6"))
+
+# Errors worth retrying (quota, overload, transient server errors)
+RETRYABLE_ERRORS = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded",
+                    "InternalServerError", "Aborted", "ConnectionError", "TimeoutError"}
+QUOTA_MARKERS = ("429", "quota", "rate limit", "resource exhausted")
+OVERSIZE_MARKERS = ("token", "too long", "too large", "exceeds", "maximum")
+
+
+def content_key(model_name: str, text: str) -> str:
+    """Store key: the same (normalized) text embedded by the same model is only ever embedded once"""
+    return f"{model_name}:{content_hash(text)}"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token) for request budgeting"""
+    return len(text) // 4 + 1
+
+
+def _is_quota_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return type(error).__name__ in {"ResourceExhausted", "TooManyRequests"} or \
+        any(marker in message for marker in QUOTA_MARKERS)
+
+
+def _is_retryable(error: Exception) -> bool:
+    return type(error).__name__ in RETRYABLE_ERRORS or _is_quota_error(error)
+
+
+def _is_oversized(error: Exception) -> bool:
+    message = str(error).lower()
+    return type(error).__name__ == "InvalidArgument" and any(marker in message for marker in OVERSIZE_MARKERS)
+
+
+class EmbeddingCheckpoint:
+    """
+    Append-only JSONL file of finished embeddings: {"key", "vector"} per line,
+    the vector as base64 float32 (4 KB per 768-d vector instead of ~15 KB of
+    JSON floats).
+
+    Each completed batch is appended and flushed, so a crash loses at most
+    the batches in flight. A line torn by a crash is cut off on load. Kept
+    across runs, it is the embedding store of incremental builds: chunks
+    whose content was embedded before are never sent to the model again.
+
+    `scan` indexes the file by key (offset and length only) and `read`
+    decodes single vectors on demand, so a large checkpoint is not held in
+    memory.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = None
+        self._reader = None
+        self.index: Dict[str, Tuple[int, int]] = {}
+
+    @staticmethod
+    def _decode(line: bytes) -> Tuple[str, array]:
+        record = json.loads(line)
+        vector = array("f")
+        vector.frombytes(base64.b64decode(record["vector"]))
+        return record["key"], vector
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """Index the checkpoint: {key: (offset, length)}; a torn tail is truncated"""
+        self.index = {}
+        if not os.path.exists(self.path):
+            return self.index
+
+        valid_length = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    key, _ = self._decode(line)
+                except (ValueError, KeyError):
+                    break
+                self.index[key] = (valid_length, len(line))
+                valid_length += len(line)
+
+        if valid_length < os.path.getsize(self.path):
+            print(f"⚠️  Dropping torn checkpoint tail in {self.path}")
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_length)
+        return self.index
+
+    def read(self, key: str) -> array:
+        """One checkpointed vector (the checkpoint must have been scanned)"""
+        offset, length = self.index[key]
+        if self._reader is None:
+            self._reader = open(self.path, "rb")
+        self._reader.seek(offset)
+        return self._decode(self._reader.read(length))[1]
+
+    def load(self) -> Dict[str, array]:
+        """All checkpointed vectors by key"""
+        return {key: self.read(key) for key in self.scan()}
+
+    def append(self, records: Sequence[Tuple[str, array]]):
+        """Durably append finished vectors"""
+        if self._file is None:
+            self._file = open(self.path, "ab")
+            self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        lines = [
+            json.dumps({"key": key, "vector": base64.b64encode(vector.tobytes()).decode("ascii")}).encode("utf-8") + b"\n"
+            for key, vector in records
+        ]
+        self._file.write(b"".join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        for (key, _), line in zip(records, lines):
+            self.index[key] = (offset, len(line))
+            offset += len(line)
+
+    def close(self):
+        for handle in (self._file, self._reader):
+            if handle is not None:
+                handle.close()
+        self._file = None
+        self._reader = None
+
+
+class EmbeddingStage:
+    """
+    Embeds corpus chunks with `concurrency` requests in flight.
+
+    Batches are packed up to a token budget and a batch size that adapts:
+    it grows after successful calls and halves on quota errors, staying
+    within the model's per-request limits. Quota and transient errors are
+    retried with exponential backoff and jitter; a batch rejected as too
+    large is split in half. Finished vectors go to an append-only
+    checkpoint, so a rerun only embeds what is missing.
+    """
+
+    def __init__(self, provider: Optional[EmbeddingProvider] = None,
+                 checkpoint_path: Optional[str] = EMBEDDING_CHECKPOINT_PATH,
+                 concurrency: int = EMBEDDING_CONCURRENCY, max_batch_size: int = EMBED_STAGE_MAX_BATCH,
+                 max_batch_tokens: int = EMBED_STAGE_MAX_BATCH_TOKENS, max_retries: int = EMBED_STAGE_MAX_RETRIES,
+                 base_delay: float = 1.0, max_delay: float = 60.0, quiet: bool = False):
+        self.provider = provider or get_embedder().provider
+        self.checkpoint = EmbeddingCheckpoint(checkpoint_path) if checkpoint_path else None
+        self.concurrency = max(1, concurrency)
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_batch_tokens = max_batch_tokens
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.quiet = quiet
+
+        self._scanned = False
+        self._batch_size = min(EMBED_STAGE_INITIAL_BATCH, self.max_batch_size)
+        self._batch_lock = threading.Lock()
+        self.stats = {"embedded": 0, "resumed": 0, "failed": 0, "calls": 0, "retries": 0, "splits": 0}
+
+    def _grow(self):
+        with self._batch_lock:
+            self._batch_size = min(self.max_batch_size, self._batch_size + max(1, self._batch_size // 4))
+            self.stats["calls"] += 1
+
+    def _shrink(self):
+        with self._batch_lock:
+            self._batch_size = max(1, self._batch_size // 2)
+
+    def _next_batch(self, items: List[Tuple[str, str]], start: int) -> List[Tuple[str, str]]:
+        with self._batch_lock:
+            size = self._batch_size
+        batch, tokens = [], 0
+        for item in items[start:start + size]:
+            item_tokens = estimate_tokens(item[1])
+            if batch and tokens + item_tokens > self.max_batch_tokens:
+                break
+            batch.append(item)
+            tokens += item_tokens
+        return batch
+
+    def _embed_with_retry(self, batch: List[Tuple[str, str]]) -> List[List[float]]:
+        texts = [text for _, text in batch]
+        for attempt in range(self.max_retries + 1):
+            try:
+                vectors = self.provider.embed_batch(texts)
+                if len(vectors) != len(texts):
+                    raise RuntimeError(f"Provider returned {len(vectors)} vectors for {len(texts)} texts")
+                self._grow()
+                return vectors
+            except Exception as e:
+                if _is_oversized(e) and len(batch) > 1:
+                    self._shrink()
+                    with self._batch_lock:
+                        self.stats["splits"] += 1
+                    middle = len(batch) // 2
+                    return self._embed_with_retry(batch[:middle]) + self._embed_with_retry(batch[middle:])
+                if not _is_retryable(e) or attempt == self.max_retries:
+                    raise
+                if _is_quota_error(e):
+                    self._shrink()
+                with self._batch_lock:
+                    self.stats["retries"] += 1
+                delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+        raise RuntimeError("unreachable")
+
+    def run(self, documents: List[Dict[str, Any]], text_key: str = "content",
+            id_key: str = "id") -> Dict[str, array]:
+        """
+        Embed every document's `text_key`; returns {document id: float32 vector}.
+
+        Documents whose batch still failed after all retries are left out
+        (and reported) - rerunning picks up exactly those. A streaming
+        caller can call `run` once per window of documents: the checkpoint
+        is scanned once and only the window's vectors are held.
+        """
+        model_name = self.provider.model_name
+        keys = [content_key(model_name, doc[text_key]) for doc in documents]
+        if self.checkpoint and not self._scanned:
+            self.checkpoint.scan()
+            self._scanned = True
+        stored = self.checkpoint.index if self.checkpoint else {}
+
+        # Identical chunk texts are embedded once
+        pending: Dict[str, str] = {}
+        for doc, key in zip(documents, keys):
+            if key not in stored:
+                pending.setdefault(key, doc[text_key])
+        resumed = sum(1 for key in keys if key in stored)
+        self.stats["resumed"] += resumed
+
+        if not self.quiet:
+            print(f"🔮 Embedding {len(pending)} chunks with {model_name} "
+                  f"({resumed} already in checkpoint, concurrency {self.concurrency})")
+        started = time.monotonic()
+        embedded_before = self.stats["embedded"]
+        done: Dict[str, array] = {}
+        try:
+            self._embed_pending(list(pending.items()), done)
+            for key in set(keys) - set(done):
+                if key in stored:
+                    done[key] = self.checkpoint.read(key)
+        finally:
+            if self.checkpoint:
+                self.checkpoint.close()
+
+        if not self.quiet:
+            elapsed = time.monotonic() - started
+            embedded = self.stats["embedded"] - embedded_before
+            rate = embedded / elapsed if elapsed > 0 else 0.0
+            print(f"✅ Embedded {embedded} chunks in {elapsed:.1f}s ({rate:.1f}/s), "
+                  f"{self.stats['failed']} failed, {self.stats['retries']} retries")
+        return {doc[id_key]: done[key] for doc, key in zip(documents, keys) if key in done}
+
+    def _embed_pending(self, items: List[Tuple[str, str]], done: Dict[str, array]):
+        position = 0
+        in_flight = {}
+        next_report = 0.1 if not self.quiet else 2.0
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="embed-stage") as pool:
+            while position < len(items) or in_flight:
+                while position < len(items) and len(in_flight) < self.concurrency:
+                    batch = self._next_batch(items, position)
+                    position += len(batch)
+                    in_flight[pool.submit(self._embed_with_retry, batch)] = batch
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    batch = in_flight.pop(future)
+                    try:
+                        vectors = future.result()
+                    except Exception as e:
+                        self.stats["failed"] += len(batch)
+                        print(f"❌ Embedding batch of {len(batch)} failed: {str(e)}")
+                        continue
+
+                    records = [(key, array("f", vector)) for (key, _), vector in zip(batch, vectors)]
+                    if self.checkpoint:
+                        self.checkpoint.append(records)
+                    done.update(records)
+                    self.stats["embedded"] += len(records)
+
+                progress = (position - sum(len(batch) for batch in in_flight.values())) / len(items)
+                if progress >= next_report:
+                    print(f"   {progress:.0%} embedded (batch size {self._batch_size})")
+                    next_report = progress + 0.1
@@ -0,0 +1,153 @@
+# data_collection/corpus/extract.py - Document extraction from corpus JSON and HTML files
+import json
+import os
+import re
+
+import html2text
+
+from app.utils.html_extractor import extract_text
+from data_collection.corpus.dates import parse_date
+from data_collection.corpus.ids import content_hash, document_id
+
+
+PARAGRAPH_BREAK_RE = re.compile(r"\n\s*\n")
+
+
+def preprocess_text(text):
+    """Clean and normalize text content: whitespace collapsed within paragraphs, paragraphs kept apart by a blank line"""
+    if "<" in text and ">" in text:
+        h = html2text.HTML2Text()
+        h.ignore_links = False
+        text = h.handle(text)
+    
+    # The chunker prefers paragraph boundaries, so they must survive normalization
+    paragraphs = (" ".join(paragraph.split()) for paragraph in PARAGRAPH_BREAK_RE.split(text))
+    return "\n\n".join(paragraph for paragraph in paragraphs if paragraph)
+
+
+def extract_text_from_item(item, instrument, source_type, file_path, position=0):
+    """Extract text content from a JSON item (`position`: its index within the file)"""
+    title_fields = ["title", "headline", "name", "symbol"]
+    content_fields = ["text", "content", "summary", "description", "analysis_text", "article"]
+    
+    # Find title
+    title = None
+    for field in title_fields:
+        if field in item and item[field]:
+            title = item[field]
+            break
+    
+    # Find content
+    content = None
+    for field in content_fields:
+        if field in item and item[field]:
+            content = item[field]
+            break
+    
+    # Look deeper for nested content
+    if not content and isinstance(item, dict):
+        for key, value in item.items():
+            if isinstance(value, dict):
+                for field in content_fields:
+                    if field in value and value[field]:
+                        content = value[field]
+                        break
+    
+    if not content or len(content) < 50:
+        return None
+    
+    content = preprocess_text(content)
+    
+    # Date extraction: the source's usual format is tried first, repeated strings come from the cache
+    date_fields = ["date", "publish_date", "published", "publishedAt", "timestamp", "created_at", "date_published"]
+    
+    date_field = next((field for field in date_fields if field in item and item[field]), None)
+    date_str = item[date_field] if date_field else None
+    
+    parsed_date = None
+    if date_str and isinstance(date_str, str):
+        parsed_date = parse_date(date_str, source=f"{source_type}/{date_field}")
+    
+    return {
+        "id": document_id(file_path, position, content),
+        "title": title if title else "Untitled Document",
+        "content": content,
+        "instrument": instrument,
+        "source_type": source_type,
+        "file_path": file_path,
+        "date": parsed_date.isoformat() if parsed_date else None,
+        "metadata": {
+            "instrument": instrument,
+            "source_type": source_type,
+            "has_title": bool(title),
+            "content_length": len(content),
+            "content_hash": content_hash(content),
+            "original_date_string": date_str if date_str else None
+        }
+    }
+
+
+def _path_labels(file_path):
+    """Instrument and source type from <source_type>/<instrument>/<file>"""
+    parts = file_path.split(os.path.sep)
+    instrument = parts[-2] if len(parts) >= 2 else "unknown"
+    source_type = parts[-3] if len(parts) >= 3 else "unknown"
+    return instrument, source_type
+
+
+def json_file_documents(file_path):
+    """Documents extracted from one JSON file (a list of items or a single item)"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    instrument, source_type = _path_labels(file_path)
+    items = data if isinstance(data, list) else [data]
+    for position, item in enumerate(items):
+        doc = extract_text_from_item(item, instrument, source_type, file_path, position)
+        if doc:
+            yield doc
+
+
+def html_file_documents(file_path):
+    """The document of one HTML filing, if it has enough text"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    
+    instrument, source_type = _path_labels(file_path)
+    
+    # Convert HTML to text, dropping navigation and other page chrome
+    content = extract_text(html_content, separator="\n\n")
+    content = preprocess_text(content)
+    
+    if len(content) < 100:
+        return
+    
+    filename = os.path.basename(file_path)
+    title = filename.replace('.html', '').replace('_', ' ')
+    
+    yield {
+        "id": document_id(file_path, 0, content),
+        "title": title,
+        "content": content,
+        "instrument": instrument,
+        "source_type": source_type,
+        "file_path": file_path,
+        "date": "Unknown",
+        "metadata": {
+            "instrument": instrument,
+            "source_type": source_type,
+            "has_title": True,
+            "content_length": len(content),
+            "content_hash": content_hash(content)
+        }
+    }
+
+
+def file_documents(file_path):
+    """Documents of one corpus file; a file that cannot be read yields nothing"""
+    try:
+        extract = html_file_documents if file_path.endswith(".html") else json_file_documents
+        return list(extract(file_path))
+    except Exception as e:
+        print(f"Error processing {file_path}: {str(e)}")
+        return []
@@ -0,0 +1,34 @@
+# data_collection/corpus/ids.py - Deterministic, content-addressed document and chunk IDs
+import hashlib
+import os
+import uuid
+
+from app.utils.embedding_cache import normalize_text
+
+# Fixed namespace: the same input gives the same UUID on every run and machine
+CORPUS_ID_NAMESPACE = uuid.UUID("6f1c1d6e-3f0a-5b7e-9a57-7b1d0c2e4a91")
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of the normalized text (Unicode NFC, collapsed whitespace)"""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def _normalize_path(file_path: str) -> str:
+    return os.path.normpath(file_path).replace(os.sep, "/")
+
+
+def document_id(file_path: str, position: int, text: str) -> str:
+    """
+    UUID for a source document: item `position` of `file_path` with this content.
+
+    Rerunning the processor over unchanged files reproduces the same IDs,
+    so `ON CONFLICT (id)` matches instead of inserting duplicates; edited
+    content gets a new ID.
+    """
+    return str(uuid.uuid5(CORPUS_ID_NAMESPACE, f"{_normalize_path(file_path)}\x00{position}\x00{content_hash(text)}"))
+
+
+def chunk_id(parent_id: str, offset: int, text: str) -> str:
+    """UUID for the chunk of a document starting at `offset` with this content"""
+    return str(uuid.uuid5(CORPUS_ID_NAMESPACE, f"{parent_id}\x00{offset}\x00{content_hash(text)}"))
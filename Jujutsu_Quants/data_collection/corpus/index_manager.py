@@ -0,0 +1,360 @@
+# data_collection/corpus/index_manager.py - Build, tune and rebuild the pgvector index on documents
+import hashlib
+import json
+import math
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "ivfflat")                  # ivfflat | hnsw
+HNSW_M = int(os.getenv("HNSW_M", "16"))                                          # Graph degree
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "64"))              # Build-time candidate list
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "40"))                          # Query-time candidate list
+IVFFLAT_PROBES = int(os.getenv("IVFFLAT_PROBES", "0"))                           # 0: sqrt(lists)
+VECTOR_INDEX_REBUILD_GROWTH = float(os.getenv("VECTOR_INDEX_REBUILD_GROWTH", "2.0"))  # Rebuild ivfflat past this growth
+VECTOR_INDEX_BUILD_MEMORY = os.getenv("VECTOR_INDEX_BUILD_MEMORY", "1GB")        # maintenance_work_mem for builds
+
+# Per-instrument partial indexes: filtered searches scan only their instrument's rows
+PARTITION_INDEX_MIN_ROWS = int(os.getenv("PARTITION_INDEX_MIN_ROWS", "2000"))   # Smaller partitions are scanned exactly
+PARTITION_INDEX_BY_SOURCE = os.getenv("PARTITION_INDEX_BY_SOURCE", "false").lower() == "true"
+HNSW_MAX_EF_SEARCH = 1000                                                         # pgvector's upper bound
+
+VECTOR_INDEX_NAME = "idx_documents_embedding"
+PARTITION_COLUMNS = ("instrument", "source_type")
+
+
+def ivfflat_lists(row_count: int) -> int:
+    """pgvector's guidance: rows / 1000 lists up to 1M rows, sqrt(rows) beyond"""
+    if row_count <= 1_000_000:
+        return max(1, row_count // 1000)
+    return int(math.sqrt(row_count))
+
+
+def default_probes(lists: int) -> int:
+    """sqrt(lists) probes - the usual recall/latency balance for ivfflat"""
+    return max(1, round(math.sqrt(lists)))
+
+
+def sql_literal(value: str) -> str:
+    """Quoted string literal (standard_conforming_strings)"""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def partition_predicate(partition_filter: Dict[str, str]) -> str:
+    """WHERE predicate of a partial index; queries must repeat it literally for the planner to use the index"""
+    return " AND ".join(f"{column} = {sql_literal(partition_filter[column])}"
+                        for column in PARTITION_COLUMNS if column in partition_filter)
+
+
+class VectorIndexManager:
+    """
+    Owns the lifecycle of the embedding index on `documents`.
+
+    The index is built from the data it will serve: ivfflat lists follow
+    the row count, HNSW uses the configured m / ef_construction. What the
+    index was built with (method, parameters, row count) is stored as a
+    JSON comment on the index itself, so it disappears with the index and
+    survives across runs. `ensure_index` builds a missing index, rebuilds
+    an ivfflat index once the table has grown past `rebuild_growth` times
+    the rows it was trained on (its centroids no longer describe the data)
+    and refreshes planner statistics with ANALYZE.
+    """
+
+    def __init__(self, conn, table: str = "documents", index_name: str = VECTOR_INDEX_NAME,
+                 method: str = VECTOR_INDEX_TYPE, m: int = HNSW_M, ef_construction: int = HNSW_EF_CONSTRUCTION,
+                 rebuild_growth: float = VECTOR_INDEX_REBUILD_GROWTH):
+        if method not in ("ivfflat", "hnsw"):
+            raise ValueError(f"Unknown vector index type: {method}")
+        self.conn = conn
+        self.table = table
+        self.index_name = index_name
+        self.method = method
+        self.m = m
+        self.ef_construction = ef_construction
+        self.rebuild_growth = rebuild_growth
+        self._state: Optional[Dict[str, Any]] = None
+        self._partitions: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def plan(self, row_count: int) -> Dict[str, Any]:
+        """Index parameters for a table of `row_count` embedded rows"""
+        if self.method == "hnsw":
+            return {"method": "hnsw", "m": self.m, "ef_construction": self.ef_construction, "rows": row_count}
+        return {"method": "ivfflat", "lists": ivfflat_lists(row_count), "rows": row_count}
+
+    def create_index_sql(self, plan: Dict[str, Any], name: Optional[str] = None) -> str:
+        if plan["method"] == "hnsw":
+            options = f"m = {int(plan['m'])}, ef_construction = {int(plan['ef_construction'])}"
+        else:
+            options = f"lists = {int(plan['lists'])}"
+        sql = (f"CREATE INDEX {name or self.index_name} ON {self.table} "
+               f"USING {plan['method']} (embedding vector_cosine_ops) WITH ({options})")
+        if plan.get("filter"):
+            sql += f" WHERE {partition_predicate(plan['filter'])}"
+        return sql
+
+    def partition_index_name(self, partition_filter: Dict[str, str]) -> str:
+        # Hashed: instrument names are not valid identifiers (BRK.B, ^GSPC) and identifiers are capped at 63 bytes
+        digest = hashlib.sha1(json.dumps(partition_filter, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        return f"{self.index_name}_p_{digest}"
+
+    def _count_rows(self, cursor) -> int:
+        cursor.execute(f"SELECT COUNT(*) FROM {self.table} WHERE embedding IS NOT NULL")
+        return int(cursor.fetchone()[0])
+
+    def _read_state(self, cursor) -> Optional[Dict[str, Any]]:
+        """Recorded build parameters; None if there is no index, {} for an index built elsewhere"""
+        cursor.execute("SELECT obj_description(oid, 'pg_class') FROM pg_class WHERE relname = %s AND relkind = 'i'",
+                       [self.index_name])
+        row = cursor.fetchone()
+        if not row:
+            return None
+        try:
+            return json.loads(row[0]) if row[0] else {}
+        except ValueError:
+            return {}
+
+    def get_state(self) -> Optional[Dict[str, Any]]:
+        """Parameters of the current index (cached after the first lookup)"""
+        if self._state is None:
+            cursor = self.conn.cursor()
+            try:
+                self._state = self._read_state(cursor)
+            finally:
+                cursor.close()
+        return self._state
+
+    def needs_rebuild(self, row_count: int, state: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Why the index should be (re)built, or None to keep it"""
+        if state is None:
+            return "missing"
+        if state.get("method") != self.method or "rows" not in state:
+            # Also covers the old fixed `lists = 100` index, built before any data existed
+            return "built with other settings"
+        if self.method == "hnsw":
+            if (state.get("m"), state.get("ef_construction")) != (self.m, self.ef_construction):
+                return "built with other settings"
+            return None  # HNSW absorbs inserts without losing quality
+        if row_count >= max(state["rows"], 1) * self.rebuild_growth:
+            return f"table grew from {state['rows']} to {row_count} rows"
+        return None
+
+    def ensure_index(self, force: bool = False, analyze: bool = True) -> Dict[str, Any]:
+        """
+        Build or rebuild the index if needed, then ANALYZE the table.
+
+        A rebuild creates the new index next to the old one and swaps the
+        names in the same transaction, so searches never run unindexed.
+
+        Returns:
+            {"action": "created" | "rebuilt" | "kept" | "deferred", "rows", ...plan}
+        """
+        cursor = self.conn.cursor()
+        try:
+            row_count = self._count_rows(cursor)
+            state = self._read_state(cursor)
+            reason = "forced" if force else self.needs_rebuild(row_count, state)
+
+            if row_count == 0:
+                # Centroids trained on an empty table are meaningless - build after the first load
+                result = {"action": "deferred", "rows": 0}
+            elif reason is None:
+                result = {"action": "kept", **state, "rows": row_count}
+            else:
+                plan = self.plan(row_count)
+                print(f"🔍 Building {self._describe(plan)} index on {row_count} rows ({reason})...")
+                started = time.time()
+                self._build_index(cursor, self.index_name, plan, replace=state is not None)
+                print(f"✅ Vector index built in {time.time() - started:.1f}s")
+                result = {"action": "created" if state is None else "rebuilt", **plan}
+                state = plan
+
+            if analyze:
+                cursor.execute(f"ANALYZE {self.table}")
+            self.conn.commit()
+            self._state = state
+            return result
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def _build_index(self, cursor, name: str, plan: Dict[str, Any], replace: bool):
+        cursor.execute(f"SET LOCAL maintenance_work_mem = '{VECTOR_INDEX_BUILD_MEMORY}'")
+        if not replace:
+            cursor.execute(self.create_index_sql(plan, name))
+        else:
+            staging_name = f"{name}_rebuild"
+            cursor.execute(f"DROP INDEX IF EXISTS {staging_name}")
+            cursor.execute(self.create_index_sql(plan, staging_name))
+            cursor.execute(f"DROP INDEX {name}")
+            cursor.execute(f"ALTER INDEX {staging_name} RENAME TO {name}")
+        # Utility statements take no bind parameters; the comment is escaped as a literal
+        cursor.execute(f"COMMENT ON INDEX {name} IS {sql_literal(json.dumps(plan))}")
+
+    def _read_partitions(self, cursor) -> Dict[str, Dict[str, Any]]:
+        """Existing partial indexes by name, with their recorded build parameters"""
+        prefix = f"{self.index_name}_p_".replace("_", "\\_")
+        cursor.execute("SELECT relname, obj_description(oid, 'pg_class') FROM pg_class "
+                       "WHERE relkind = 'i' AND relname LIKE %s", [prefix + "%"])
+        partitions = {}
+        for name, comment in cursor.fetchall():
+            if name.endswith("_rebuild"):
+                continue
+            try:
+                partitions[name] = json.loads(comment) if comment else {}
+            except ValueError:
+                partitions[name] = {}
+        return partitions
+
+    def ensure_partition_indexes(self, min_rows: int = PARTITION_INDEX_MIN_ROWS,
+                                 by_source: bool = PARTITION_INDEX_BY_SOURCE) -> Dict[str, int]:
+        """
+        One partial vector index per instrument (and per instrument +
+        source_type with `by_source`) holding at least `min_rows` rows.
+
+        A global ivfflat/HNSW scan followed by `instrument = ...` keeps only
+        the few candidates of that instrument that happen to be near the
+        query, so filtered searches come back short. A partial index
+        contains only the instrument's rows and is sized for them. Smaller
+        partitions go without one - the instrument btree plus an exact
+        distance sort is fast there. Partitions are rebuilt on growth like
+        the main index and dropped when they fall below `min_rows`.
+
+        Returns:
+            {"created", "rebuilt", "kept", "dropped"} counts
+        """
+        group_columns = list(PARTITION_COLUMNS if by_source else PARTITION_COLUMNS[:1])
+        columns = ", ".join(group_columns)
+        counts = {"created": 0, "rebuilt": 0, "kept": 0, "dropped": 0}
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"""
+                SELECT {columns}, COUNT(*) FROM {self.table}
+                WHERE embedding IS NOT NULL AND {" AND ".join(f"{column} IS NOT NULL" for column in group_columns)}
+                GROUP BY {columns}
+                HAVING COUNT(*) >= %s
+            """, [min_rows])
+            wanted = {}
+            for row in cursor.fetchall():
+                partition_filter = dict(zip(group_columns, row[:-1]))
+                wanted[self.partition_index_name(partition_filter)] = (partition_filter, int(row[-1]))
+
+            existing = self._read_partitions(cursor)
+            current = {}
+            for name in set(existing) - set(wanted):
+                cursor.execute(f"DROP INDEX IF EXISTS {name}")
+                counts["dropped"] += 1
+
+            for name, (partition_filter, row_count) in sorted(wanted.items()):
+                state = existing.get(name)
+                reason = self.needs_rebuild(row_count, state)
+                if reason is None:
+                    counts["kept"] += 1
+                    current[name] = state
+                    continue
+                plan = {**self.plan(row_count), "filter": partition_filter}
+                print(f"🔍 Building {self._describe(plan)} index for {partition_filter} ({reason})...")
+                self._build_index(cursor, name, plan, replace=state is not None)
+                counts["created" if state is None else "rebuilt"] += 1
+                current[name] = plan
+
+            self.conn.commit()
+            self._partitions = current
+            print(f"✅ Partition indexes: {counts['created']} created, {counts['rebuilt']} rebuilt, "
+                  f"{counts['kept']} kept, {counts['dropped']} dropped")
+            return counts
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def get_partitions(self) -> Dict[str, Dict[str, Any]]:
+        """Partial indexes by name (cached after the first lookup)"""
+        if self._partitions is None:
+            cursor = self.conn.cursor()
+            try:
+                self._partitions = {name: plan for name, plan in self._read_partitions(cursor).items()
+                                    if plan.get("filter")}
+            finally:
+                cursor.close()
+        return self._partitions
+
+    def route(self, filters: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """The most specific partition index whose filter the query's filters include"""
+        best = None
+        for plan in self.get_partitions().values():
+            partition_filter = plan["filter"]
+            if all(filters.get(column) == value for column, value in partition_filter.items()):
+                if best is None or len(partition_filter) > len(best["filter"]):
+                    best = plan
+        return best
+
+    def filter_clause(self, filters: Dict[str, str],
+                      partition: Optional[Dict[str, Any]] = None) -> Tuple[str, List[Any]]:
+        """
+        WHERE clause and parameters for filtered search.
+
+        Columns covered by the routed partition are written as literals
+        identical to the index predicate - with bind parameters a cached
+        generic plan cannot prove the predicate and skips the partial index.
+        The other filters stay parameters.
+        """
+        partition_filter = partition["filter"] if partition else {}
+        conditions = [partition_predicate(partition_filter)] if partition_filter else []
+        params = []
+        for column in PARTITION_COLUMNS:
+            if filters.get(column) and column not in partition_filter:
+                conditions.append(f"{column} = %s")
+                params.append(filters[column])
+        return ("WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+    @staticmethod
+    def _describe(plan: Dict[str, Any]) -> str:
+        if plan["method"] == "hnsw":
+            return f"HNSW (m={plan['m']}, ef_construction={plan['ef_construction']})"
+        return f"ivfflat (lists={plan['lists']})"
+
+    def search_settings(self, probes: Optional[int] = None, ef_search: Optional[int] = None,
+                        partition: Optional[Dict[str, Any]] = None) -> List[str]:
+        """
+        SET LOCAL statements tuning the next search in this transaction.
+
+        ivfflat: `probes` lists are scanned (default IVFFLAT_PROBES, else
+        sqrt(lists) of the index searched). HNSW: `ef_search` candidates are
+        kept (default HNSW_EF_SEARCH). More probes / candidates buy recall
+        with latency.
+        """
+        return next(self.probe_schedule(probes, ef_search, partition))
+
+    def probe_schedule(self, probes: Optional[int] = None, ef_search: Optional[int] = None,
+                       partition: Optional[Dict[str, Any]] = None) -> Iterator[List[str]]:
+        """
+        Settings for iterative probing: the first entry is `search_settings`,
+        each further entry doubles probes / ef_search, up to an exact ivfflat
+        scan (probes = lists) or pgvector's ef_search limit. A filtered search
+        that comes back short retries with the next entry.
+        """
+        state = partition or self.get_state() or {}
+        method = state.get("method", self.method)
+        if method == "hnsw":
+            ef = int(ef_search or HNSW_EF_SEARCH)
+            while True:
+                yield [f"SET LOCAL hnsw.ef_search = {min(ef, HNSW_MAX_EF_SEARCH)}"]
+                if ef >= HNSW_MAX_EF_SEARCH:
+                    return
+                ef *= 2
+
+        lists = state.get("lists")
+        if not probes:
+            probes = IVFFLAT_PROBES or (default_probes(lists) if lists else None)
+        if not probes:
+            yield []  # Index of unknown size: keep the server default
+            return
+        probes = int(probes)
+        while True:
+            yield [f"SET LOCAL ivfflat.probes = {min(probes, lists) if lists else probes}"]
+            if not lists or probes >= lists:
+                return
+            probes *= 2
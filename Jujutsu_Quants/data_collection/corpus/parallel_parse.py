@@ -0,0 +1,80 @@
+# data_collection/corpus/parallel_parse.py - Process-pool parsing of corpus files, in input order
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "0"))          # 0: one per CPU
+PARSE_SHARD_SIZE = int(os.getenv("PARSE_SHARD_SIZE", "32"))    # Files per task sent to a worker
+
+
+def _parse_shard(parse_file: Callable[[str], List[Any]], file_paths: Sequence[str]) -> List[Any]:
+    """Worker side: parse every file of the shard, in order"""
+    documents = []
+    for file_path in file_paths:
+        documents.extend(parse_file(file_path))
+    return documents
+
+
+def _shards(file_paths: Iterable[str], shard_size: int) -> Iterator[List[str]]:
+    paths = iter(file_paths)
+    while True:
+        shard = list(islice(paths, shard_size))
+        if not shard:
+            return
+        yield shard
+
+
+def parse_files_parallel(file_paths: Iterable[str], parse_file: Callable[[str], List[Any]],
+                         workers: int = PARSE_WORKERS, shard_size: int = PARSE_SHARD_SIZE,
+                         stats: Optional[Dict[str, int]] = None) -> Iterator[List[Any]]:
+    """
+    Parse files on a process pool; yields the documents of each shard.
+
+    HTML extraction, html2text and date parsing are CPU-bound, so threads
+    would share one core - separate processes use all of them. The file
+    list is cut into shards of `shard_size` files (one task each, which
+    keeps pickling overhead per file low). Shards come back in submission
+    order, so the output order matches the input order no matter which
+    worker finishes first. At most 2 x workers shards are in flight: the
+    file list is consumed lazily and a slow consumer throttles parsing.
+
+    `parse_file(path) -> list of documents` must be a module-level function
+    (it is pickled by reference) and should handle its own per-file errors.
+    With one worker, files are parsed in-process.
+    """
+    workers = workers or os.cpu_count() or 1
+    shard_size = max(1, shard_size)
+    stats = stats if stats is not None else {}
+    stats.update({"files": 0, "shards": 0, "documents": 0, "workers": workers})
+
+    if workers == 1:
+        for shard in _shards(file_paths, shard_size):
+            documents = _parse_shard(parse_file, shard)
+            stats["files"] += len(shard)
+            stats["shards"] += 1
+            stats["documents"] += len(documents)
+            yield documents
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        shards = _shards(file_paths, shard_size)
+        for shard in shards:
+            pending.append((len(shard), pool.submit(_parse_shard, parse_file, shard)))
+            if len(pending) < 2 * workers:
+                continue
+            yield _collect(pending.popleft(), stats)
+        while pending:
+            yield _collect(pending.popleft(), stats)
+
+
+def _collect(entry, stats: Dict[str, int]) -> List[Any]:
+    """Wait for the oldest shard - later shards keep running meanwhile"""
+    file_count, future = entry
+    documents = future.result()
+    stats["files"] += file_count
+    stats["shards"] += 1
+    stats["documents"] += len(documents)
+    return documents
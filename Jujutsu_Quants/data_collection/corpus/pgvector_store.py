@@ -0,0 +1,453 @@
+# data_collection/corpus/pgvector_store.py - Cloud SQL PostgreSQL + pgvector document store
+import json
+import time
+
+from app.services.lexical_search import LEXICAL_SCHEMA_SQL
+from app.utils.embedding_cache import embed_query
+from app.utils.embedding_provider import get_embedder
+from data_collection.corpus import bulk_loader
+from data_collection.corpus.index_manager import VectorIndexManager
+
+
+class CloudSQLVectorDB:
+    """Cloud SQL PostgreSQL with pgvector for document storage and search"""
+    
+    def __init__(self, project_id, region, instance_name, database_name, user, password):
+        self.project_id = project_id
+        self.region = region
+        self.instance_name = instance_name
+        self.database_name = database_name
+        self.user = user
+        self.password = password
+        self.connector = None
+        self.connection = None
+        self.index_manager = None
+        
+    def connect(self):
+        """Connect to Cloud SQL using the Cloud SQL Python Connector"""
+        try:
+            # Initialize connector (only needed when a database is actually used)
+            from google.cloud.sql.connector import Connector
+            self.connector = Connector()
+            
+            # Create connection
+            self.connection = self.connector.connect(
+                f"{self.project_id}:{self.region}:{self.instance_name}",
+                "pg8000",
+                user=self.user,
+                password=self.password,
+                db=self.database_name
+            )
+            self.index_manager = VectorIndexManager(self.connection)
+            
+            print(f"✅ Connected to Cloud SQL instance: {self.instance_name}")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error connecting to Cloud SQL: {str(e)}")
+            print(f"💡 Make sure your Cloud SQL instance is running and accessible")
+            return False
+    
+    def setup_database(self):
+        """Create the database schema with pgvector extension"""
+        try:
+            # Use cursor without context manager for pg8000/Cloud SQL Connector
+            cursor = self.connection.cursor()
+            
+            try:
+                # Enable pgvector extension
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+                print("✅ pgvector extension enabled")
+                
+                # Create documents table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS documents (
+                        id UUID PRIMARY KEY,
+                        title TEXT,
+                        content TEXT,
+                        instrument VARCHAR(50),
+                        source_type VARCHAR(50),
+                        file_path TEXT,
+                        date_published DATE,
+                        embedding vector(768),
+                        metadata JSONB,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+                print("✅ Documents table created")
+                
+                # Create indexes for better performance
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_documents_instrument 
+                    ON documents(instrument);
+                """)
+                
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_documents_source_type 
+                    ON documents(source_type);
+                """)
+                
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_documents_date 
+                    ON documents(date_published);
+                """)
+                
+                # Full-text column and index for the keyword leg of hybrid retrieval
+                for statement in LEXICAL_SCHEMA_SQL:
+                    cursor.execute(statement)
+                print("✅ Basic indexes created")
+                
+                # The vector index is sized from the loaded rows, so it is built after inserting data
+                print("   (Vector index is built after loading documents)")
+                
+                self.connection.commit()
+                print("✅ Database schema setup completed successfully")
+                
+            finally:
+                cursor.close()
+                
+        except Exception as e:
+            print(f"❌ Error setting up database: {str(e)}")
+            try:
+                self.connection.rollback()
+            except:
+                pass
+            raise
+    
+    def insert_document(self, doc_id, title, content, instrument, source_type, 
+                       file_path, date_published, embedding, metadata):
+        """Insert a single document with its embedding"""
+        try:
+            cursor = self.connection.cursor()
+            
+            try:
+                cursor.execute("""
+                    INSERT INTO documents 
+                    (id, title, content, instrument, source_type, file_path, 
+                     date_published, embedding, metadata)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (id) DO UPDATE SET
+                        title = EXCLUDED.title,
+                        content = EXCLUDED.content,
+                        embedding = EXCLUDED.embedding,
+                        updated_at = CURRENT_TIMESTAMP;
+                """, (
+                    doc_id, title, content, instrument, source_type, 
+                    file_path, date_published, embedding, json.dumps(metadata)
+                ))
+                
+                self.connection.commit()
+                return True
+                
+            finally:
+                cursor.close()
+            
+        except Exception as e:
+            print(f"❌ Error inserting document {doc_id}: {str(e)}")
+            try:
+                self.connection.rollback()
+            except:
+                pass
+            return False
+    
+    def get_existing_ids(self, ids, batch_size=10000, embedding_model=None):
+        """
+        IDs from `ids` that are already stored - with content-addressed IDs, unchanged chunks
+
+        With `embedding_model`, only rows embedded by that model count, so switching models re-embeds them.
+        """
+        existing = set()
+        cursor = self.connection.cursor()
+        try:
+            for i in range(0, len(ids), batch_size):
+                if embedding_model:
+                    cursor.execute(
+                        "SELECT id::text FROM documents WHERE id = ANY(%s::uuid[]) "
+                        "AND metadata->>'embedding_model' = %s",
+                        (list(ids[i:i + batch_size]), embedding_model)
+                    )
+                    existing.update(row[0] for row in cursor.fetchall())
+                    continue
+                cursor.execute(
+                    "SELECT id::text FROM documents WHERE id = ANY(%s::uuid[])",
+                    (list(ids[i:i + batch_size]),)
+                )
+                existing.update(row[0] for row in cursor.fetchall())
+        finally:
+            cursor.close()
+        return existing
+    
+    def batch_insert_documents(self, documents, batch_size=50, build_index=True):
+        """Insert multiple documents in batches with proper vector formatting"""
+        total_inserted = 0
+        failed_inserts = 0
+        
+        for i in range(0, len(documents), batch_size):
+            batch = documents[i:i + batch_size]
+            
+            try:
+                cursor = self.connection.cursor()
+                
+                try:
+                    for doc in batch:
+                        # Convert embedding list to PostgreSQL vector format
+                        embedding_str = '[' + ','.join(map(str, doc['embedding'])) + ']'
+                        
+                        cursor.execute("""
+                            INSERT INTO documents 
+                            (id, title, content, instrument, source_type, file_path, 
+                             date_published, embedding, metadata)
+                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                            ON CONFLICT (id) DO UPDATE SET
+                                title = EXCLUDED.title,
+                                content = EXCLUDED.content,
+                                instrument = EXCLUDED.instrument,
+                                source_type = EXCLUDED.source_type,
+                                file_path = EXCLUDED.file_path,
+                                date_published = EXCLUDED.date_published,
+                                embedding = EXCLUDED.embedding,
+                                metadata = EXCLUDED.metadata,
+                                updated_at = CURRENT_TIMESTAMP;
+                        """, (
+                            doc['id'], doc['title'], doc['content'], 
+                            doc['instrument'], doc['source_type'], doc['file_path'],
+                            doc['date_published'], embedding_str,  # Use string format for vector
+                            json.dumps(doc['metadata'])
+                        ))
+                    
+                    self.connection.commit()
+                    total_inserted += len(batch)
+                    
+                finally:
+                    cursor.close()
+                
+            except Exception as e:
+                print(f"❌ Error inserting batch: {str(e)}")
+                try:
+                    self.connection.rollback()
+                except:
+                    pass
+                failed_inserts += len(batch)
+        
+        # Try to create vector index after data is inserted
+        if total_inserted > 0 and build_index:
+            self._create_vector_index()
+        
+        print(f"✅ Inserted {total_inserted} documents, {failed_inserts} failed")
+        return total_inserted
+    
+    def bulk_load_documents(self, documents, build_index=True):
+        """
+        Load documents via COPY into a staging table and one set-based upsert, then rebuild the index
+        
+        With `build_index=False` (one batch of a streaming load) the vector index is
+        left in place and maintained row by row; the caller runs `_create_vector_index` at the end.
+        """
+        try:
+            start_time = time.time()
+            result = bulk_loader.bulk_load_documents(self.connection, documents,
+                                                     drop_vector_index=None if build_index else False)
+            print(f"✅ Bulk loaded {result['staged']} documents ({result['upserted']} new or changed) "
+                  f"in {time.time() - start_time:.1f}s")
+        except Exception as e:
+            print(f"⚠️  Bulk load failed ({str(e)}), falling back to batched inserts")
+            return self.batch_insert_documents(documents, build_index=build_index)
+        
+        if build_index:
+            self._create_vector_index()
+        return result["upserted"]
+    
+    def _create_vector_index(self, force=False):
+        """Build the vector index after data is inserted, rebuild it once the corpus has outgrown it, ANALYZE"""
+        try:
+            result = self.index_manager.ensure_index(force=force)
+            self.index_manager.ensure_partition_indexes()
+            if result["action"] == "kept":
+                print(f"✅ Vector index is current ({result['rows']} rows)")
+            elif result["action"] == "deferred":
+                print("⚠️  No embedded documents yet - vector index deferred")
+            return result
+                
+        except Exception as e:
+            print(f"⚠️  Could not create vector index: {str(e)}")
+            print("   Search will still work, but may be slower")
+    
+    def semantic_search(self, query_embedding, limit=10, instrument_filter=None, 
+                       source_filter=None, similarity_threshold=0.7, probes=None, ef_search=None):
+        """
+        Perform semantic search using cosine similarity with proper vector formatting
+        
+        `probes` (ivfflat) / `ef_search` (HNSW) trade latency for recall on this
+        query only; by default they follow the size of the index searched.
+        Instrument / source filters are routed to the matching partial index;
+        a filtered search that comes back short is retried with more probes.
+        """
+        try:
+            cursor = self.connection.cursor()
+            
+            try:
+                # Convert query embedding to PostgreSQL vector format
+                query_embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
+                
+                # Build query with optional filters
+                filters = {"instrument": instrument_filter, "source_type": source_filter}
+                partition = self.index_manager.route(filters)
+                where_clause, params = self.index_manager.filter_clause(filters, partition)
+                
+                # Nearest rows first, threshold applied afterwards: a distance predicate
+                # in WHERE cannot be served by the vector index
+                query = f"""
+                    SELECT 
+                        id,
+                        title,
+                        content,
+                        instrument,
+                        source_type,
+                        file_path,
+                        date_published,
+                        metadata,
+                        1 - distance AS similarity
+                    FROM (
+                        SELECT id, title, content, instrument, source_type, file_path,
+                               date_published, metadata, embedding <=> %s::vector AS distance
+                        FROM documents
+                        {where_clause}
+                        ORDER BY distance
+                        LIMIT %s
+                    ) AS nearest;
+                """
+                
+                # Build final params list
+                final_params = [query_embedding_str] + params + [limit]
+                
+                # SET LOCAL lasts until the end of this transaction, i.e. this search
+                for settings in self.index_manager.probe_schedule(probes, ef_search, partition):
+                    for statement in settings:
+                        cursor.execute(statement)
+                    cursor.execute(query, final_params)
+                    results = cursor.fetchall()
+                    if len(results) >= limit or not (instrument_filter or source_filter):
+                        break
+                    if partition and len(results) >= partition.get("rows", 0):
+                        break  # The whole partition was returned
+                
+                # Convert to list of dictionaries
+                columns = [desc[0] for desc in cursor.description]
+                rows = [dict(zip(columns, row)) for row in results]
+                if similarity_threshold:
+                    rows = [row for row in rows if row["similarity"] >= similarity_threshold]
+                return rows
+                
+            finally:
+                cursor.close()
+                self.connection.rollback()
+                
+        except Exception as e:
+            print(f"❌ Error performing semantic search: {str(e)}")
+            return []
+    
+    def get_stats(self):
+        """Get database statistics"""
+        try:
+            cursor = self.connection.cursor()
+            
+            try:
+                cursor.execute("""
+                    SELECT 
+                        COUNT(*) as total_documents,
+                        COUNT(DISTINCT instrument) as unique_instruments,
+                        COUNT(DISTINCT source_type) as unique_sources,
+                        MIN(created_at) as earliest_document,
+                        MAX(created_at) as latest_document
+                    FROM documents;
+                """)
+                
+                stats_row = cursor.fetchone()
+                
+                # Convert to dictionary
+                stats_columns = [desc[0] for desc in cursor.description]
+                stats = dict(zip(stats_columns, stats_row))
+                
+                cursor.execute("""
+                    SELECT instrument, COUNT(*) as count
+                    FROM documents
+                    GROUP BY instrument
+                    ORDER BY count DESC;
+                """)
+                
+                instrument_rows = cursor.fetchall()
+                instrument_counts = [{"instrument": row[0], "count": row[1]} for row in instrument_rows]
+                
+                return {
+                    "stats": stats,
+                    "instrument_distribution": instrument_counts
+                }
+                
+            finally:
+                cursor.close()
+                
+        except Exception as e:
+            print(f"❌ Error getting stats: {str(e)}")
+            return None
+    
+    def close(self):
+        """Close the database connection"""
+        if self.connection:
+            self.connection.close()
+        if self.connector:
+            self.connector.close()
+
+
+def create_query_function(db):
+    """Create a query function for the CloudSQL vector database"""
+    
+    embedder = get_embedder()
+    
+    def query_documents(query_text, num_results=5, instrument_filter=None, 
+                       source_filter=None, similarity_threshold=0.6, probes=None, ef_search=None):
+        """Query documents using semantic search"""
+        try:
+            # Generate embedding for query
+            query_embedding = embed_query(embedder, query_text)
+            
+            # Convert to list (not needed for string conversion, but keep for consistency)
+            if hasattr(query_embedding, 'tolist'):
+                embedding_list = query_embedding.tolist()
+            else:
+                embedding_list = list(query_embedding)
+            
+            # Perform search (embedding_list will be converted to string format in semantic_search)
+            results = db.semantic_search(
+                query_embedding=embedding_list,
+                limit=num_results,
+                instrument_filter=instrument_filter,
+                source_filter=source_filter,
+                similarity_threshold=similarity_threshold,
+                probes=probes,
+                ef_search=ef_search
+            )
+            
+            # Format results
+            formatted_results = []
+            for i, result in enumerate(results):
+                formatted_result = {
+                    "rank": i + 1,
+                    "id": result["id"],
+                    "similarity": float(result["similarity"]) if result["similarity"] else 0.0,
+                    "title": result["title"] or "Untitled",
+                    "content_preview": result["content"][:300] + "..." if result["content"] and len(result["content"]) > 300 else result["content"] or "",
+                    "instrument": result["instrument"] or "Unknown",
+                    "source_type": result["source_type"] or "Unknown",
+                    "date": str(result["date_published"]) if result["date_published"] else "Unknown",
+                    "file_path": result["file_path"] or "Unknown"
+                }
+                formatted_results.append(formatted_result)
+            
+            return formatted_results
+            
+        except Exception as e:
+            print(f"❌ Error querying documents: {str(e)}")
+            return []
+    
+    return query_documents
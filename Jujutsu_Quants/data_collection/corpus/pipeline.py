@@ -0,0 +1,188 @@
+# data_collection/corpus/pipeline.py - Bounded streaming pipeline for corpus processing
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "64"))  # Items buffered between two stages
+PIPELINE_PROGRESS_SECONDS = 10.0
+
+_END = object()  # End-of-stream marker passed down the queues
+
+
+class PipelineError(RuntimeError):
+    """A stage (or the source) failed without per-item error tolerance; the pipeline was stopped"""
+
+
+class _Stage:
+    def __init__(self, name: str, fn: Callable, workers: int, batch_size: Optional[int], tolerate_errors: bool):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.tolerate_errors = tolerate_errors
+        self.stats = {"in": 0, "out": 0, "errors": 0, "busy_seconds": 0.0}
+        self.lock = threading.Lock()
+        self.active_workers = self.workers
+
+
+class StreamingPipeline:
+    """
+    Stages connected by bounded queues, each running in its own thread(s).
+
+    A stage function takes one item (or a list of up to `batch_size`
+    items for batch stages) and returns an iterable of outputs for the
+    next stage - zero, one or many. When a downstream stage falls behind,
+    its input queue fills up and the upstream `put` blocks: that
+    backpressure holds the number of items in flight at about
+    `queue_size` per stage, whatever the size of the input.
+
+    Stages added with `tolerate_errors=True` report, count and drop an
+    item whose stage function raises (like a file that fails to parse).
+    In any other stage an exception stops the whole pipeline and is
+    re-raised from `run` as a PipelineError - a failed write must not
+    look like a finished run.
+    """
+
+    def __init__(self, queue_size: int = PIPELINE_QUEUE_SIZE, progress: bool = True):
+        self.queue_size = max(1, queue_size)
+        self.progress = progress
+        self.stages: List[_Stage] = []
+        self.max_depth: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    def add_stage(self, name: str, fn: Callable[[Any], Iterable[Any]], workers: int = 1,
+                  tolerate_errors: bool = False) -> "StreamingPipeline":
+        """Append a stage mapping each item to an iterable of outputs"""
+        self.stages.append(_Stage(name, fn, workers, None, tolerate_errors))
+        return self
+
+    def add_batch_stage(self, name: str, fn: Callable[[List[Any]], Iterable[Any]], batch_size: int,
+                        tolerate_errors: bool = False) -> "StreamingPipeline":
+        """Append a single-worker stage called with lists of up to `batch_size` items"""
+        self.stages.append(_Stage(name, fn, 1, max(1, batch_size), tolerate_errors))
+        return self
+
+    def _put(self, target: "queue.Queue", item: Any, name: str):
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                depth = target.qsize()
+                if depth > self.max_depth.get(name, 0):
+                    self.max_depth[name] = depth
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, source: "queue.Queue") -> Any:
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _emit(self, stage: _Stage, outputs: Iterable[Any], target: "queue.Queue", target_name: str):
+        for output in outputs or ():
+            self._put(target, output, target_name)
+            with stage.lock:
+                stage.stats["out"] += 1
+
+    def _call(self, stage: _Stage, payload: Any, count: int, target: "queue.Queue", target_name: str):
+        started = time.monotonic()
+        with stage.lock:
+            stage.stats["in"] += count
+        try:
+            self._emit(stage, stage.fn(payload), target, target_name)
+        except Exception as e:
+            with stage.lock:
+                stage.stats["errors"] += count
+            print(f"❌ {stage.name} failed on {count} item(s): {str(e)}")
+            if not stage.tolerate_errors:
+                raise
+        finally:
+            with stage.lock:
+                stage.stats["busy_seconds"] += time.monotonic() - started
+
+    def _work(self, stage: _Stage, source: "queue.Queue", target: "queue.Queue", target_name: str):
+        try:
+            batch: List[Any] = []
+            while True:
+                item = self._get(source)
+                if item is _END:
+                    # Let sibling workers see the end marker too
+                    self._put(source, _END, stage.name)
+                    break
+                if stage.batch_size is None:
+                    self._call(stage, item, 1, target, target_name)
+                    continue
+                batch.append(item)
+                if len(batch) >= stage.batch_size:
+                    self._call(stage, batch, len(batch), target, target_name)
+                    batch = []
+            if batch and not self._stop.is_set():
+                self._call(stage, batch, len(batch), target, target_name)
+        except BaseException as e:
+            self._error = self._error or e
+            self._stop.set()
+        finally:
+            with stage.lock:
+                stage.active_workers -= 1
+                last = stage.active_workers == 0
+            if last:
+                self._put(target, _END, target_name)
+
+    def _feed(self, source: Iterable[Any], target: "queue.Queue", target_name: str):
+        try:
+            for item in source:
+                if self._stop.is_set():
+                    break
+                self._put(target, item, target_name)
+        except BaseException as e:
+            self._error = self._error or e
+            self._stop.set()
+        finally:
+            self._put(target, _END, target_name)
+
+    def run(self, source: Iterable[Any]) -> Iterator[Any]:
+        """Stream `source` through all stages; yields the outputs of the last stage"""
+        names = ["source"] + [stage.name for stage in self.stages]
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in names]
+        threads = [threading.Thread(target=self._feed, args=(source, queues[0], names[1] if len(names) > 1 else "output"),
+                                    name="pipeline-source", daemon=True)]
+        for position, stage in enumerate(self.stages):
+            target_name = names[position + 2] if position + 2 < len(names) else "output"
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(target=self._work,
+                                                args=(stage, queues[position], queues[position + 1], target_name),
+                                                name=f"pipeline-{stage.name}-{worker}", daemon=True))
+        for thread in threads:
+            thread.start()
+
+        started = time.monotonic()
+        next_report = started + PIPELINE_PROGRESS_SECONDS
+        try:
+            while True:
+                item = self._get(queues[-1])
+                if item is _END:
+                    break
+                yield item
+                if self.progress and time.monotonic() >= next_report:
+                    print(f"   ⏱️  {time.monotonic() - started:.0f}s: " + ", ".join(
+                        f"{stage.name} {stage.stats['out']}" for stage in self.stages))
+                    next_report = time.monotonic() + PIPELINE_PROGRESS_SECONDS
+        finally:
+            # Consumer stopped early (or finished): release every blocked stage
+            self._stop.set()
+            for thread in threads:
+                thread.join(timeout=5)
+
+        if self._error is not None:
+            raise PipelineError(f"Pipeline stopped: {str(self._error)}") from self._error
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage item counts, errors, busy time and the deepest its input queue got"""
+        return {stage.name: {**stage.stats, "max_queue_depth": self.max_depth.get(stage.name, 0)}
+                for stage in self.stages}
@@ -0,0 +1,153 @@
+# data_collection/corpus/runner.py - One corpus pipeline (parse -> chunk -> embed -> write) for every target
+import os
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from data_collection.corpus.chunker import chunk_document
+from data_collection.corpus.embedding_stage import EmbeddingStage
+from data_collection.corpus.extract import file_documents
+from data_collection.corpus.parallel_parse import parse_files_parallel
+from data_collection.corpus.pipeline import StreamingPipeline
+from data_collection.corpus.sinks import CorpusSink
+
+JSON_DIRECTORIES = ["news", "analyst_reports", "technical_analysis"]
+HTML_DIRECTORIES = ["earnings"]
+EMBED_WINDOW = int(os.getenv("PIPELINE_EMBED_WINDOW", "512"))  # Chunks per embedding window
+LOAD_BATCH = int(os.getenv("PIPELINE_LOAD_BATCH", "2000"))     # Rows per sink write
+
+
+def _walk_sorted(directory: str, extension: str) -> Iterator[str]:
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(extension):
+                yield os.path.join(root, name)
+
+
+def discover_files(json_directories: Iterable[str] = JSON_DIRECTORIES,
+                   html_directories: Iterable[str] = HTML_DIRECTORIES) -> Iterator[str]:
+    """Lazily list corpus files in a stable (sorted) order - the file list itself is never materialized"""
+    for directory in json_directories:
+        if os.path.exists(directory):
+            yield from _walk_sorted(directory, ".json")
+    for directory in html_directories:
+        if os.path.exists(directory):
+            yield from _walk_sorted(directory, ".html")
+
+
+def corpus_documents(file_paths: Iterable[str], parse_stats: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, Any]]:
+    """Documents of all files, parsed on a process pool, in file order"""
+    for documents in parse_files_parallel(file_paths, file_documents, stats=parse_stats):
+        yield from documents
+
+
+def attach_embeddings(documents: List[Dict[str, Any]], vectors: Dict[str, Any],
+                      embedding_model: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Documents that got a vector, with `embedding`, `date_published` and `metadata.embedding_model` set (in place)"""
+    documents_with_embeddings = []
+    for doc in documents:
+        vector = vectors.get(doc["id"])
+        if vector is None:
+            continue
+
+        doc["embedding"] = vector.tolist()
+        if embedding_model:
+            doc["metadata"] = {**(doc.get("metadata") or {}), "embedding_model": embedding_model}
+        # "Unknown" dates are stored as NULL
+        doc["date_published"] = doc["date"] if doc.get("date") and doc["date"] != "Unknown" else None
+        documents_with_embeddings.append(doc)
+    return documents_with_embeddings
+
+
+def new_summary() -> Dict[str, Any]:
+    return {"documents": 0, "chunks": 0, "unchanged": 0, "written": 0,
+            "instruments": set(), "source_types": set()}
+
+
+def build_pipeline(sinks: List[CorpusSink], summary: Dict[str, Any], checkpoint_path: str) -> StreamingPipeline:
+    """
+    chunk -> embed -> write, streaming with backpressure; fed by `corpus_documents`.
+
+    Every sink receives the same embedded chunks in corpus order, so one
+    run keeps all targets in step. At most a few embedding windows and
+    write batches of chunks are in memory at any time, however large the
+    corpus. `summary` collects counts and labels for the run metadata.
+    """
+    sink_lock = threading.Lock()  # Sinks see one call at a time (e.g. a shared pg8000 connection)
+    stage = EmbeddingStage(checkpoint_path=checkpoint_path, quiet=True)
+    model_name = stage.provider.model_name
+
+    def chunk(doc):
+        summary["documents"] += 1
+        summary["instruments"].add(doc["instrument"])
+        summary["source_types"].add(doc["source_type"])
+        chunks = chunk_document(doc)
+        summary["chunks"] += len(chunks)
+        return chunks
+
+    def embed(chunks):
+        # Unchanged chunks keep their content-addressed IDs; skip those every sink already holds
+        # from the current model (a model change re-embeds and rewrites them)
+        ids = [chunk["id"] for chunk in chunks]
+        existing = None
+        with sink_lock:
+            for sink in sinks:
+                held = sink.existing_ids(ids, embedding_model=model_name)
+                existing = held if existing is None else existing & held
+                if not existing:
+                    break
+        existing = existing or set()
+        new_chunks = [chunk for chunk in chunks if chunk["id"] not in existing]
+        summary["unchanged"] += len(chunks) - len(new_chunks)
+        if not new_chunks:
+            return []
+        return attach_embeddings(new_chunks, stage.run(new_chunks), model_name)
+
+    def write(documents):
+        with sink_lock:
+            counts = [sink.write(documents) for sink in sinks]
+        summary["written"] += len(documents)
+        return [counts]
+
+    # A document that fails to chunk is skipped; a failed embed or write stops the run so sinks abort
+    return (StreamingPipeline()
+            .add_stage("chunk", chunk, tolerate_errors=True)
+            .add_batch_stage("embed", embed, EMBED_WINDOW)
+            .add_batch_stage("write", write, LOAD_BATCH))
+
+
+def run_corpus_pipeline(sinks: List[CorpusSink], json_directories: Iterable[str] = JSON_DIRECTORIES,
+                        html_directories: Iterable[str] = HTML_DIRECTORIES,
+                        output_dir: str = "processed_corpus") -> Dict[str, Any]:
+    """
+    Parse, chunk and embed the corpus once and write it to every sink.
+
+    Embeddings are checkpointed under `output_dir`, so a rerun - or a run
+    for another target - only embeds chunks it has not seen. Returns the
+    run summary; `summary["sinks"]` holds each sink's `close` result.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    summary = new_summary()
+    for sink in sinks:
+        sink.open()
+
+    pipeline = build_pipeline(sinks, summary, os.path.join(output_dir, "embedding_checkpoint.jsonl"))
+    parse_stats = {}
+    try:
+        for _ in pipeline.run(corpus_documents(discover_files(json_directories, html_directories), parse_stats)):
+            pass
+    except Exception:
+        for sink in sinks:
+            sink.abort()
+        raise
+
+    print(f"   parse: {parse_stats.get('files', 0)} files in {parse_stats.get('shards', 0)} shards "
+          f"on {parse_stats.get('workers', 0)} processes")
+    for name, stage_stats in pipeline.get_stats().items():
+        print(f"   {name}: {stage_stats['in']} in, {stage_stats['out']} out, {stage_stats['errors']} failed, "
+              f"{stage_stats['busy_seconds']:.1f}s busy")
+
+    summary["parse"] = parse_stats
+    summary["stages"] = pipeline.get_stats()
+    summary["sinks"] = {sink.name: sink.close() for sink in sinks}
+    return summary
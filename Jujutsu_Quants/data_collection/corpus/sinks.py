@@ -0,0 +1,360 @@
+# data_collection/corpus/sinks.py - Output targets of the corpus pipeline (pgvector, Vertex JSONL, local snapshot)
+import json
+import os
+import shutil
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.services.document_store import DocumentStore
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Snapshot metadata falls back to JSON lines
+    pa = None
+    pq = None
+
+CORPUS_SNAPSHOT_DIR = os.getenv("CORPUS_SNAPSHOT_DIR", "")  # When set, every processor run also writes a local snapshot
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Files making up a snapshot directory
+SNAPSHOT_MANIFEST = "snapshot.json"
+SNAPSHOT_VECTORS = "vectors.npy"
+SNAPSHOT_PARQUET = "documents.parquet"
+SNAPSHOT_JSONL = "documents.jsonl"
+
+SNAPSHOT_COLUMNS = ["id", "title", "content", "instrument", "source_type", "file_path", "date_published", "metadata"]
+
+
+class CorpusSink(ABC):
+    """
+    Target of the corpus pipeline's write stage.
+
+    The pipeline calls `open` once, `existing_ids` for every embedding
+    window (chunks that all sinks already hold are not embedded again),
+    `write` with batches of embedded chunks in corpus order, and `close`
+    at the end - or `abort` if the run failed. `close` returns a summary
+    of what was written. Calls are serialized by the pipeline, so a sink
+    needs no locking of its own.
+    """
+
+    name = "sink"
+
+    def __init__(self):
+        self.written = 0
+
+    def open(self):
+        pass
+
+    def existing_ids(self, ids: Sequence[str], embedding_model: Optional[str] = None) -> Set[str]:
+        """IDs the target already holds (embedded by `embedding_model`, if given) - unchanged chunks"""
+        return set()
+
+    @abstractmethod
+    def write(self, documents: List[Dict[str, Any]]) -> int:
+        """Write one batch of embedded chunks; returns the number of rows written"""
+
+    def close(self) -> Dict[str, Any]:
+        return {"written": self.written}
+
+    def abort(self):
+        pass
+
+
+class PgVectorSink(CorpusSink):
+    """Cloud SQL / pgvector: COPY-based upserts per batch, vector indexes ensured once after the load"""
+
+    name = "pgvector"
+
+    def __init__(self, db, build_index: bool = True):
+        super().__init__()
+        self.db = db
+        self.build_index = build_index
+
+    def existing_ids(self, ids: Sequence[str], embedding_model: Optional[str] = None) -> Set[str]:
+        return self.db.get_existing_ids(list(ids), embedding_model=embedding_model)
+
+    def write(self, documents: List[Dict[str, Any]]) -> int:
+        inserted = self.db.bulk_load_documents(documents, build_index=False)
+        self.written += inserted
+        return inserted
+
+    def close(self) -> Dict[str, Any]:
+        # The vector index is built (or rebuilt on growth) once, after the load
+        index = self.db._create_vector_index() if self.build_index else None
+        return {"written": self.written, "index": index}
+
+
+class VertexJsonlSink(CorpusSink):
+    """
+    Vertex AI Vector Search input files, streamed batch by batch:
+    embeddings_<uid>.jsonl ({"id", "embedding"} per line, plus
+    instrument / source_type / has_title restricts unless disabled) and
+    documents_<uid>.jsonl with the chunk metadata. On close the metadata
+    is also built into documents_<uid>.sqlite, the DocumentStore query
+    results are hydrated from. With a `bucket_name` both JSONL files are
+    uploaded to GCS.
+    """
+
+    name = "vertex"
+
+    def __init__(self, output_dir: str, uid: str, restricts: bool = True, bucket_name: Optional[str] = None,
+                 project_id: Optional[str] = None, location: Optional[str] = None):
+        super().__init__()
+        self.output_dir = output_dir
+        self.uid = uid
+        self.restricts = restricts
+        self.bucket_name = bucket_name
+        self.project_id = project_id
+        self.location = location
+        self.embeddings_file = os.path.join(output_dir, f"embeddings_{uid}.jsonl")
+        self.documents_file = os.path.join(output_dir, f"documents_{uid}.jsonl")
+        self.document_store = os.path.join(output_dir, f"documents_{uid}.sqlite")
+        self._embeddings = None
+        self._documents = None
+
+    def open(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._embeddings = open(self.embeddings_file, "w")
+        self._documents = open(self.documents_file, "w")
+
+    @staticmethod
+    def restricts_for(doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Vector Search filter namespaces of one chunk"""
+        has_title = (doc.get("metadata") or {}).get("has_title", bool(doc.get("title")))
+        return [
+            {"namespace": "instrument", "allow": [doc["instrument"]]},
+            {"namespace": "source_type", "allow": [doc["source_type"]]},
+            {"namespace": "has_title", "allow": [str(has_title)]}
+        ]
+
+    def write(self, documents: List[Dict[str, Any]]) -> int:
+        for doc in documents:
+            record = {"id": doc["id"], "embedding": doc["embedding"]}
+            if self.restricts:
+                record["restricts"] = self.restricts_for(doc)
+            self._embeddings.write(json.dumps(record) + "\n")
+            self._documents.write(json.dumps({key: value for key, value in doc.items() if key != "embedding"},
+                                             default=str) + "\n")
+        self.written += len(documents)
+        return len(documents)
+
+    def _close_files(self):
+        for f in (self._embeddings, self._documents):
+            if f is not None:
+                f.close()
+        self._embeddings = self._documents = None
+
+    def close(self) -> Dict[str, Any]:
+        self._close_files()
+        print(f"✅ Wrote {self.written} embeddings to: {self.embeddings_file}")
+        document_store = None
+        if self.written:
+            DocumentStore.from_jsonl(self.documents_file, self.document_store).close()
+            document_store = self.document_store
+        gcs_uri = self._upload() if self.bucket_name and self.written else None
+        return {"written": self.written, "embeddings_file": self.embeddings_file,
+                "documents_file": self.documents_file, "document_store": document_store, "gcs_uri": gcs_uri}
+
+    def abort(self):
+        self._close_files()
+
+    def _upload(self) -> str:
+        from google.cloud import storage
+
+        storage_client = storage.Client(project=self.project_id)
+        try:
+            bucket = storage_client.get_bucket(self.bucket_name)
+            print(f"✅ Using existing bucket: {self.bucket_name}")
+        except Exception:
+            bucket = storage_client.create_bucket(self.bucket_name, location=self.location)
+            print(f"✅ Created new bucket: {self.bucket_name}")
+
+        blob_name = f"embeddings/embeddings_{self.uid}.jsonl"
+        bucket.blob(blob_name).upload_from_filename(self.embeddings_file)
+        bucket.blob(f"metadata/documents_{self.uid}.jsonl").upload_from_filename(self.documents_file)
+
+        gcs_uri = f"gs://{self.bucket_name}/{blob_name}"
+        print(f"✅ Uploaded {self.written} embeddings to: {gcs_uri}")
+        return gcs_uri
+
+
+def _snapshot_row(doc: Dict[str, Any]) -> Dict[str, Any]:
+    row = {column: doc.get(column) for column in SNAPSHOT_COLUMNS}
+    if row["date_published"] is None and doc.get("date") not in (None, "Unknown"):
+        row["date_published"] = doc["date"]
+    for column in SNAPSHOT_COLUMNS:
+        value = row[column]
+        if column == "metadata":
+            row[column] = json.dumps(value or {}, default=str)
+        elif value is not None and not isinstance(value, str):
+            row[column] = str(value)
+    return row
+
+
+def _write_npy_header(f, count: int, dim: int) -> int:
+    """(Re)write the .npy header at the start of `f`; its length does not depend on `count`"""
+    f.seek(0)
+    np.lib.format.write_array_header_1_0(f, {"descr": np.lib.format.dtype_to_descr(np.dtype(np.float32)),
+                                             "fortran_order": False, "shape": (count, dim)})
+    return f.tell()
+
+
+class LocalSnapshotSink(CorpusSink):
+    """
+    Local snapshot of the embedded corpus for offline rebuilds.
+
+    vectors.npy holds one float32 row per chunk and opens memory-mapped;
+    the chunk metadata goes to documents.parquet (documents.jsonl without
+    pyarrow) in the same row order. Rebuilding a LocalVectorIndex, trying
+    other index parameters or re-exporting to another target from it needs
+    no parsing, chunking or embedding calls.
+
+    Vectors are appended to the .npy file as batches arrive - the header
+    is rewritten with the final row count on close - and Parquet gets one
+    row group per batch, so memory stays at one batch. Everything is
+    written to `<path>.tmp` and swapped in on close: readers never see a
+    half-written snapshot and a failed run leaves the previous one intact.
+    """
+
+    name = "local"
+
+    def __init__(self, path: str, metadata_format: Optional[str] = None):
+        super().__init__()
+        self.path = path
+        self.metadata_format = metadata_format or ("parquet" if pq is not None else "jsonl")
+        if self.metadata_format == "parquet" and pq is None:
+            raise ImportError("pyarrow is required for Parquet snapshot metadata")
+        self.staging_path = path.rstrip(os.sep) + ".tmp"
+        self.dim = None
+        self._vectors = None
+        self._header_length = 0
+        self._metadata = None
+
+    def open(self):
+        shutil.rmtree(self.staging_path, ignore_errors=True)
+        os.makedirs(self.staging_path)
+        self._vectors = open(os.path.join(self.staging_path, SNAPSHOT_VECTORS), "wb")
+        if self.metadata_format == "jsonl":
+            self._metadata = open(os.path.join(self.staging_path, SNAPSHOT_JSONL), "w")
+
+    @staticmethod
+    def _parquet_schema():
+        return pa.schema([(column, pa.string()) for column in SNAPSHOT_COLUMNS])
+
+    def write(self, documents: List[Dict[str, Any]]) -> int:
+        if not documents:
+            return 0
+        # Converted up front, so a bad row fails before either file is touched and rows stay aligned
+        vectors = np.asarray([doc["embedding"] for doc in documents], dtype=np.float32)
+        rows = [_snapshot_row(doc) for doc in documents]
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self._header_length = _write_npy_header(self._vectors, 0, self.dim)
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension changed from {self.dim} to {vectors.shape[1]}")
+        self._vectors.write(vectors.tobytes())
+
+        if self.metadata_format == "parquet":
+            if self._metadata is None:
+                self._metadata = pq.ParquetWriter(os.path.join(self.staging_path, SNAPSHOT_PARQUET),
+                                                  self._parquet_schema())
+            self._metadata.write_table(pa.Table.from_pylist(rows, schema=self._parquet_schema()))
+        else:
+            for row in rows:
+                self._metadata.write(json.dumps(row) + "\n")
+
+        self.written += len(documents)
+        return len(documents)
+
+    def close(self) -> Dict[str, Any]:
+        dim = self.dim or 0
+        if _write_npy_header(self._vectors, self.written, dim) != self._header_length and self.written:
+            raise RuntimeError("The .npy header changed length; numpy >= 1.24 is required for snapshots")
+        self._vectors.close()
+        if self._metadata is None:
+            # No rows: still write a readable (empty) metadata file
+            pq.write_table(pa.Table.from_pylist([], schema=self._parquet_schema()),
+                           os.path.join(self.staging_path, SNAPSHOT_PARQUET))
+        else:
+            self._metadata.close()
+
+        # Manifest last: a snapshot directory without one is incomplete
+        manifest = {
+            "version": SNAPSHOT_FORMAT_VERSION,
+            "count": self.written,
+            "dim": dim,
+            "metadata_format": self.metadata_format,
+            "created_at": datetime.now().isoformat()
+        }
+        with open(os.path.join(self.staging_path, SNAPSHOT_MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        previous = self.path.rstrip(os.sep) + ".old"
+        shutil.rmtree(previous, ignore_errors=True)
+        if os.path.exists(self.path):
+            os.rename(self.path, previous)
+        os.rename(self.staging_path, self.path)
+        shutil.rmtree(previous, ignore_errors=True)
+
+        print(f"✅ Local snapshot: {self.written} vectors, dim {dim} -> {self.path}")
+        return {"written": self.written, "path": self.path, "dim": dim, "metadata_format": self.metadata_format}
+
+    def abort(self):
+        for f in (self._vectors, self._metadata):
+            if f is not None:
+                f.close()
+        self._vectors = self._metadata = None
+        shutil.rmtree(self.staging_path, ignore_errors=True)
+
+
+def with_local_snapshot(sinks: List[CorpusSink], path: Optional[str] = CORPUS_SNAPSHOT_DIR) -> List[CorpusSink]:
+    """`sinks` plus a LocalSnapshotSink at `path` (CORPUS_SNAPSHOT_DIR) when one is configured"""
+    if path and not any(isinstance(sink, LocalSnapshotSink) for sink in sinks):
+        return sinks + [LocalSnapshotSink(path)]
+    return sinks
+
+
+def read_snapshot_manifest(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, SNAPSHOT_MANIFEST), "r") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {manifest.get('version')} in {path}")
+    return manifest
+
+
+def _iter_jsonl(file_path: str) -> Iterator[Dict[str, Any]]:
+    with open(file_path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_snapshot_documents(path: str) -> Iterator[Dict[str, Any]]:
+    """Snapshot metadata rows in vector order, `metadata` decoded, one Parquet row group at a time"""
+    manifest = read_snapshot_manifest(path)
+    if manifest["metadata_format"] == "parquet":
+        if pq is None:
+            raise ImportError("pyarrow is required to read Parquet snapshot metadata")
+        parquet_file = pq.ParquetFile(os.path.join(path, SNAPSHOT_PARQUET))
+        rows = (row for group in range(parquet_file.num_row_groups)
+                for row in parquet_file.read_row_group(group).to_pylist())
+    else:
+        rows = _iter_jsonl(os.path.join(path, SNAPSHOT_JSONL))
+    for row in rows:
+        row["metadata"] = json.loads(row["metadata"]) if row.get("metadata") else {}
+        yield row
+
+
+def load_snapshot(path: str) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+    """(documents, vectors) of a snapshot; the vectors stay memory-mapped"""
+    manifest = read_snapshot_manifest(path)
+    vectors = np.load(os.path.join(path, SNAPSHOT_VECTORS), mmap_mode="r") if manifest["count"] else \
+        np.zeros((0, manifest["dim"]), dtype=np.float32)
+    documents = list(iter_snapshot_documents(path))
+    if len(documents) != len(vectors):
+        raise ValueError(f"Snapshot {path} has {len(documents)} documents for {len(vectors)} vectors")
+    return documents, vectors
@@ -1,18 +1,30 @@
 # rag_service.py
 import os
+import sys
 import json
 from google.cloud import aiplatform
-from vertexai.language_models import TextEmbeddingModel
 import vertexai
 
+# Add the project root to the Python path for the shared embedding cache and provider
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.services.document_store import DOCUMENT_STORE_PATH, DocumentStore
+from app.utils.embedding_cache import embed_query
+from app.utils.embedding_provider import get_embedder
+
+EMBEDDING_MODEL = "textembedding-gecko@001"
+
 class VertexRAGService:
     """Service for RAG using Vertex AI Vector Search"""
     
-    def __init__(self, metadata_path="processed_corpus/corpus_metadata.json"):
+    def __init__(self, metadata_path="processed_corpus/corpus_metadata.json", document_store_path=None):
         """Initialize the RAG service"""
         self.metadata = self._load_metadata(metadata_path)
+        # Document fields are read per match from the store, opened on first use
+        # (documents_<uid>.sqlite, recorded by the Vertex corpus processors)
+        self.document_store_path = document_store_path or DOCUMENT_STORE_PATH or self.metadata.get("document_store")
+        self._documents = None
         self.project_id, self.location = self._initialize_vertex_ai()
-        self.embedding_model = TextEmbeddingModel.from_pretrained("textembedding-gecko@001")
+        self.embedder = get_embedder(EMBEDDING_MODEL)
         
         # Get the endpoint
         self.endpoint = aiplatform.MatchingEngineIndexEndpoint(
@@ -20,10 +32,22 @@ class VertexRAGService:
         )
     
     def _load_metadata(self, metadata_path):
-        """Load corpus metadata"""
+        """Load corpus metadata (deployment settings - documents live in the document store)"""
         with open(metadata_path, 'r') as f:
             return json.load(f)
     
+    @property
+    def documents(self):
+        """The memory-mapped document store, or None if it has not been built"""
+        if self._documents is None and self.document_store_path and os.path.exists(self.document_store_path):
+            self._documents = DocumentStore(self.document_store_path)
+        return self._documents
+    
+    def hydrate(self, matches):
+        """Matches as dicts with their stored document fields, looked up by id"""
+        documents = self.documents.get_many([match.id for match in matches]) if self.documents else {}
+        return [{**documents.get(match.id, {}), "id": match.id, "distance": match.distance} for match in matches]
+    
     def _initialize_vertex_ai(self):
         """Initialize Vertex AI"""
         project_id = self.metadata["vertex_ai"]["project"]
@@ -33,9 +57,8 @@ class VertexRAGService:
         return project_id, location
     
     def _generate_embedding(self, text):
-        """Generate embedding for text"""
-        embeddings = self.embedding_model.get_embeddings([text])
-        return embeddings[0].values
+        """Generate embedding for text (cached - repeated queries skip the API)"""
+        return embed_query(self.embedder, text)
     
     def query(self, query_text, filter_options=None, num_results=5):
         """Query the Vector Search index with optional filters"""
@@ -102,11 +125,12 @@ def use_rag_in_agent():
             instrument_data = {
                 "relevant_documents": [
                     {
-                        "id": match.id,
-                        "distance": match.distance,
-                        "metadata": match.metadata
+                        "id": doc["id"],
+                        "distance": doc["distance"],
+                        "title": doc.get("title", "Unknown"),
+                        "source_type": doc.get("source_type", "Unknown")
                     }
-                    for match in results
+                    for doc in rag_service.hydrate(results)
                 ]
             }
             
@@ -127,12 +151,12 @@ def use_rag_in_agent():
             )
             
             # Process results into contradictions
-            for match in results:
+            for doc in rag_service.hydrate(results):
                 contradiction = {
-                    "quote": match.id,  # This would actually come from document content
-                    "source": match.metadata.get("source_type", "Unknown"),
-                    "instrument": match.metadata.get("instrument", "Unknown"),
-                    "relevance_score": 1.0 - match.distance  # Convert distance to similarity
+                    "quote": doc.get("content", doc["id"]),
+                    "source": doc.get("source_type", "Unknown"),
+                    "instrument": doc.get("instrument", "Unknown"),
+                    "relevance_score": 1.0 - doc["distance"]  # Convert distance to similarity
                 }
                 contradiction_data.append(contradiction)
         
@@ -0,0 +1,122 @@
+# scripts/benchmark_date_parsing.py - Compare corpus date parsing implementations
+"""
+Benchmark the memoized corpus date parser against the strptime loop it replaced.
+
+Usage:
+    python scripts/benchmark_date_parsing.py              # 50k synthetic news dates
+    python scripts/benchmark_date_parsing.py -n 200000 --unique 0.5
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from data_collection.corpus.dates import DateParser
+
+# (source, format) pairs shaped like the collectors' output
+SOURCES = [
+    ("news/publishedAt", "%Y-%m-%dT%H:%M:%SZ"),
+    ("news/date", "%Y-%m-%d"),
+    ("rss/published", "%a, %d %b %Y %H:%M:%S GMT"),
+    ("analyst_reports/date", "%B %d, %Y"),
+    ("technical_analysis/timestamp", "%Y-%m-%dT%H:%M:%S.%f"),
+    ("sec/date", "%m/%d/%Y"),
+    ("crypto/date", "%d %b %Y"),
+]
+
+LEGACY_FORMATS = [
+    "%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%a, %d %b %Y %H:%M:%S %Z", "%a, %d %b %Y %H:%M:%S", "%d %b %Y", "%B %d, %Y", "%m/%d/%Y", "%d/%m/%Y",
+]
+
+
+def legacy_parse(date_str, source=None):
+    """Previous extract_text_from_item logic: every format in turn, ValueError per miss"""
+    parsed_date = None
+    date_str = date_str.strip()
+    if date_str.endswith(' GM'):
+        date_str = date_str.replace(' GM', ' GMT')
+    elif date_str.endswith(' UTC'):
+        date_str = date_str.replace(' UTC', '+0000')
+    for fmt in LEGACY_FORMATS:
+        try:
+            if fmt == "%a, %d %b %Y %H:%M:%S %Z":
+                if ' GMT' in date_str or ' UTC' in date_str:
+                    parsed_date = datetime.strptime(date_str.replace(' GMT', '').replace(' UTC', ''),
+                                                    "%a, %d %b %Y %H:%M:%S")
+                else:
+                    parsed_date = datetime.strptime(date_str, fmt)
+            else:
+                parsed_date = datetime.strptime(date_str, fmt)
+            break
+        except ValueError:
+            continue
+    if not parsed_date and 'T' in date_str:
+        try:
+            parsed_date = datetime.strptime(date_str.split('T')[0], "%Y-%m-%d")
+        except ValueError:
+            pass
+    if not parsed_date:
+        date_match = re.search(r'(\d{4})-(\d{1,2})-(\d{1,2})', date_str)
+        if date_match:
+            try:
+                year, month, day = date_match.groups()
+                parsed_date = datetime(int(year), int(month), int(day))
+            except ValueError:
+                pass
+    return parsed_date.date() if parsed_date else None
+
+
+def make_corpus(count, unique_fraction, seed=7):
+    """(source, raw date) pairs; `unique_fraction` of them distinct, the rest repeats"""
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    distinct = []
+    for _ in range(max(1, int(count * unique_fraction))):
+        source, fmt = rng.choice(SOURCES)
+        moment = start + timedelta(seconds=rng.randrange(5 * 365 * 86400), microseconds=rng.randrange(10 ** 6))
+        distinct.append((source, moment.strftime(fmt)))
+    return [rng.choice(distinct) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark corpus date parsing")
+    parser.add_argument("-n", "--count", type=int, default=50000, help="Date strings to parse")
+    parser.add_argument("--unique", type=float, default=0.3, help="Fraction of distinct strings")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.count, args.unique)
+    print(f"📅 {len(corpus)} date strings, {len(set(corpus))} distinct, {len(SOURCES)} source formats\n")
+    print(f"{'implementation':<34} {'µs/date':>9} {'speedup':>8}")
+
+    memoized = DateParser()
+    no_cache = DateParser(cache_size=0)
+    implementations = [
+        ("strptime loop (old)", legacy_parse),
+        ("DateParser, no cache", no_cache.parse),
+        ("DateParser", memoized.parse),
+    ]
+
+    baseline = None
+    results = {}
+    for name, parse in implementations:
+        start = time.perf_counter()
+        results[name] = [parse(raw, source) for source, raw in corpus]
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{name:<34} {elapsed / len(corpus) * 1e6:>9.2f} {baseline / elapsed:>7.1f}x")
+
+    mismatches = sum(1 for old, new in zip(results["strptime loop (old)"], results["DateParser"]) if old != new)
+    print(f"\n   Same result as the old parser for {len(corpus) - mismatches}/{len(corpus)} strings")
+    print(f"   Parse paths: {memoized.stats}")
+
+
+if __name__ == "__main__":
+    main()
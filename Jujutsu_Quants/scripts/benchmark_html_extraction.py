@@ -0,0 +1,104 @@
+# scripts/benchmark_html_extraction.py - Compare HTML text extraction implementations
+"""
+Benchmark the shared HTML extractor against the extraction code it replaced.
+
+Usage:
+    python scripts/benchmark_html_extraction.py                  # fixture corpus
+    python scripts/benchmark_html_extraction.py --dir data/ -n 3  # collected pages
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from app.utils.html_extractor import extract_text, get_backend
+
+DEFAULT_CORPUS = os.path.join(project_root, "tests", "fixtures", "html")
+
+
+def bs4_paragraphs(html):
+    """Previous news_fetch_service extraction: full soup, join every <p>"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    paragraphs = [p.get_text(strip=True) for p in soup.find_all('p')]
+    return '\n'.join([p for p in paragraphs if p])[:5000]
+
+
+def bs4_get_text(html):
+    """Previous corpus processor extraction: soup.get_text + whitespace cleanup"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    return " ".join(soup.get_text(separator="\n").split())
+
+
+def html2text_markdown(html):
+    """Previous analyst collector extraction: html2text markdown conversion"""
+    import html2text
+    h = html2text.HTML2Text()
+    h.ignore_links = True
+    h.ignore_images = True
+    h.body_width = 0
+    return h.handle(html).strip()
+
+
+IMPLEMENTATIONS = [
+    ("bs4 <p> join (news, old)", bs4_paragraphs),
+    ("bs4 get_text (corpus, old)", bs4_get_text),
+    ("html2text (analyst, old)", html2text_markdown),
+    (f"extract_text [{get_backend()}]", extract_text),
+    (f"extract_text max_chars=5000 [{get_backend()}]", lambda html: extract_text(html, max_chars=5000)),
+]
+
+
+def load_corpus(directory):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, "**", "*.html"), recursive=True)):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            pages.append(f.read())
+    return pages
+
+
+def run_benchmark(pages, repeat):
+    total_bytes = sum(len(page.encode('utf-8')) for page in pages) * repeat
+    print(f"📄 {len(pages)} pages, {total_bytes / repeat / 1024:.1f} KB, {repeat} rounds\n")
+    print(f"{'implementation':<44} {'ms/page':>9} {'MB/s':>8} {'chars/page':>11}")
+
+    for name, func in IMPLEMENTATIONS:
+        try:
+            func(pages[0])
+        except ImportError as e:
+            print(f"{name:<44} skipped ({e.name} not installed)")
+            continue
+
+        output_chars = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for page in pages:
+                output_chars += len(func(page))
+        elapsed = time.perf_counter() - start
+
+        runs = len(pages) * repeat
+        print(f"{name:<44} {elapsed / runs * 1000:>9.2f} {total_bytes / elapsed / 1e6:>8.2f} "
+              f"{output_chars / runs:>11.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML text extraction")
+    parser.add_argument("--dir", default=DEFAULT_CORPUS, help="Directory searched recursively for *.html")
+    parser.add_argument("-n", "--repeat", type=int, default=20, help="Rounds over the corpus")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.dir)
+    if not pages:
+        print(f"❌ No .html files found under {args.dir}")
+        return
+    run_benchmark(pages, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
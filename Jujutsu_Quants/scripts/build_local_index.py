@@ -0,0 +1,76 @@
+# scripts/build_local_index.py - Build the in-process vector index from corpus processor output
+"""
+Build a LocalVectorIndex from a corpus processor run
+(processed_corpus/embeddings_<uid>.jsonl + documents_<uid>.jsonl) or from a
+local corpus snapshot (vectors.npy + documents.parquet).
+
+Usage:
+    python scripts/build_local_index.py                                  # latest run
+    python scripts/build_local_index.py --corpus data_collection/processed_corpus \\
+        --out .cache/local_index --uid 1a2b3c4d --nlist 256
+    python scripts/build_local_index.py --snapshot data_collection/processed_corpus/snapshot
+    python scripts/build_local_index.py --query-check 20                 # recall vs exact search
+
+Point LOCAL_VECTOR_INDEX_PATH at the output directory to serve retrieval from it.
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import numpy as np
+
+from app.services.local_vector_index import LocalVectorIndex
+from data_collection.corpus.sinks import load_snapshot
+
+
+def recall_check(index: LocalVectorIndex, queries: int, k: int = 10):
+    """Compare the index against a brute-force scan, using stored vectors as queries"""
+    rng = np.random.default_rng(0)
+    rows = rng.choice(index.meta["count"], min(queries, index.meta["count"]), replace=False)
+    vectors = np.asarray(index.vectors)
+    found = 0
+    elapsed = 0.0
+    for row in rows:
+        query = vectors[row]
+        start = time.perf_counter()
+        hits = index.semantic_search(query, k, similarity_threshold=None)
+        elapsed += time.perf_counter() - start
+        exact = {index.get_document(int(r))["id"] for r in np.argsort(-(vectors @ query))[:k]}
+        found += len(exact & {hit["id"] for hit in hits})
+    print(f"🎯 recall@{k}: {found / (len(rows) * k):.3f}, {elapsed / len(rows) * 1000:.2f} ms/query")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=os.path.join(project_root, "data_collection", "processed_corpus"),
+                        help="Directory with embeddings_<uid>.jsonl and documents_<uid>.jsonl")
+    parser.add_argument("--out", default=os.path.join(project_root, ".cache", "local_index"),
+                        help="Index directory to write")
+    parser.add_argument("--uid", default=None, help="Corpus run to index (default: most recent)")
+    parser.add_argument("--snapshot", default=None, help="Build from a local corpus snapshot directory instead")
+    parser.add_argument("--nlist", type=int, default=None, help="Inverted lists (default: exact up to 4096 rows)")
+    parser.add_argument("--nprobe", type=int, default=None, help="Lists scanned per query (default: sqrt(nlist))")
+    parser.add_argument("--query-check", type=int, default=0, help="Measure recall with N sample queries")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.snapshot:
+        documents, vectors = load_snapshot(args.snapshot)
+        index = LocalVectorIndex.build(documents, vectors, args.out, nlist=args.nlist, nprobe=args.nprobe)
+    else:
+        index = LocalVectorIndex.from_corpus_output(args.corpus, args.out, uid=args.uid,
+                                                    nlist=args.nlist, nprobe=args.nprobe)
+    print(f"⏱️  Built in {time.perf_counter() - start:.1f}s: {index.get_stats()}")
+
+    if args.query_check:
+        recall_check(index, args.query_check)
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
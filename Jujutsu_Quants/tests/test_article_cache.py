@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+import httpx
+
+from app.services import news_fetch_service
+from app.services.article_cache import ArticleCache
+
+ARTICLE = {"title": "Fed holds rates", "content": "The Fed held rates steady.", "source": "example.com",
+           "url": "https://example.com/fed"}
+
+
+def test_freshness_validators_and_prune(tmp_path):
+    """Test fresh/stale entries, conditional headers, touch after a 304 and pruning of unused entries"""
+    cache = ArticleCache(str(tmp_path / "articles.sqlite3"), ttl=60, max_age=3600)
+    cache.put(ARTICLE["url"], ARTICLE, etag='"v1"', last_modified="Wed, 21 May 2025 10:00:00 GMT")
+    cache.put("https://example.com/empty", None)
+
+    entry = cache.get(ARTICLE["url"])
+    assert entry["fresh"] and entry["article"] == ARTICLE
+    assert cache.conditional_headers(entry) == {"If-None-Match": '"v1"',
+                                                "If-Modified-Since": "Wed, 21 May 2025 10:00:00 GMT"}
+    assert cache.get("https://example.com/empty")["article"] is None
+    assert set(cache.get_many([ARTICLE["url"], "https://example.com/missing"])) == {ARTICLE["url"]}
+
+    cache._conn.execute("UPDATE articles SET fetched_at = ?", (time.time() - 120,))
+    assert not cache.get(ARTICLE["url"])["fresh"]
+    cache.touch(ARTICLE["url"])
+    assert cache.get(ARTICLE["url"])["fresh"]
+
+    cache._conn.execute("UPDATE articles SET fetched_at = ? WHERE url != ?", (time.time() - 7200, ARTICLE["url"]))
+    cache._prune()
+    assert cache.get("https://example.com/empty") is None and cache.get(ARTICLE["url"])
+    cache.close()
+
+
+def test_not_modified_reuses_the_cached_article(tmp_path, monkeypatch):
+    """Test that a stale entry is revalidated with a conditional GET and reused on 304"""
+    cache = ArticleCache(str(tmp_path / "articles.sqlite3"), ttl=0)
+    cache.put(ARTICLE["url"], ARTICLE, etag='"v1"')
+    monkeypatch.setattr(news_fetch_service, "get_article_cache", lambda: cache)
+
+    requests = []
+
+    def handler(request):
+        requests.append(request.headers.get("if-none-match"))
+        return httpx.Response(304)
+
+    articles = asyncio.run(news_fetch_service.fetch_urls_to_articles_async(
+        [ARTICLE["url"]], transport=httpx.MockTransport(handler)))
+    assert articles == [ARTICLE] and requests == ['"v1"']
+    cache.close()
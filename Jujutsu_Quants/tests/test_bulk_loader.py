@@ -0,0 +1,86 @@
+import struct
+import uuid
+
+from data_collection.corpus.bulk_loader import (BINARY_HEADER, BINARY_TRAILER, bulk_load_documents,
+                                                copy_stream, encode_binary_row, encode_text_row)
+
+DOC = {
+    "id": "6f1c1d6e-3f0a-5b7e-9a57-7b1d0c2e4a91",
+    "title": "AAPL 10-Q",
+    "content": "Line one\tcol\nline two \\ end\x00",
+    "instrument": "AAPL",
+    "source_type": "sec_filing",
+    "file_path": "earnings/AAPL/q3.html",
+    "date_published": "2000-01-03",
+    "embedding": [0.5, -1.0, 0.25],
+    "metadata": {"chunk_index": 0}
+}
+
+def _fields(row):
+    count, = struct.unpack_from("!h", row)
+    offset, fields = 2, []
+    for _ in range(count):
+        length, = struct.unpack_from("!i", row, offset)
+        offset += 4
+        fields.append(None if length == -1 else row[offset:offset + length])
+        offset += max(length, 0)
+    assert offset == len(row)
+    return fields
+
+def test_binary_row_uses_postgres_wire_formats():
+    """Test uuid, text, date, pgvector and jsonb encodings of one binary COPY tuple"""
+    fields = _fields(encode_binary_row(DOC))
+
+    assert fields[0] == uuid.UUID(DOC["id"]).bytes
+    assert fields[2] == b"Line one\tcol\nline two \\ end"
+    assert struct.unpack("!i", fields[6]) == (2,)
+    assert struct.unpack("!hh3f", fields[7]) == (3, 0, 0.5, -1.0, 0.25)
+    assert fields[8] == b'\x01{"chunk_index": 0}'
+    assert _fields(encode_binary_row({**DOC, "date_published": None, "title": None}))[1] is None
+
+    payload = b"".join(copy_stream([DOC, DOC], "binary"))
+    assert payload.startswith(BINARY_HEADER) and payload.endswith(BINARY_TRAILER)
+
+def test_text_row_escaping_and_load_statements():
+    """Test text COPY escaping and the staging -> drop index -> merge sequence"""
+    line = encode_text_row({**DOC, "date_published": "Unknown"})
+    assert line == (b"6f1c1d6e-3f0a-5b7e-9a57-7b1d0c2e4a91\tAAPL 10-Q\tLine one\\tcol\\nline two \\\\ end\t"
+                    b"AAPL\tsec_filing\tearnings/AAPL/q3.html\t\\N\t[0.5,-1.0,0.25]\t{\"chunk_index\": 0}\n")
+
+    class RecordingCursor:
+        rowcount = 2
+        def __init__(self):
+            self.statements = []
+            self.streamed = b""
+        def execute(self, sql, args=None, stream=None):
+            self.statements.append(" ".join(sql.split()))
+            if stream is not None:
+                self.streamed += b"".join(stream)
+        def fetchone(self):
+            return (5,)
+        def close(self):
+            pass
+
+    class Connection:
+        def __init__(self):
+            self.cursor_obj = RecordingCursor()
+            self.committed = False
+        def cursor(self):
+            return self.cursor_obj
+        def commit(self):
+            self.committed = True
+        def rollback(self):
+            pass
+
+    conn = Connection()
+    result = bulk_load_documents(conn, [DOC, DOC, DOC], chunk_rows=2)
+    statements = conn.cursor_obj.statements
+
+    assert result == {"staged": 3, "upserted": 2, "index_dropped": True}
+    assert sum(sql.startswith("COPY documents_staging") for sql in statements) == 2
+    assert any(sql.startswith("DROP INDEX IF EXISTS idx_documents_embedding") for sql in statements)
+    assert statements[-1].startswith("INSERT INTO documents") and "ON CONFLICT (id) DO UPDATE" in statements[-1]
+    guarded = statements[-1].split(" WHERE ")[-1]
+    for column in ["title", "content", "instrument", "source_type", "date_published", "embedding", "metadata"]:
+        assert f"documents.{column}" in guarded and f"EXCLUDED.{column}" in guarded, column
+    assert conn.committed
@@ -0,0 +1,42 @@
+from data_collection.corpus.chunker import Chunker, chunk_document, count_tokens, sentence_spans
+
+TEXT = ("Apple Inc. reported revenue of $94.8 billion, up 5% year over year. CEO Tim Cook said U.S. demand "
+        "was strong. Margins expanded to 46.6%. Analysts at J. P. Morgan raised targets.\n\nServices grew 14% "
+        "to a record. The board approved a $110 billion buyback! Shares rose 7% after hours.")
+
+
+def test_chunks_follow_sentences_within_token_limit_with_overlap():
+    """Test sentence boundaries (abbreviations, decimals, paragraphs), size limit and overlap"""
+    sentences = [TEXT[start:end] for start, end in sentence_spans(TEXT)]
+    sentence_starts = {start for start, _ in sentence_spans(TEXT)}
+    assert sentences[0] == "Apple Inc. reported revenue of $94.8 billion, up 5% year over year."
+    assert sentences[3] == "Analysts at J. P. Morgan raised targets."
+    assert len(sentences) == 7
+
+    chunker = Chunker(max_tokens=30, overlap_tokens=10, min_tokens=5)
+    spans = chunker.spans(TEXT)
+    assert len(spans) > 1
+    for (start, end, tokens), (next_start, _, _) in zip(spans, spans[1:]):
+        assert tokens == count_tokens(TEXT[start:end]) <= 30
+        assert next_start < end, "Consecutive chunks should overlap"
+        assert next_start in sentence_starts, "Chunks should start on a sentence"
+    assert spans[0][0] == 0 and spans[-1][1] == len(TEXT)
+
+    run_on = " ".join(f"w{i}" for i in range(100))
+    assert [tokens for _, _, tokens in Chunker(max_tokens=30, overlap_tokens=5).spans(run_on)] == [30, 30, 30, 25]
+
+
+def test_chunk_metadata_is_per_chunk_and_holds_offsets():
+    """Test that chunks no longer share (and overwrite) the parent's metadata dict"""
+    doc = {"id": "6f1c1d6e-3f0a-5b7e-9a57-7b1d0c2e4a91", "title": "AAPL Q3", "content": TEXT,
+           "instrument": "AAPL", "metadata": {"instrument": "AAPL", "has_title": True}}
+    chunks = chunk_document(doc, Chunker(max_tokens=30, overlap_tokens=10))
+
+    assert [chunk["metadata"]["chunk_index"] for chunk in chunks] == list(range(len(chunks)))
+    assert doc["metadata"] == {"instrument": "AAPL", "has_title": True}
+    assert len({chunk["id"] for chunk in chunks}) == len(chunks)
+    for chunk in chunks:
+        metadata = chunk["metadata"]
+        assert TEXT[metadata["char_start"]:metadata["char_end"]] == chunk["content"]
+        assert metadata["parent_id"] == doc["id"] and metadata["chunk_count"] == len(chunks)
+        assert chunk["title"] == "AAPL Q3" and chunk["instrument"] == "AAPL"
@@ -0,0 +1,58 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from app.database.connection_pool import AsyncConnectionPool, ConnectionPool, PoolTimeout
+
+def _sqlite_pool(**kwargs):
+    return ConnectionPool(lambda: sqlite3.connect(":memory:", check_same_thread=False), **kwargs)
+
+def test_max_size_and_acquire_timeout():
+    """Test that the pool never opens more than max_size connections and times out waiting"""
+    pool = _sqlite_pool(max_size=2, acquire_timeout=0.1)
+    first, second = pool.acquire(), pool.acquire()
+    assert second is not first, "Each checkout should get its own connection"
+
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+
+    pool.release(first)
+    assert pool.acquire() is first, "Released connection should be reused"
+    assert pool.get_stats()["open"] == 2
+
+def test_broken_connection_is_replaced():
+    """Test that a connection failing its health check is discarded and a new one opened"""
+    pool = _sqlite_pool(max_size=1, health_check_interval=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.close()  # Simulates the server dropping the connection
+
+    replacement = pool.acquire()
+    assert replacement is not conn
+    assert replacement.execute("SELECT 1").fetchone() == (1,)
+    assert pool.get_stats()["discarded"] == 1
+
+def test_concurrent_async_queries_share_pool():
+    """Test that many concurrent async queries complete on a small pool"""
+    pool = _sqlite_pool(max_size=2, acquire_timeout=5)
+    async_pool = AsyncConnectionPool(pool)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def query(conn, value):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        try:
+            return conn.execute("SELECT ?", (value,)).fetchone()[0]
+        finally:
+            with lock:
+                active[0] -= 1
+
+    async def main():
+        return await asyncio.gather(*[async_pool.run(query, i) for i in range(20)])
+
+    assert asyncio.run(main()) == list(range(20))
+    assert peak[0] <= 2 and pool.get_stats()["open"] <= 2
@@ -0,0 +1,13 @@
+from data_collection.corpus.ids import chunk_id, content_hash, document_id
+
+def test_ids_are_stable_and_content_addressed():
+    """Test that reruns reproduce IDs and that content, path or position changes give new ones"""
+    text = "Apple beat estimates.\n\nServices revenue hit a record."
+    first = document_id("news/AAPL/2024.json", 3, text)
+
+    assert first == document_id("news/AAPL/2024.json", 3, "Apple beat estimates. Services   revenue hit a record.")
+    assert content_hash(text) == content_hash("  Apple beat estimates. Services revenue hit a record.")
+    assert first != document_id("news/AAPL/2024.json", 3, text + " Shares rose.")
+    assert first != document_id("news/AAPL/2024.json", 4, text)
+    assert first != document_id("news/MSFT/2024.json", 3, text)
+    assert chunk_id(first, 0, text) != chunk_id(first, 1, text)
@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+from data_collection.corpus.pipeline import PipelineError, StreamingPipeline
+
+
+def test_backpressure_bounds_items_in_flight():
+    """Test that a slow downstream stage throttles the source instead of letting work pile up"""
+    produced = []
+    loaded = []
+    in_flight = []
+    lock = threading.Lock()
+
+    def source():
+        for i in range(3000):
+            with lock:
+                produced.append(i)
+                in_flight.append(len(produced) - len(loaded))
+            yield i
+
+    def load(batch):
+        time.sleep(0.002)
+        with lock:
+            loaded.extend(batch)
+        return [len(batch)]
+
+    pipeline = (StreamingPipeline(queue_size=8, progress=False)
+                .add_stage("chunk", lambda item: [item, item])
+                .add_batch_stage("load", load, 16))
+    assert sum(pipeline.run(source())) == 6000
+
+    # queues (3 x 8) + one batch + items held by the stage threads; nowhere near 3000
+    assert max(in_flight) < 3 * 8 + 16 + 8
+    assert pipeline.get_stats()["load"]["in"] == 6000
+
+
+def test_stage_errors_drop_items_and_fatal_errors_stop():
+    """Test tolerated per-item failures are counted and skipped, and other failures are raised"""
+    def parse(item):
+        if item % 10 == 0:
+            raise ValueError("unparseable file")
+        return [item]
+
+    pipeline = StreamingPipeline(queue_size=4, progress=False).add_stage("parse", parse, workers=3,
+                                                                         tolerate_errors=True) \
+        .add_batch_stage("collect", lambda batch: [sorted(batch)], 7)
+    batches = list(pipeline.run(range(100)))
+    assert sorted(item for batch in batches for item in batch) == [i for i in range(100) if i % 10]
+    assert pipeline.get_stats()["parse"]["errors"] == 10
+
+    def broken_source():
+        yield 1
+        raise OSError("disk gone")
+
+    with pytest.raises(PipelineError):
+        list(StreamingPipeline(progress=False).add_stage("parse", lambda item: [item]).run(broken_source()))
+
+    def write(batch):
+        if 40 in batch:
+            raise OSError("connection reset")
+        return [len(batch)]
+
+    pipeline = StreamingPipeline(progress=False).add_batch_stage("write", write, 16)
+    with pytest.raises(PipelineError):
+        list(pipeline.run(range(100)))
+    assert pipeline.get_stats()["write"]["errors"] == 16
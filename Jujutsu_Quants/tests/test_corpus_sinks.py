@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services.document_store import DocumentStore
+from data_collection.corpus.sinks import LocalSnapshotSink, VertexJsonlSink, load_snapshot
+
+
+def _chunks(start, count, dim=4):
+    return [{
+        "id": f"chunk-{i}",
+        "title": f"Chunk {i}",
+        "content": f"content {i}",
+        "instrument": "AAPL" if i % 2 else "BTC-USD",
+        "source_type": "news",
+        "file_path": "news/AAPL/a.json",
+        "date": "2024-05-01" if i % 3 else "Unknown",
+        "date_published": "2024-05-01" if i % 3 else None,
+        "embedding": [float(i + d) for d in range(dim)],
+        "metadata": {"parent_id": "doc", "chunk_index": i, "has_title": True}
+    } for i in range(start, start + count)]
+
+
+@pytest.mark.parametrize("metadata_format", ["jsonl", "parquet"])
+def test_local_snapshot_round_trip_and_swap(tmp_path, metadata_format):
+    """Test that batches land in one memory-mapped .npy aligned with the metadata, replacing the last snapshot"""
+    if metadata_format == "parquet":
+        pytest.importorskip("pyarrow")
+    path = str(tmp_path / "snapshot")
+
+    first = LocalSnapshotSink(path, metadata_format=metadata_format)
+    first.open()
+    first.write(_chunks(0, 2))
+    assert first.close()["written"] == 2
+
+    sink = LocalSnapshotSink(path, metadata_format=metadata_format)
+    sink.open()
+    sink.write(_chunks(0, 3))
+    sink.write(_chunks(3, 4))
+    with pytest.raises(ValueError):
+        sink.write(_chunks(7, 1, dim=5))
+    assert sink.close() == {"written": 7, "path": path, "dim": 4, "metadata_format": metadata_format}
+
+    documents, vectors = load_snapshot(path)
+    assert isinstance(vectors, np.memmap) and vectors.shape == (7, 4) and vectors.dtype == np.float32
+    assert vectors[5].tolist() == [5.0, 6.0, 7.0, 8.0]
+    assert [doc["id"] for doc in documents] == [f"chunk-{i}" for i in range(7)]
+    assert documents[3]["metadata"]["chunk_index"] == 3
+    assert documents[3]["date_published"] is None and documents[4]["date_published"] == "2024-05-01"
+    assert not (tmp_path / "snapshot.tmp").exists()
+
+    aborted = LocalSnapshotSink(path, metadata_format=metadata_format)
+    aborted.open()
+    aborted.write(_chunks(0, 1))
+    aborted.abort()
+    assert len(load_snapshot(path)[0]) == 7, "A failed run must leave the previous snapshot in place"
+
+
+def test_vertex_jsonl_restricts_are_optional(tmp_path):
+    """Test the Vector Search embeddings file with and without restricts, and the document store built on close"""
+    for restricts in (True, False):
+        sink = VertexJsonlSink(str(tmp_path), f"run{int(restricts)}", restricts=restricts)
+        sink.open()
+        sink.write(_chunks(0, 2))
+        result = sink.close()
+        assert result["gcs_uri"] is None and result["written"] == 2
+
+        records = [json.loads(line) for line in open(result["embeddings_file"])]
+        assert records[1]["embedding"] == [1.0, 2.0, 3.0, 4.0]
+        assert ("restricts" in records[1]) == restricts
+        if restricts:
+            assert {"namespace": "instrument", "allow": ["AAPL"]} in records[1]["restricts"]
+        documents = [json.loads(line) for line in open(result["documents_file"])]
+        assert [doc["id"] for doc in documents] == ["chunk-0", "chunk-1"] and "embedding" not in documents[0]
+        store = DocumentStore(result["document_store"])
+        assert store.get("chunk-1")["content"] == "content 1" and len(store) == 2
+        store.close()
@@ -0,0 +1,39 @@
+from datetime import date, datetime
+
+from data_collection.corpus.dates import DateParser
+
+
+def test_formats_parse_like_the_old_strptime_loop():
+    """Test the fast paths and fallback formats on the strings the collectors produce"""
+    parser = DateParser()
+    may_21 = date(2025, 5, 21)
+    for raw in ["2025-05-21", "2025-05-21T19:35:38", "2025-05-21T19:35:38.123456Z", "2025-05-21T19:35:38+02:00",
+                "Wed, 21 May 2025 19:35:38 GMT", "Wed, 21 May 2025 19:35:38 GM", " 21 May 2025 ", "May 21, 2025",
+                "05/21/2025", "21/05/2025", "published 2025-5-21 by Reuters"]:
+        assert parser.parse(raw) == may_21, raw
+
+    assert parser.parse("yesterday") is None
+    assert parser.parse("2025-02-30") is None
+    assert parser.parse(datetime(2025, 5, 21, 9, 30)) == may_21
+    assert parser.parse_iso("May 21, 2025") == "2025-05-21"
+
+
+def test_source_format_is_remembered_and_results_cached():
+    """Test that a source's working format is tried first and repeated strings hit the cache"""
+    parser = DateParser()
+    assert parser.parse("May 21, 2025", source="ecb/date") == date(2025, 5, 21)
+    assert parser.parse("June 3, 2025", source="ecb/date") == date(2025, 6, 3)
+    assert parser.stats["remembered"] == 1
+
+    for _ in range(100):
+        parser.parse("21 May 2025", source="crypto/date")
+    assert parser.cache_info().hits >= 99
+
+
+def test_ambiguous_dates_do_not_depend_on_history():
+    """Test that day/month strings resolve the same on a fresh parser and after a day-first date"""
+    fresh, seasoned = DateParser(), DateParser()
+    assert seasoned.parse("21/05/2025", source="news/date") == date(2025, 5, 21)
+    for parser in (fresh, seasoned):
+        assert parser.parse("05/06/2025", source="news/date") == date(2025, 5, 6)
+    assert seasoned.stats["remembered"] == 0
@@ -0,0 +1,61 @@
+import json
+import threading
+
+from app.services.document_store import DocumentStore
+
+
+def _documents(count):
+    for i in range(count):
+        yield {
+            "id": f"chunk-{i}",
+            "title": f"Chunk {i}",
+            "content": f"content {i} " * 20,
+            "instrument": "AAPL" if i % 2 else "BTC-USD",
+            "source_type": "news",
+            "date": "2024-05-01",
+            "file_path": "news/AAPL/a.json",
+            "embedding": [0.1, 0.2],
+            "metadata": {"chunk_index": i, "has_title": True}
+        }
+
+
+def test_build_from_jsonl_and_hydrate_by_id(tmp_path):
+    """Test that rows round-trip by id, extra fields survive and embeddings are not stored"""
+    jsonl = tmp_path / "documents_run1.jsonl"
+    with open(jsonl, "w") as f:
+        for doc in _documents(2500):
+            f.write(json.dumps(doc) + "\n")
+        f.write(json.dumps({"id": "chunk-7", "title": "Replaced"}) + "\n")
+
+    store = DocumentStore.from_jsonl(str(jsonl), str(tmp_path / "documents.sqlite"))
+    assert len(store) == 2500
+    doc = store.get("chunk-3")
+    assert doc["title"] == "Chunk 3" and doc["metadata"] == {"chunk_index": 3, "has_title": True}
+    assert "embedding" not in doc
+    assert store.get("chunk-7") == {"id": "chunk-7", "title": "Replaced"}
+    assert store.get("missing", {}) == {} and "missing" not in store and "chunk-0" in store
+
+    ids = [f"chunk-{i}" for i in range(0, 2500, 2)] + ["missing"]
+    found = store.get_many(ids)
+    assert len(found) == 1250 and found["chunk-2498"]["instrument"] == "BTC-USD"
+    store.close()
+
+
+def test_store_is_shared_across_threads(tmp_path):
+    """Test concurrent lookups on one reopened store"""
+    path = str(tmp_path / "documents.sqlite")
+    DocumentStore.build(_documents(100), path).close()
+    store = DocumentStore(path)
+
+    titles = {}
+
+    def lookup(i):
+        titles[i] = store.get(f"chunk-{i}")["title"]
+
+    threads = [threading.Thread(target=lookup, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert titles == {i: f"Chunk {i}" for i in range(8)}
+    store.close()
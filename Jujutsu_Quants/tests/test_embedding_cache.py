@@ -0,0 +1,31 @@
+from app.utils.embedding_cache import EmbeddingCache
+
+def test_lru_keyed_by_model_and_normalized_text():
+    """Test that whitespace variants hit, other models miss and old entries are evicted"""
+    calls = []
+    def compute(text):
+        calls.append(text)
+        return [0.1, 0.2, 0.3]
+
+    cache = EmbeddingCache(max_entries=2)
+    first = cache.get_or_compute("text-embedding-004", "Bitcoin  halving\n", compute)
+    again = cache.get_or_compute("text-embedding-004", " Bitcoin halving", compute)
+
+    assert first == again and len(calls) == 1
+    assert cache.get("textembedding-gecko@001", "Bitcoin halving") is None
+
+    cache.put("text-embedding-004", "oil", [1.0])
+    cache.put("text-embedding-004", "gold", [2.0])
+    assert cache.get("text-embedding-004", "Bitcoin halving") is None, "Least recently used entry should be evicted"
+
+def test_disk_tier_survives_restart(tmp_path):
+    """Test that vectors written to disk are served to a fresh cache as float32"""
+    path = str(tmp_path / "embeddings.sqlite3")
+    EmbeddingCache(disk_path=path).put("text-embedding-004", "oil supply", [0.5, -0.25, 1.0 / 3])
+
+    restarted = EmbeddingCache(disk_path=path)
+    vector = restarted.get("text-embedding-004", "oil supply")
+
+    assert vector[:2] == [0.5, -0.25]
+    assert abs(vector[2] - 1.0 / 3) < 1e-7
+    assert restarted.get_stats()["disk_hits"] == 1
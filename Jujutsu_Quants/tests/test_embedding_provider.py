@@ -0,0 +1,65 @@
+import threading
+import time
+
+import pytest
+
+from app.utils.embedding_provider import BatchingEmbedder, EmbeddingProvider, HashingEmbeddingProvider
+
+class RecordingProvider(EmbeddingProvider):
+    model_name = "recording"
+
+    def __init__(self, delay=0.05, fail_on=None):
+        self.calls = []
+        self.delay = delay
+        self.fail_on = fail_on
+
+    def embed_batch(self, texts):
+        self.calls.append(list(texts))
+        time.sleep(self.delay)
+        if self.fail_on in texts:
+            raise RuntimeError("quota exceeded")
+        return [[float(len(text))] for text in texts]
+
+def test_hashing_provider_is_deterministic_768d_and_unit_length():
+    """Test that the local backend gives stable normalized vectors that reflect shared vocabulary"""
+    provider = HashingEmbeddingProvider()
+    first = provider.embed_text("Apple raises guidance for AAPL")
+    again = HashingEmbeddingProvider().embed_text("Apple raises guidance for AAPL")
+
+    assert len(first) == 768 and first == again
+    assert sum(value * value for value in first) == pytest.approx(1.0)
+
+    def cosine(a, b):
+        return sum(x * y for x, y in zip(a, b))
+    related = provider.embed_text("AAPL guidance raised")
+    unrelated = provider.embed_text("Crude oil inventories fell")
+    assert cosine(first, related) > cosine(first, unrelated)
+
+def test_concurrent_calls_are_micro_batched_with_bounded_concurrency():
+    """Test that single calls from many threads coalesce into few provider calls"""
+    provider = RecordingProvider()
+    embedder = BatchingEmbedder(provider, max_batch_size=8, max_concurrency=2, batch_window=0.02)
+
+    results = {}
+    def worker(i):
+        results[i] = embedder.embed(f"text {i:02d}")
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(results[i] == [7.0] for i in range(20))
+    assert len(provider.calls) <= 5 and max(len(call) for call in provider.calls) <= 8
+    assert embedder.embed_many(["a", "bb", "a"]) == [[1.0], [2.0], [1.0]]
+    assert embedder.get_stats()["deduplicated"] >= 1
+
+def test_failed_batch_fails_only_its_own_texts():
+    """Test that a provider error reaches the waiting callers instead of hanging them"""
+    embedder = BatchingEmbedder(RecordingProvider(delay=0, fail_on="bad"), max_batch_size=1, batch_window=0)
+    futures = [embedder.submit(text) for text in ["ok", "bad", "fine"]]
+
+    assert futures[0].result(timeout=5) == [2.0]
+    with pytest.raises(RuntimeError):
+        futures[1].result(timeout=5)
+    assert futures[2].result(timeout=5) == [4.0]
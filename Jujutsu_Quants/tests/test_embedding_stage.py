@@ -0,0 +1,74 @@
+import threading
+
+from app.utils.embedding_provider import EmbeddingProvider
+from data_collection.corpus.embedding_stage import EmbeddingCheckpoint, EmbeddingStage
+
+class ResourceExhausted(Exception):
+    """Same name as the google.api_core quota error"""
+
+class FlakyProvider(EmbeddingProvider):
+    model_name = "flaky"
+
+    def __init__(self, quota_errors=0, crash_after=None):
+        self.quota_errors = quota_errors
+        self.crash_after = crash_after
+        self.embedded = []
+        self.batch_sizes = []
+        self._lock = threading.Lock()
+
+    def embed_batch(self, texts):
+        with self._lock:
+            if self.quota_errors:
+                self.quota_errors -= 1
+                raise ResourceExhausted("429 Quota exceeded")
+            if self.crash_after is not None and len(self.embedded) >= self.crash_after:
+                raise KeyboardInterrupt("process killed")
+            self.embedded.extend(texts)
+            self.batch_sizes.append(len(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+def _documents(count):
+    return [{"id": f"chunk-{i}", "content": f"chunk text number {i}"} for i in range(count)]
+
+def test_rerun_resumes_from_checkpoint(tmp_path):
+    """Test that a crashed run keeps finished batches and the rerun embeds only the rest"""
+    checkpoint = str(tmp_path / "checkpoint.jsonl")
+    documents = _documents(100)
+
+    crashing = FlakyProvider(crash_after=40)
+    stage = EmbeddingStage(crashing, checkpoint, concurrency=1, max_batch_size=10)
+    try:
+        stage.run(documents)
+    except KeyboardInterrupt:
+        pass
+    finished = len(crashing.embedded)
+    assert finished >= 40
+
+    resumed = FlakyProvider()
+    vectors = EmbeddingStage(resumed, checkpoint, concurrency=3, max_batch_size=10).run(documents)
+    assert len(vectors) == 100 and vectors["chunk-7"].tolist() == [19.0, 1.0]
+    assert len(resumed.embedded) == 100 - finished
+
+def test_quota_errors_back_off_and_shrink_batches(tmp_path):
+    """Test that quota errors are retried with smaller batches instead of failing the run"""
+    provider = FlakyProvider(quota_errors=2)
+    stage = EmbeddingStage(provider, str(tmp_path / "checkpoint.jsonl"), concurrency=1,
+                           max_batch_size=64, base_delay=0)
+    vectors = stage.run(_documents(50))
+
+    assert len(vectors) == 50
+    assert stage.stats["retries"] == 2 and stage.stats["failed"] == 0
+    assert provider.batch_sizes[0] == 32, "The throttled batch itself is retried whole"
+    assert provider.batch_sizes[1] < 32, "Later batches should start from the halved size"
+
+def test_torn_checkpoint_tail_is_dropped(tmp_path):
+    """Test that a half-written last line is cut off so later appends stay readable"""
+    path = tmp_path / "checkpoint.jsonl"
+    stage = EmbeddingStage(FlakyProvider(), str(path), concurrency=1)
+    stage.run(_documents(3))
+    with open(path, "ab") as f:
+        f.write(b'{"key": "abc", "vec')
+
+    assert len(EmbeddingCheckpoint(str(path)).load()) == 3
+    assert len(EmbeddingStage(FlakyProvider(), str(path)).run(_documents(5))) == 5
+    assert len(EmbeddingCheckpoint(str(path)).load()) == 5
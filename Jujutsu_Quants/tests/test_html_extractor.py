@@ -0,0 +1,48 @@
+import os
+
+from app.utils.html_extractor import extract_article, extract_text
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+
+def _load(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+def test_article_text_without_boilerplate():
+    """Test that article paragraphs are kept while nav, ads, cookie banners and footers are dropped"""
+    article = extract_article(_load("news_article.html"))
+
+    assert article["title"] == "Oil Prices Climb as OPEC+ Extends Output Cuts | Market News"
+    assert "Brent crude futures gained 1.8%" in article["content"]
+    assert "A ceasefire in the Middle East" in article["content"]
+    for boilerplate in ["cookie policy", "Markets", "Share on X", "Advertisement", "Related",
+                        "comments", "Subscribe", "All rights reserved", "dataLayer"]:
+        assert boilerplate not in article["content"], f"'{boilerplate}' should have been removed"
+
+def test_hidden_elements_and_table_rows():
+    """Test that hidden XBRL headers are skipped and table rows stay on one line"""
+    text = extract_text(_load("sec_filing.html"))
+
+    assert "AmendmentFlag" not in text and not text.startswith("false")
+    assert "Total revenues $ 24,118 $ 27,462" in text.split("\n")
+
+def test_max_chars_stops_early():
+    """Test that extraction is capped at max_chars"""
+    html = "<html><body>" + "<p>Crude inventories fell again this week.</p>" * 5000 + "</body></html>"
+
+    assert len(extract_text(html, max_chars=500)) == 500
+    assert extract_text(html).count("\n") == 4999
+
+def test_implicitly_closed_boilerplate_does_not_swallow_the_page():
+    """Test that a skipped <li> left unclosed ends at its next sibling or when its list closes"""
+    html = '<ul><li class="menu-item">Home<li>About</ul><p>Treasury yields fell after the jobs report.</p>'
+    assert extract_text(html) == "About\nTreasury yields fell after the jobs report."
+
+    html = '<div><ul><li class="menu-item">Home</ul></div><p>Gold rose 2%.</p>'
+    assert extract_text(html) == "Gold rose 2%."
+
+def test_boilerplate_matches_whole_class_tokens():
+    """Test that share-price style classes are content while share bars are chrome"""
+    html = ('<div class="share-price">AAPL 189.20</div><span class="stock-share-count">15.4B shares</span>'
+            '<div class="share-bar">Share on X</div><div class="share">Email</div><p class="ad_slot">Ad</p>')
+    assert extract_text(html) == "AAPL 189.20\n15.4B shares"
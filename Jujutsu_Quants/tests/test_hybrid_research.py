@@ -0,0 +1,39 @@
+import asyncio
+import time
+
+from app.services.hybrid_rag_service import HybridRAGService
+
+
+def test_slow_legs_are_dropped_at_the_deadline():
+    """Test that legs run concurrently and the finished ones are merged when the deadline passes"""
+    def market_data_tool(instrument, period, project_id):
+        time.sleep(1.0 if instrument == "TSLA" else 0.05)
+        return {"data": {"info": {"currentPrice": 100.0, "dayChangePercent": 1.5}}}
+
+    def news_data_tool(query, days, project_id):
+        time.sleep(0.05)
+        return {"articles": [{"title": "Automakers rally"}]}
+
+    async def rag_search(hypothesis):
+        await asyncio.sleep(0.05)
+        return {"historical_insights": [{"title": "EV demand outlook", "similarity": 0.8}]}
+
+    service = HybridRAGService.__new__(HybridRAGService)
+    service.project_id = "test-project"
+    service.market_data_tool = market_data_tool
+    service.news_data_tool = news_data_tool
+    service._rag_search = rag_search
+
+    async def research():
+        started = time.monotonic()
+        result = await service.hybrid_research("AAPL and TSLA rally on EV demand", ["AAPL", "TSLA"], deadline=0.4)
+        return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(research())
+    data = result["research_data"]
+    assert result["status"] == "success" and elapsed < 0.8, "Legs should run at once and stop at the deadline"
+    assert data["timed_out_sources"] == ["market:TSLA"]
+    assert data["market_data"]["AAPL"]["data"]["info"]["currentPrice"] == 100.0
+    assert "error" in data["market_data"]["TSLA"]
+    assert data["historical_insights"][0]["title"] == "EV demand outlook"
+    assert data["news_data"]["articles"][0]["title"] == "Automakers rally"
@@ -0,0 +1,106 @@
+import json
+
+from data_collection.corpus.index_manager import VectorIndexManager, default_probes, ivfflat_lists
+
+
+class ScriptedConnection:
+    """Answers the manager's two lookups (row count, index comment) and records every statement"""
+
+    def __init__(self, rows, comment=None, index_exists=True):
+        self.rows = rows
+        self.comment = comment
+        self.index_exists = index_exists
+        self.statements = []
+        self.committed = False
+
+    def cursor(self):
+        conn = self
+
+        class Cursor:
+            def execute(self, sql, args=None):
+                conn.statements.append(" ".join(sql.split()))
+                if "COUNT(*)" in sql:
+                    self.row = (conn.rows,)
+                elif "obj_description" in sql:
+                    self.row = (conn.comment,) if conn.index_exists else None
+
+            def fetchone(self):
+                return self.row
+
+            def close(self):
+                pass
+
+        return Cursor()
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+
+def test_index_parameters_follow_row_count():
+    """Test ivfflat lists / probes sizing and HNSW parameters"""
+    assert ivfflat_lists(0) == 1
+    assert ivfflat_lists(50_000) == 50
+    assert ivfflat_lists(4_000_000) == 2000
+    assert default_probes(100) == 10
+
+    hnsw = VectorIndexManager(ScriptedConnection(10), method="hnsw", m=24, ef_construction=128)
+    assert "USING hnsw (embedding vector_cosine_ops) WITH (m = 24, ef_construction = 128)" in \
+        hnsw.create_index_sql(hnsw.plan(10))
+    assert hnsw.search_settings(ef_search=100) == ["SET LOCAL hnsw.ef_search = 100"]
+
+
+def test_index_is_built_deferred_and_rebuilt_on_growth():
+    """Test build on first load, deferral on an empty table and rebuild past the growth factor"""
+    empty = ScriptedConnection(0, index_exists=False)
+    assert VectorIndexManager(empty).ensure_index()["action"] == "deferred"
+    assert not any(sql.startswith("CREATE INDEX") for sql in empty.statements)
+
+    fresh = ScriptedConnection(50_000, index_exists=False)
+    result = VectorIndexManager(fresh).ensure_index()
+    assert result["action"] == "created" and result["lists"] == 50
+    assert any("WITH (lists = 50)" in sql for sql in fresh.statements)
+    assert fresh.statements[-1] == "ANALYZE documents" and fresh.committed
+
+    built = json.dumps({"method": "ivfflat", "lists": 50, "rows": 50_000})
+    manager = VectorIndexManager(ScriptedConnection(90_000, built), rebuild_growth=2.0)
+    assert manager.ensure_index()["action"] == "kept"
+    assert manager.search_settings() == ["SET LOCAL ivfflat.probes = 7"]
+    assert manager.search_settings(probes=20) == ["SET LOCAL ivfflat.probes = 20"]
+
+    grown = ScriptedConnection(120_000, built)
+    result = VectorIndexManager(grown, rebuild_growth=2.0).ensure_index()
+    assert result["action"] == "rebuilt" and result["lists"] == 120
+    assert "ALTER INDEX idx_documents_embedding_rebuild RENAME TO idx_documents_embedding" in grown.statements
+
+    # The old fixed `lists = 100` index carries no build record and is replaced
+    legacy = ScriptedConnection(5_000, comment=None)
+    assert VectorIndexManager(legacy).ensure_index()["action"] == "rebuilt"
+
+
+def test_filtered_search_routes_to_partition_index():
+    """Test partial index creation, literal routing and the doubling probe schedule"""
+    class PartitionConnection(ScriptedConnection):
+        def cursor(self):
+            cursor = super().cursor()
+            cursor.fetchall = lambda: [("AAPL", 8000), ("O'REILLY", 3000)] \
+                if "GROUP BY" in self.statements[-1] else []
+            return cursor
+
+    conn = PartitionConnection(11_000)
+    manager = VectorIndexManager(conn)
+    assert manager.ensure_partition_indexes(min_rows=2000)["created"] == 2
+    assert any(sql.endswith("WITH (lists = 8) WHERE instrument = 'AAPL'") for sql in conn.statements)
+
+    partition = manager.route({"instrument": "O'REILLY", "source_type": "news"})
+    assert partition["filter"] == {"instrument": "O'REILLY"}
+    assert manager.filter_clause({"instrument": "O'REILLY", "source_type": "news"}, partition) == \
+        ("WHERE instrument = 'O''REILLY' AND source_type = %s", ["news"])
+    assert manager.route({"instrument": "MSFT"}) is None
+    assert manager.filter_clause({"instrument": "MSFT"}) == ("WHERE instrument = %s", ["MSFT"])
+
+    schedule = [settings[0] for settings in manager.probe_schedule(partition=manager.route({"instrument": "AAPL"}))]
+    assert schedule == ["SET LOCAL ivfflat.probes = 3", "SET LOCAL ivfflat.probes = 6",
+                        "SET LOCAL ivfflat.probes = 8"]
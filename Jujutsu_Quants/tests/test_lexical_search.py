@@ -0,0 +1,60 @@
+import asyncio
+
+from app.services.hybrid_rag_service import HybridRAGService
+from app.services.lexical_search import BM25Index, query_lexical_documents, tokenize
+from app.utils.rank_fusion import reciprocal_rank_fusion
+
+def test_bm25_ranks_exact_ticker_and_filing_terms():
+    """Test that tickers and filing names are kept whole and rank their documents first"""
+    assert tokenize("AAPL 10-Q and the S&P 500") == ["aapl", "10-q", "s&p", "500"]
+
+    bm25 = BM25Index()
+    bm25.add("Apple quarterly results beat expectations on services revenue")
+    bm25.add("AAPL 10-Q filing: guidance raised for the next quarter")
+    bm25.add("Bitcoin miners face pressure after the halving")
+
+    results = bm25.search("AAPL guidance 10-Q", limit=2)
+    assert results[0][0] == 1
+    assert len(results) == 1, "Documents without any query term should not be returned"
+    assert bm25.search("AAPL", allowed=lambda doc_id: doc_id != 1) == []
+
+def test_reciprocal_rank_fusion_weights_and_overlap():
+    """Test that items found by both legs rise to the top and leg weights shift the order"""
+    vector = ["a", "b", "c"]
+    lexical = ["d", "c"]
+
+    fused = reciprocal_rank_fusion({"vector": vector, "lexical": lexical}, key=lambda item: item)
+    assert fused[0][0] == "c" and fused[0][2] == ["vector", "lexical"]
+
+    lexical_only = reciprocal_rank_fusion({"vector": vector, "lexical": lexical}, key=lambda item: item,
+                                          weights={"vector": 0.0})
+    assert [item for item, _, _ in lexical_only] == ["d", "c"]
+
+def _row(title, similarity):
+    return (title, f"{title} content", "AAPL", "news", None, similarity)
+
+def test_hybrid_search_fuses_database_legs():
+    """Test that both legs run through the pool, shared rows rank first and a failed keyword leg degrades"""
+    class Pool:
+        def __init__(self, lexical):
+            self.lexical = lexical
+        async def run(self, fn, *args):
+            if fn is query_lexical_documents:
+                if isinstance(self.lexical, Exception):
+                    raise self.lexical
+                return self.lexical
+            return [_row("fed minutes", 0.9), _row("aapl 10-q", 0.8), _row("cpi print", 0.7)]
+
+    service = HybridRAGService.__new__(HybridRAGService)
+    service.local_index = None
+    service.leg_top_k = {"vector": 30, "lexical": 30}
+    service.leg_weights = {"vector": 1.0, "lexical": 1.0}
+    service.async_db_pool = Pool([_row("aapl 10-q", 0.8), _row("aapl guidance", 0.5)])
+
+    fused = asyncio.run(service._hybrid_search("AAPL 10-Q guidance", [0.1, 0.2], limit=3))
+    assert [row[0] for row, _, _ in fused] == ["aapl 10-q", "fed minutes", "aapl guidance"]
+    assert fused[0][2] == ["vector", "lexical"] and fused[2][2] == ["lexical"]
+
+    service.async_db_pool = Pool(RuntimeError("tsvector column missing"))
+    fused = asyncio.run(service._hybrid_search("AAPL 10-Q guidance", [0.1, 0.2], limit=5))
+    assert [row[0] for row, _, _ in fused] == ["fed minutes", "aapl 10-q", "cpi print"]
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services.local_vector_index import LocalVectorIndex
+
+def _clustered_corpus(count=600, dim=32, seed=7):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(12, dim))
+    vectors = centers[rng.integers(0, 12, count)] + 0.3 * rng.normal(size=(count, dim))
+    documents = [{
+        "id": f"doc-{i}",
+        "title": f"Document {i}",
+        "content": "content",
+        "instrument": ["AAPL", "BTC-USD", "SPY"][i % 3],
+        "source_type": ["news", "sec_filing"][i % 2],
+        "date": "2024-05-01"
+    } for i in range(count)]
+    return documents, vectors.astype(np.float32)
+
+def test_ivf_search_matches_exact_search(tmp_path):
+    """Test that probing the inverted lists finds the exact nearest neighbours"""
+    documents, vectors = _clustered_corpus()
+    index = LocalVectorIndex.build(documents, vectors, str(tmp_path / "index"), nlist=8, nprobe=3)
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    for row in (0, 17, 301):
+        exact = [f"doc-{i}" for i in np.argsort(-(normalized @ normalized[row]))[:5]]
+        hits = index.semantic_search(vectors[row], limit=5, similarity_threshold=None)
+        assert [hit["id"] for hit in hits] == exact
+        assert hits[0]["similarity"] == pytest.approx(1.0, abs=1e-5)
+        assert hits[0]["date_published"] == "2024-05-01"
+
+def test_filters_and_reopen_from_disk(tmp_path):
+    """Test instrument/source filters, unknown filters and a reopened memory-mapped index"""
+    documents, vectors = _clustered_corpus()
+    path = str(tmp_path / "index")
+    LocalVectorIndex.build(documents, vectors, path, nlist=8, nprobe=1).close()
+
+    index = LocalVectorIndex(path)
+    hits = index.semantic_search(vectors[0], limit=20, instrument_filter="SPY",
+                                 source_filter="sec_filing", similarity_threshold=None)
+    assert len(hits) == 20, "Under-filled filtered searches should probe more lists"
+    assert {(hit["instrument"], hit["source_type"]) for hit in hits} == {("SPY", "sec_filing")}
+    assert index.semantic_search(vectors[0], instrument_filter="TSLA") == []
+    assert all(hit["similarity"] >= 0.99 for hit in index.semantic_search(vectors[0], similarity_threshold=0.99))
+
+def test_build_from_corpus_processor_output(tmp_path):
+    """Test joining a processor run's embeddings and documents files by id"""
+    documents, vectors = _clustered_corpus(count=20)
+    corpus = tmp_path / "processed_corpus"
+    corpus.mkdir()
+    with open(corpus / "embeddings_run1.jsonl", "w") as f:
+        for doc, vector in zip(documents, vectors):
+            f.write(json.dumps({"id": doc["id"], "embedding": vector.tolist()}) + "\n")
+    with open(corpus / "documents_run1.jsonl", "w") as f:
+        for doc in reversed(documents):
+            f.write(json.dumps(doc) + "\n")
+
+    index = LocalVectorIndex.from_corpus_output(str(corpus), str(tmp_path / "index"))
+    assert index.get_stats()["total_documents"] == 20
+    assert index.semantic_search(vectors[4], limit=1)[0]["id"] == "doc-4"
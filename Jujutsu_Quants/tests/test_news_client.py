@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import httpx
+
+from app.services.news_client import NewsClient, normalize_topics
+from app.utils.rate_limiter import RateLimitScheduler
+
+TODAY = datetime.now().strftime("%Y%m%d")
+
+def _article(topic, minute):
+    return {
+        "title": f"{topic} story {minute}",
+        "url": f"https://news.example.com/{topic}/{minute}",
+        "time_published": f"{TODAY}T10{minute:02d}00",
+        "source": "Example",
+        "overall_sentiment_score": 0.1
+    }
+
+def _client(requests, page_size=2):
+    """Client whose upstream serves 3 articles per topic, newest first, honouring time_to"""
+    def handler(request):
+        requests.append(dict(request.url.params))
+        topic = request.url.params["topics"]
+        time_to = request.url.params.get("time_to")
+        feed = [_article(topic, minute) for minute in (30, 20, 10)]
+        if time_to:
+            feed = [a for a in feed if a["time_published"][:13] <= time_to]
+        return httpx.Response(200, json={"feed": feed[:page_size]})
+
+    limiter = RateLimitScheduler(limits={"alpha_vantage": [(1000, 1.0)]}, state_dir="")
+    return NewsClient(ttl=300, page_size=page_size, rate_limiter=limiter,
+                      transport=httpx.MockTransport(handler))
+
+def test_free_text_maps_to_topics():
+    """Test that hybrid-research style queries become valid topics"""
+    assert normalize_topics("cryptocurrency bitcoin market news") == ["blockchain", "financial_markets"]
+    assert normalize_topics("something unrelated") == ["financial_markets"]
+
+def test_topics_are_merged_paged_and_cached():
+    """Test multi-topic merge, time_to paging and that repeats are served from cache"""
+    requests = []
+    client = _client(requests)
+
+    result = client.get_news(["blockchain", "earnings"], days=7, api_key="k", limit=10)
+
+    assert result["errors"] == {}
+    assert len(result["articles"]) == 6
+    assert result["articles"][0]["time_published"] >= result["articles"][-1]["time_published"]
+    assert all("time_from" in params for params in requests), "Window should be filtered server-side"
+    assert any(params.get("time_to") == f"{TODAY}T1020" for params in requests), "Should page backwards"
+
+    fetched = len(requests)
+    client.get_news("crypto earnings", days=7, api_key="k", limit=10)
+    assert len(requests) == fetched, "Repeat lookups should not hit the API"
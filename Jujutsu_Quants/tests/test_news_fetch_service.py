@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services import news_fetch_service
+from app.services.news_fetch_service import fetch_urls_to_articles, fetch_urls_to_articles_async
+
+PAGE = "<html><head><title>{}</title></head><body><p>Crude inventories fell again this week.</p></body></html>"
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.setattr(news_fetch_service, "get_article_cache", lambda: None)
+
+
+def test_per_host_limit_and_deadline():
+    """Test that each host gets at most per_host requests at once and a slow host is cut off at the deadline"""
+    in_flight = {}
+    peak = {}
+
+    async def handler(request):
+        host = request.url.host
+        in_flight[host] = in_flight.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), in_flight[host])
+        await asyncio.sleep(5 if host == "slow.example.com" else 0.02)
+        in_flight[host] -= 1
+        return httpx.Response(200, html=PAGE.format(request.url.path))
+
+    urls = [f"https://a.example.com/{i}" for i in range(6)] + ["https://slow.example.com/x"] + \
+           [f"https://b.example.com/{i}" for i in range(3)]
+    started = time.monotonic()
+    articles = asyncio.run(fetch_urls_to_articles_async(urls, max_concurrency=10, per_host_concurrency=2,
+                                                        deadline=0.5, transport=httpx.MockTransport(handler)))
+    assert time.monotonic() - started < 2
+    assert [article["url"] for article in articles] == [url for url in urls if "slow" not in url]
+    assert peak["a.example.com"] == 2 and peak["b.example.com"] == 2
+
+
+def test_read_stops_once_content_cap_is_filled():
+    """Test that a long page is only streamed until it holds enough paragraph text"""
+    pulled = []
+
+    async def body():
+        for i in range(100):
+            pulled.append(i)
+            yield b"<p>" + b"Gold rose as the dollar weakened. " * 400 + b"</p>"
+
+    def handler(request):
+        return httpx.Response(200, headers={"content-type": "text/html"}, content=body())
+
+    articles = asyncio.run(fetch_urls_to_articles_async(["https://example.com/long"],
+                                                        transport=httpx.MockTransport(handler)))
+    assert len(articles[0]["content"]) == news_fetch_service.MAX_CONTENT_CHARS
+    assert len(pulled) < 10, "Reading should stop long before the end of the page"
+
+
+def test_sync_wrapper_refuses_a_running_loop():
+    """Test that the sync wrapper points async callers at the coroutine instead of blocking the loop"""
+    async def caller():
+        fetch_urls_to_articles(["https://example.com/a"])
+
+    with pytest.raises(RuntimeError, match="fetch_urls_to_articles_async"):
+        asyncio.run(caller())
+    assert fetch_urls_to_articles([]) == []
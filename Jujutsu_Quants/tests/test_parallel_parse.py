@@ -0,0 +1,23 @@
+import time
+
+from data_collection.corpus.parallel_parse import parse_files_parallel
+
+
+def slow_parse(file_path):
+    """Later files finish first, so completion order differs from input order"""
+    index = int(file_path.split("-")[1])
+    time.sleep(0.002 * (20 - index % 20))
+    return [] if index % 7 == 0 else [f"{file_path}#0", f"{file_path}#1"]
+
+
+def test_parallel_parse_keeps_input_order():
+    """Test that shards parsed on several processes come back in file order"""
+    paths = (f"file-{i}" for i in range(60))
+    stats = {}
+    shards = list(parse_files_parallel(paths, slow_parse, workers=3, shard_size=4, stats=stats))
+
+    expected = [f"file-{i}#{part}" for i in range(60) if i % 7 for part in (0, 1)]
+    assert [doc for shard in shards for doc in shard] == expected
+    assert stats == {"files": 60, "shards": 15, "documents": len(expected), "workers": 3}
+    assert list(parse_files_parallel([f"file-{i}" for i in range(60)], slow_parse, workers=1)) == \
+        [[doc for doc in expected if int(doc.split("-")[1].split("#")[0]) // 32 == shard] for shard in (0, 1)]
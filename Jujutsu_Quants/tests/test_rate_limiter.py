@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+
+from app.utils.rate_limiter import RateLimitScheduler, TokenBucket
+
+def test_bucket_allows_burst_then_waits():
+    """Test that a bucket grants its capacity at once and then refills at its rate"""
+    bucket = TokenBucket(capacity=2, period=1.0)
+
+    assert bucket.wait_time(1, now=0.0) == 0.0
+    bucket.consume(1)
+    assert bucket.wait_time(1, now=0.0) == 0.0
+    bucket.consume(1)
+
+    assert abs(bucket.wait_time(1, now=0.0) - 0.5) < 1e-9, "Should wait one refill interval"
+    assert bucket.wait_time(1, now=0.5) == 0.0
+
+def test_every_window_is_enforced():
+    """Test that the tightest window (here the daily quota) throttles the provider"""
+    scheduler = RateLimitScheduler(limits={"quota_api": [(10, 1.0), (2, 86400.0)]}, state_dir="")
+
+    assert scheduler.acquire("quota_api", timeout=0)
+    assert scheduler.acquire("quota_api", timeout=0)
+    assert not scheduler.acquire("quota_api", timeout=0.1), "Daily quota should be exhausted"
+
+def test_keyed_providers_get_separate_buckets():
+    """Test that scrape:<host> names share limits but not budgets"""
+    scheduler = RateLimitScheduler(limits={"scrape": [(1, 60.0)]}, state_dir="")
+
+    assert scheduler.acquire("scrape:a.example.com", timeout=0)
+    assert scheduler.acquire("scrape:b.example.com", timeout=0)
+    assert not scheduler.acquire("scrape:a.example.com", timeout=0)
+
+def test_penalize_blocks_provider():
+    """Test that a 429 back-off holds requests even with tokens available"""
+    scheduler = RateLimitScheduler(limits={"api": [(100, 1.0)]}, state_dir="")
+    scheduler.penalize("api", 60)
+
+    start = time.monotonic()
+    assert not scheduler.acquire("api", timeout=0.2)
+    assert time.monotonic() - start < 0.2, "Should give up immediately when the wait exceeds the timeout"
+
+def test_state_is_shared_between_schedulers(tmp_path):
+    """Test that two schedulers (e.g. two collector processes) share one budget"""
+    limits = {"shared_api": [(1, 3600.0)]}
+    first = RateLimitScheduler(limits=limits, state_dir=str(tmp_path))
+    second = RateLimitScheduler(limits=limits, state_dir=str(tmp_path))
+
+    assert first.acquire("shared_api", timeout=0)
+    assert not second.acquire("shared_api", timeout=0), "Second process should see the spent token"
+
+
+def test_async_acquire_does_not_block_the_loop_on_shared_state(tmp_path):
+    """Test that a reservation waiting on the shared state lock leaves the event loop running"""
+    scheduler = RateLimitScheduler(limits={"shared_api": [(5, 1.0)]}, state_dir=str(tmp_path))
+    limiter = scheduler._get("shared_api")
+    limiter._lock.acquire()
+    threading.Timer(0.3, limiter._lock.release).start()
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.02)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        granted = await scheduler.acquire_async("shared_api", timeout=1)
+        task.cancel()
+        return granted, ticks
+
+    granted, ticks = asyncio.run(main())
+    assert granted and ticks >= 5, "The loop should keep running while another holder has the lock"
@@ -0,0 +1,44 @@
+import time
+
+from app.utils.secret_provider import EnvSecretProvider, SecretProvider, SecretStore
+
+class CountingProvider(SecretProvider):
+    """In-memory provider that records how often it is asked"""
+
+    def __init__(self, secrets):
+        self.secrets = dict(secrets)
+        self.calls = 0
+
+    def get(self, name, project_id=None):
+        self.calls += 1
+        return self.secrets.get(name)
+
+def test_secrets_are_cached():
+    """Test that repeated lookups (hits and misses) don't go back to the provider"""
+    provider = CountingProvider({"alpha-vantage-key": "abc"})
+    store = SecretStore(providers=[provider], ttl=60, miss_ttl=60)
+
+    assert store.get("alpha-vantage-key", "proj") == "abc"
+    assert store.get("alpha-vantage-key", "proj") == "abc"
+    assert store.get("missing-key", "proj") is None
+    assert store.get("missing-key", "proj") is None
+    assert provider.calls == 2
+
+def test_expired_secret_served_while_refreshing():
+    """Test that an expired secret is returned immediately and refreshed in the background"""
+    provider = CountingProvider({"alpha-vantage-key": "old"})
+    store = SecretStore(providers=[provider], ttl=0)
+
+    assert store.get("alpha-vantage-key") == "old"
+    provider.secrets["alpha-vantage-key"] = "rotated"
+    assert store.get("alpha-vantage-key") == "old", "Stale value should be served without blocking"
+
+    deadline = time.monotonic() + 2
+    while store.get("alpha-vantage-key") != "rotated" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert store.get("alpha-vantage-key") == "rotated"
+
+def test_env_provider_aliases(monkeypatch):
+    """Test that secret names map onto the repo's existing environment variables"""
+    monkeypatch.setenv("ALPHA_VANTAGE_API_KEY", "from-env")
+    assert EnvSecretProvider().get("alpha-vantage-key") == "from-env"
@@ -0,0 +1,88 @@
+import threading
+import time
+
+from app.services.vector_search_executor import HedgedQueryExecutor
+
+
+class Neighbor:
+    def __init__(self, id, distance=0.1):
+        self.id = id
+        self.distance = distance
+
+
+class FakeEndpoint:
+    """find_neighbors with per-format behaviour ('error' or a delay in seconds) and optional restricts support"""
+
+    def __init__(self, basic=0.0, alternative=0.0, restricts=True, instruments=None):
+        self.behaviour = {False: basic, True: alternative}
+        self.restricts = restricts
+        self.instruments = instruments or {f"doc-{i}": "AAPL" if i % 2 else "SPY" for i in range(20)}
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def find_neighbors(self, deployed_index_id, queries, num_neighbors, restricts=None, return_full_datapoint=None):
+        with self.lock:
+            self.calls.append((return_full_datapoint is not None, restricts, num_neighbors))
+        behaviour = self.behaviour[return_full_datapoint is not None]
+        if behaviour == "error":
+            raise RuntimeError("unsupported argument")
+        time.sleep(behaviour)
+        ids = list(self.instruments)
+        if restricts:
+            if not self.restricts:
+                return [[]]
+            allowed = restricts[0]["allow"][0]
+            ids = [doc_id for doc_id in ids if self.instruments[doc_id] == allowed]
+        return [[Neighbor(doc_id) for doc_id in ids[:num_neighbors]]]
+
+
+def test_learns_strategy_and_hedges_only_when_slow(tmp_path):
+    """Test that a failing format is skipped once learned, across processes, and slow calls are hedged"""
+    cache = str(tmp_path / "strategies.json")
+    endpoint = FakeEndpoint(basic="error")
+    executor = HedgedQueryExecutor(endpoint, "deployed", cache_path=cache, hedge_after_ms=200)
+    neighbors, strategy = executor.search([0.1], 3)
+    assert strategy == "Alternative Parameter Format" and len(neighbors) == 3
+    assert len(endpoint.calls) == 2 and executor.get_stats()["hedged"] == 0
+
+    endpoint.calls.clear()
+    restarted = HedgedQueryExecutor(endpoint, "deployed", cache_path=cache, hedge_after_ms=200)
+    assert restarted.search([0.1], 3)[1] == "Alternative Parameter Format"
+    assert len(endpoint.calls) == 1, "The learned strategy should answer in one round-trip"
+
+    slow = FakeEndpoint(basic=0.5, alternative=0.0)
+    executor = HedgedQueryExecutor(slow, "other", cache_path=cache, hedge_after_ms=50)
+    started = time.monotonic()
+    neighbors, strategy = executor.search([0.1], 3)
+    assert strategy == "Alternative Parameter Format" and time.monotonic() - started < 0.4
+    assert executor.get_stats()["hedged"] == 1
+
+    fast = FakeEndpoint(basic=0.0, alternative="error")
+    executor = HedgedQueryExecutor(fast, "fast", cache_path=None, hedge_after_ms=200)
+    executor.search([0.1], 3)
+    assert len(fast.calls) == 1 and executor.get_stats()["hedged"] == 0
+
+
+def test_filters_go_server_side_and_post_filtering_is_learned(tmp_path):
+    """Test restricts on indexes that have them and client-side filtering on those that do not"""
+    endpoint = FakeEndpoint()
+    executor = HedgedQueryExecutor(endpoint, "with-restricts", cache_path=None)
+    neighbors, _ = executor.search([0.1], 3, {"instrument": "AAPL", "source_type": None})
+    assert [n.id for n in neighbors] == ["doc-1", "doc-3", "doc-5"]
+    assert endpoint.calls == [(False, [{"namespace": "instrument", "allow": ["AAPL"]}], 3)]
+    assert executor.get_stats()["restricts"] is True
+
+    endpoint.calls.clear()
+    assert executor.search([0.1], 3, {"instrument": "TSLA"}) == ([], "Basic Query")
+    assert len(endpoint.calls) == 1, "An empty filtered answer is final once restricts are known to work"
+
+    plain = FakeEndpoint(restricts=False)
+    executor = HedgedQueryExecutor(plain, "no-restricts", cache_path=None)
+    post_filter = lambda neighbors: [n for n in neighbors if plain.instruments[n.id] == "SPY"]
+    neighbors, strategy = executor.search([0.1], 3, {"instrument": "SPY"}, post_filter=post_filter)
+    assert strategy == "Post-filtered Query" and [n.id for n in neighbors] == ["doc-0", "doc-2", "doc-4"]
+    assert executor.get_stats()["restricts"] is False
+
+    plain.calls.clear()
+    executor.search([0.1], 3, {"instrument": "SPY"}, post_filter=post_filter)
+    assert plain.calls == [(False, None, 12)], "Known restrict-less indexes go straight to over-fetching"